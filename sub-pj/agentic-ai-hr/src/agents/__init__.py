@@ -1,5 +1,7 @@
 """Agent modules for HR policy design."""
 
+from src.core import BaseAgent
+
 from .compensation_designer import CompensationDesignerAgent
 from .context_collector import ContextCollectorAgent
 from .evaluation_designer import EvaluationDesignerAgent
@@ -15,7 +17,7 @@ __all__ = [
 ]
 
 # Agent type to class mapping
-AGENT_REGISTRY = {
+AGENT_REGISTRY: dict[str, type[BaseAgent]] = {
     "context_collector": ContextCollectorAgent,
     "talent_profile_generator": TalentProfileGeneratorAgent,
     "grading_designer": GradingDesignerAgent,
@@ -24,7 +26,7 @@ AGENT_REGISTRY = {
 }
 
 
-def get_agent_class(agent_type: str) -> type:
+def get_agent_class(agent_type: str) -> type[BaseAgent]:
     """Get agent class by type name."""
     if agent_type not in AGENT_REGISTRY:
         raise ValueError(f"Unknown agent type: {agent_type}")
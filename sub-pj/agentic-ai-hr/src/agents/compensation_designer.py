@@ -7,7 +7,7 @@ the grading and evaluation systems.
 
 from typing import Any
 
-from src.core import AgentResult, BaseAgent, HITLGateId
+from src.core import TRANSIENT_ERRORS, AgentResult, BaseAgent, HITLGateId, LLMPriority
 from src.domain import (
     Allowance,
     BonusStructure,
@@ -17,7 +17,7 @@ from src.domain import (
     SalaryComponent,
     SalaryType,
 )
-from src.utils import get_logger
+from src.utils import JSONArrayItemStream, get_logger
 
 logger = get_logger(__name__)
 
@@ -34,6 +34,8 @@ class CompensationDesignerAgent(BaseAgent):
     """
 
     agent_type = "compensation_designer"
+    llm_cache_enabled = True
+    llm_priority = LLMPriority.HITL_BLOCKING
 
     SYSTEM_PROMPT = """あなたは人事制度設計の専門家です。
 企業の報酬制度を設計してください。
@@ -52,9 +54,8 @@ class CompensationDesignerAgent(BaseAgent):
             # Get context from previous steps
             company_data = input_data.get("collect_context", {}).get("company", {})
             grading_system = input_data.get("design_grading", {}).get("grading_system", {})
-            evaluation_system = input_data.get("design_evaluation", {}).get("evaluation_system", {})
 
-            if not all([company_data, grading_system, evaluation_system]):
+            if not all([company_data, grading_system]):
                 return AgentResult(
                     success=False,
                     error="Missing required context from previous steps.",
@@ -62,7 +63,7 @@ class CompensationDesignerAgent(BaseAgent):
 
             # Design compensation system
             compensation_system = await self._design_compensation_system(
-                company_data, grading_system, evaluation_system
+                company_data, grading_system
             )
 
             # Store in state
@@ -86,6 +87,8 @@ class CompensationDesignerAgent(BaseAgent):
                 hitl_gate_id=HITLGateId.COMPENSATION_SYSTEM.value,
             )
 
+        except TRANSIENT_ERRORS:
+            raise
         except Exception as e:
             logger.error("compensation_design_failed", error=str(e))
             return AgentResult(success=False, error=str(e))
@@ -94,7 +97,6 @@ class CompensationDesignerAgent(BaseAgent):
         self,
         company_data: dict[str, Any],
         grading_system: dict[str, Any],
-        evaluation_system: dict[str, Any],
     ) -> CompensationSystem:
         """Design the compensation system using AI."""
         grades = grading_system.get("grades", [])
@@ -135,12 +137,21 @@ class CompensationDesignerAgent(BaseAgent):
 }}"""
 
         try:
-            response = await self.call_llm(
+            # Stream the response and publish bands and allowances as they close
+            parser = JSONArrayItemStream("salary_bands", "allowances")
+            partial: dict[str, list[dict[str, Any]]] = {"salary_bands": [], "allowances": []}
+            async for chunk in self.call_llm_stream(
                 system_prompt=self.SYSTEM_PROMPT,
                 user_message=user_message,
                 temperature=0.5,
                 max_tokens=4096,
-            )
+            ):
+                completed = parser.feed(chunk)
+                for key, item in completed:
+                    partial[key].append(item)
+                if completed:
+                    await self.publish_progress(partial)
+            response = parser.text
 
             import json
 
@@ -214,6 +225,8 @@ class CompensationDesignerAgent(BaseAgent):
                 design_principles=data.get("design_principles", []),
             )
 
+        except TRANSIENT_ERRORS:
+            raise
         except Exception as e:
             logger.warning("ai_compensation_design_failed", error=str(e))
             return self._create_default_compensation_system(company_data, grading_system)
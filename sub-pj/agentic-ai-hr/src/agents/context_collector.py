@@ -7,7 +7,7 @@ as the first step in the HR policy design process.
 
 from typing import Any
 
-from src.core import AgentResult, BaseAgent, HITLGateId
+from src.core import TRANSIENT_ERRORS, AgentResult, BaseAgent, HITLGateId, LLMPriority
 from src.domain import Company, CompanySize, Industry
 from src.utils import get_logger
 
@@ -25,6 +25,8 @@ class ContextCollectorAgent(BaseAgent):
     """
 
     agent_type = "context_collector"
+    llm_cache_enabled = True
+    llm_priority = LLMPriority.HITL_BLOCKING
 
     SYSTEM_PROMPT = """あなたは人事制度設計の専門家です。
 企業情報を分析し、人事制度設計に必要なコンテキストを整理してください。
@@ -80,6 +82,8 @@ class ContextCollectorAgent(BaseAgent):
                 hitl_gate_id=HITLGateId.COMPANY_CONTEXT.value,
             )
 
+        except TRANSIENT_ERRORS:
+            raise
         except Exception as e:
             logger.error("context_collection_failed", error=str(e))
             return AgentResult(success=False, error=str(e))
@@ -172,6 +176,8 @@ class ContextCollectorAgent(BaseAgent):
 
             return {"raw_response": response}
 
+        except TRANSIENT_ERRORS:
+            raise
         except Exception as e:
             logger.warning("context_enrichment_failed", error=str(e))
             return {
@@ -7,7 +7,7 @@ the talent profile and grading system.
 
 from typing import Any
 
-from src.core import AgentResult, BaseAgent, HITLGateId
+from src.core import TRANSIENT_ERRORS, AgentResult, BaseAgent, HITLGateId, LLMPriority
 from src.domain import (
     EvaluationCriterion,
     EvaluationPeriod,
@@ -32,6 +32,8 @@ class EvaluationDesignerAgent(BaseAgent):
     """
 
     agent_type = "evaluation_designer"
+    llm_cache_enabled = True
+    llm_priority = LLMPriority.HITL_BLOCKING
 
     SYSTEM_PROMPT = """あなたは人事制度設計の専門家です。
 企業の評価制度を設計してください。
@@ -84,6 +86,8 @@ class EvaluationDesignerAgent(BaseAgent):
                 hitl_gate_id=HITLGateId.EVALUATION_SYSTEM.value,
             )
 
+        except TRANSIENT_ERRORS:
+            raise
         except Exception as e:
             logger.error("evaluation_design_failed", error=str(e))
             return AgentResult(success=False, error=str(e))
@@ -194,6 +198,8 @@ class EvaluationDesignerAgent(BaseAgent):
                 design_principles=data.get("design_principles", []),
             )
 
+        except TRANSIENT_ERRORS:
+            raise
         except Exception as e:
             logger.warning("ai_evaluation_design_failed", error=str(e))
             return self._create_default_evaluation_system(company_data, talent_profile, grading_system)
@@ -7,9 +7,9 @@ company context and talent profile.
 
 from typing import Any
 
-from src.core import AgentResult, BaseAgent, HITLGateId
+from src.core import TRANSIENT_ERRORS, AgentResult, BaseAgent, HITLGateId, LLMPriority
 from src.domain import CompetencyLevel, Grade, GradeTrack, GradingSystem
-from src.utils import get_logger
+from src.utils import JSONArrayItemStream, get_logger
 
 logger = get_logger(__name__)
 
@@ -26,6 +26,8 @@ class GradingDesignerAgent(BaseAgent):
     """
 
     agent_type = "grading_designer"
+    llm_cache_enabled = True
+    llm_priority = LLMPriority.HITL_BLOCKING
 
     SYSTEM_PROMPT = """あなたは人事制度設計の専門家です。
 企業の等級制度を設計してください。
@@ -81,6 +83,8 @@ class GradingDesignerAgent(BaseAgent):
                 hitl_gate_id=HITLGateId.GRADING_SYSTEM.value,
             )
 
+        except TRANSIENT_ERRORS:
+            raise
         except Exception as e:
             logger.error("grading_design_failed", error=str(e))
             return AgentResult(success=False, error=str(e))
@@ -129,12 +133,20 @@ class GradingDesignerAgent(BaseAgent):
 }}"""
 
         try:
-            response = await self.call_llm(
+            # Stream the response and publish each grade as soon as it closes
+            parser = JSONArrayItemStream("grades")
+            partial_grades: list[dict[str, Any]] = []
+            async for chunk in self.call_llm_stream(
                 system_prompt=self.SYSTEM_PROMPT,
                 user_message=user_message,
                 temperature=0.5,
                 max_tokens=4096,
-            )
+            ):
+                completed = [item for _, item in parser.feed(chunk)]
+                if completed:
+                    partial_grades.extend(completed)
+                    await self.publish_progress({"grades": partial_grades})
+            response = parser.text
 
             import json
 
@@ -188,6 +200,8 @@ class GradingDesignerAgent(BaseAgent):
                 design_principles=data.get("design_principles", []),
             )
 
+        except TRANSIENT_ERRORS:
+            raise
         except Exception as e:
             logger.warning("ai_grading_design_failed", error=str(e))
             return self._create_default_grading_system(company_data, talent_profile)
@@ -7,7 +7,7 @@ Generates the Ideal Talent Profile (求める人材像) with
 
 from typing import Any
 
-from src.core import AgentResult, BaseAgent, HITLGateId
+from src.core import TRANSIENT_ERRORS, AgentResult, BaseAgent, HITLGateId, LLMPriority
 from src.domain import Competency, CompetencyElement, GraduationRequirement, IdealTalentProfile
 from src.utils import get_logger
 
@@ -26,6 +26,8 @@ class TalentProfileGeneratorAgent(BaseAgent):
     """
 
     agent_type = "talent_profile_generator"
+    llm_cache_enabled = True
+    llm_priority = LLMPriority.HITL_BLOCKING
 
     SYSTEM_PROMPT = """あなたは人事制度設計の専門家です。
 企業の「求める人材像」を設計してください。
@@ -82,6 +84,8 @@ class TalentProfileGeneratorAgent(BaseAgent):
                 hitl_gate_id=HITLGateId.IDEAL_TALENT_PROFILE.value,
             )
 
+        except TRANSIENT_ERRORS:
+            raise
         except Exception as e:
             logger.error("talent_profile_generation_failed", error=str(e))
             return AgentResult(success=False, error=str(e))
@@ -207,6 +211,8 @@ class TalentProfileGeneratorAgent(BaseAgent):
 
             return profile
 
+        except TRANSIENT_ERRORS:
+            raise
         except Exception as e:
             logger.warning("ai_profile_generation_failed", error=str(e))
             # Return a template profile
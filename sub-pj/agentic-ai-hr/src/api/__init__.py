@@ -1,21 +1,27 @@
 """API module."""
 
 from .middleware import RequestLoggingMiddleware
-from .routes import companies_router, policies_router, reviews_router
+from .routes import admin_router, companies_router, policies_router, reviews_router
 from .schemas import (
     CompanyCreateRequest,
     CompanyResponse,
     HealthResponse,
+    HITLBatchDecisionRequest,
+    HITLBatchDecisionResponse,
     HITLDecisionRequest,
     HITLDecisionResponse,
     HITLRequestResponse,
+    ParkedMessagesResponse,
+    ParkedReplayResponse,
     PolicyOutputResponse,
+    StepPartialOutputResponse,
     WorkflowResponse,
     WorkflowStartRequest,
 )
 
 __all__ = [
     # Routers
+    "admin_router",
     "companies_router",
     "policies_router",
     "reviews_router",
@@ -26,9 +32,14 @@ __all__ = [
     "CompanyResponse",
     "WorkflowStartRequest",
     "WorkflowResponse",
+    "StepPartialOutputResponse",
     "HITLRequestResponse",
     "HITLDecisionRequest",
     "HITLDecisionResponse",
+    "HITLBatchDecisionRequest",
+    "HITLBatchDecisionResponse",
     "PolicyOutputResponse",
+    "ParkedMessagesResponse",
+    "ParkedReplayResponse",
     "HealthResponse",
 ]
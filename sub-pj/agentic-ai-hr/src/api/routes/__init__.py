@@ -1,7 +1,8 @@
 """API routes."""
 
+from .admin import router as admin_router
 from .companies import router as companies_router
 from .policies import router as policies_router
 from .reviews import router as reviews_router
 
-__all__ = ["companies_router", "policies_router", "reviews_router"]
+__all__ = ["admin_router", "companies_router", "policies_router", "reviews_router"]
@@ -0,0 +1,89 @@
+"""Operational admin API routes."""
+
+from typing import Any
+
+from fastapi import APIRouter, HTTPException, Query
+
+from src.agents import AGENT_REGISTRY
+from src.api.schemas import ParkedMessagesResponse, ParkedReplayResponse
+from src.core import Orchestrator, WorkflowStatus
+from src.services import TaskLane, agent_task_queue, get_rabbitmq_client
+from src.utils import get_logger
+
+logger = get_logger(__name__)
+router = APIRouter(prefix="/admin", tags=["admin"])
+
+
+def _task_queue(agent_type: str, lane: TaskLane) -> str:
+    """Get the task queue of a registered agent type."""
+    if agent_type not in AGENT_REGISTRY:
+        raise HTTPException(status_code=404, detail="Unknown agent type")
+    return agent_task_queue(agent_type, lane)
+
+
+async def _retry_parked_step(task: dict[str, Any]) -> None:
+    """
+    Retry the step of a parked agent task.
+
+    Parking failed the step, so the task itself would be skipped; the step
+    is reset and dispatched again instead, as a fresh attempt. Tasks whose
+    step has since moved on are dropped.
+    """
+    workflow_id, step_id = task["workflow_id"], task["step_id"]
+    orchestrator = await Orchestrator.load(workflow_id)
+    if orchestrator is None:
+        logger.warning("task_workflow_missing", workflow_id=workflow_id, step_id=step_id)
+        return
+
+    step = next((s for s in orchestrator.state.steps if s.step_id == step_id), None)
+    if (
+        step is None
+        or step.status != WorkflowStatus.FAILED
+        or task.get("attempt", step.attempt) != step.attempt
+        or not await orchestrator.reset_step(step_id)
+    ):
+        # Retried through the API, or superseded, since the task was parked
+        logger.info("parked_task_stale", workflow_id=workflow_id, step_id=step_id)
+        return
+
+    dispatched = await orchestrator.dispatch_ready_steps()
+    logger.info(
+        "parked_step_retried",
+        workflow_id=workflow_id,
+        step_id=step_id,
+        deferred=step_id not in dispatched,
+    )
+
+
+@router.get("/agents/{agent_type}/parked", response_model=ParkedMessagesResponse)
+async def get_parked_tasks(
+    agent_type: str, lane: TaskLane = TaskLane.INTERACTIVE
+) -> ParkedMessagesResponse:
+    """Get how many tasks of an agent type ran out of retries."""
+    queue_name = _task_queue(agent_type, lane)
+    rabbitmq = await get_rabbitmq_client()
+
+    return ParkedMessagesResponse(
+        queue=queue_name,
+        parked=await rabbitmq.get_parked_count(queue_name),
+    )
+
+
+@router.post("/agents/{agent_type}/parked/replay", response_model=ParkedReplayResponse)
+async def replay_parked_tasks(
+    agent_type: str,
+    lane: TaskLane = TaskLane.INTERACTIVE,
+    limit: int = Query(100, ge=1, le=10000),
+) -> ParkedReplayResponse:
+    """Retry the steps of parked tasks, each with a fresh retry budget."""
+    queue_name = _task_queue(agent_type, lane)
+    rabbitmq = await get_rabbitmq_client()
+    replayed = await rabbitmq.replay_parked(queue_name, limit, replay=_retry_parked_step)
+
+    logger.info("parked_tasks_replayed", agent_type=agent_type, replayed=replayed)
+
+    return ParkedReplayResponse(
+        queue=queue_name,
+        replayed=replayed,
+        remaining=await rabbitmq.get_parked_count(queue_name),
+    )
@@ -6,7 +6,7 @@ from fastapi import APIRouter, HTTPException
 
 from src.api.schemas import CompanyCreateRequest, CompanyResponse
 from src.domain import Company, CompanySize, Industry
-from src.services import get_redis_client
+from src.services import get_read_cache, get_redis_client
 from src.utils import get_logger
 
 logger = get_logger(__name__)
@@ -79,8 +79,7 @@ async def create_company(request: CompanyCreateRequest) -> CompanyResponse:
 @router.get("/{company_id}", response_model=CompanyResponse)
 async def get_company(company_id: str) -> CompanyResponse:
     """Get a company by ID."""
-    redis = await get_redis_client()
-    data = await redis.get_json(f"company:{company_id}")
+    data = await get_read_cache().get_json(f"company:{company_id}")
 
     if not data:
         raise HTTPException(status_code=404, detail="Company not found")
@@ -104,6 +103,7 @@ async def delete_company(company_id: str) -> dict[str, str]:
         raise HTTPException(status_code=404, detail="Company not found")
 
     await redis.delete(f"company:{company_id}")
+    await get_read_cache().invalidate(f"company:{company_id}")
     logger.info("company_deleted", company_id=company_id)
 
     return {"status": "deleted", "company_id": company_id}
@@ -1,13 +1,24 @@
 """Policy generation workflow API routes."""
 
+import json
 from datetime import datetime
 from typing import Any
 
-from fastapi import APIRouter, HTTPException
-
-from src.api.schemas import PolicyOutputResponse, WorkflowResponse, WorkflowStartRequest
-from src.core import Orchestrator
-from src.services import get_redis_client
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import StreamingResponse
+
+from src.api.schemas import (
+    PolicyOutputResponse,
+    StepPartialOutputResponse,
+    WorkflowResponse,
+    WorkflowStartRequest,
+)
+from src.api.sse import event_stream_response
+from src.config import get_settings
+from src.core import Orchestrator, WorkflowStatus
+from src.core.events import workflow_events_key
+from src.core.orchestrator import step_partial_key
+from src.services import TaskLane, get_read_cache, get_redis_client
 from src.utils import get_logger
 
 logger = get_logger(__name__)
@@ -17,22 +28,20 @@ router = APIRouter(prefix="/policies", tags=["policies"])
 @router.post("/workflows", response_model=WorkflowResponse)
 async def start_workflow(request: WorkflowStartRequest) -> WorkflowResponse:
     """Start a new policy generation workflow."""
-    redis = await get_redis_client()
-
     # Verify company exists
-    company_data = await redis.get_json(f"company:{request.company_id}")
+    company_data = await get_read_cache().get_json(f"company:{request.company_id}")
     if not company_data:
         raise HTTPException(status_code=404, detail="Company not found")
 
     # Create orchestrator
-    orchestrator = Orchestrator(request.company_id)
+    orchestrator = Orchestrator(request.company_id, lane=TaskLane(request.lane))
 
     # Start workflow with company data
     await orchestrator.start(company_data)
 
-    # Execute first step
-    if orchestrator.state.steps:
-        await orchestrator.execute_step(orchestrator.state.steps[0].step_id)
+    # Dispatch root steps, unless the event router does on workflow_started
+    if not get_settings().event_router_enabled:
+        await orchestrator.dispatch_ready_steps()
 
     progress = orchestrator.get_progress()
 
@@ -40,6 +49,7 @@ async def start_workflow(request: WorkflowStartRequest) -> WorkflowResponse:
         "workflow_started",
         workflow_id=orchestrator.workflow_id,
         company_id=request.company_id,
+        lane=request.lane,
     )
 
     return WorkflowResponse(
@@ -55,7 +65,7 @@ async def start_workflow(request: WorkflowStartRequest) -> WorkflowResponse:
 @router.get("/workflows/{workflow_id}", response_model=WorkflowResponse)
 async def get_workflow_status(workflow_id: str) -> WorkflowResponse:
     """Get workflow status."""
-    orchestrator = await Orchestrator.load(workflow_id)
+    orchestrator = await Orchestrator.load(workflow_id, cached=True)
 
     if not orchestrator:
         raise HTTPException(status_code=404, detail="Workflow not found")
@@ -72,16 +82,43 @@ async def get_workflow_status(workflow_id: str) -> WorkflowResponse:
     )
 
 
+@router.get("/workflows/{workflow_id}/events")
+async def stream_workflow_events(workflow_id: str, request: Request) -> StreamingResponse:
+    """
+    Stream workflow progress as Server-Sent Events.
+
+    Sends a snapshot of the progress, then workflow_updated and step_progress
+    events until the workflow completes or fails. Reconnect with
+    Last-Event-ID to resume.
+    """
+    orchestrator = await Orchestrator.load(workflow_id, cached=True)
+    if not orchestrator:
+        raise HTTPException(status_code=404, detail="Workflow not found")
+
+    async def snapshot() -> dict[str, Any]:
+        current = await Orchestrator.load(workflow_id, cached=True)
+        return (current or orchestrator).get_progress()
+
+    def is_final(event: str, data: dict[str, Any]) -> bool:
+        return event in ("snapshot", "workflow_updated") and data.get("status") in (
+            WorkflowStatus.COMPLETED.value,
+            WorkflowStatus.FAILED.value,
+        )
+
+    return event_stream_response(
+        request, workflow_events_key(workflow_id), snapshot, is_final
+    )
+
+
 @router.get("/workflows/{workflow_id}/output", response_model=PolicyOutputResponse)
 async def get_workflow_output(workflow_id: str) -> PolicyOutputResponse:
     """Get the complete policy output from a workflow."""
-    orchestrator = await Orchestrator.load(workflow_id)
+    orchestrator = await Orchestrator.load(workflow_id, with_data=True, cached=True)
 
     if not orchestrator:
         raise HTTPException(status_code=404, detail="Workflow not found")
 
-    redis = await get_redis_client()
-    company_data = await redis.get_json(f"company:{orchestrator.state.company_id}")
+    company_data = await get_read_cache().get_json(f"company:{orchestrator.state.company_id}")
     company_name = company_data.get("name", "Unknown") if company_data else "Unknown"
 
     # Collect outputs from all steps
@@ -105,6 +142,25 @@ async def get_workflow_output(workflow_id: str) -> PolicyOutputResponse:
     return PolicyOutputResponse(**output)
 
 
+@router.get(
+    "/workflows/{workflow_id}/steps/{step_id}/partial",
+    response_model=StepPartialOutputResponse,
+)
+async def get_step_partial_output(workflow_id: str, step_id: str) -> StepPartialOutputResponse:
+    """Get the latest partial output published by a step that is still generating."""
+    redis = await get_redis_client()
+    raw = await redis.client.get(step_partial_key(workflow_id, step_id))
+
+    if not raw:
+        raise HTTPException(status_code=404, detail="No partial output for step")
+
+    return StepPartialOutputResponse(
+        workflow_id=workflow_id,
+        step_id=step_id,
+        partial_output=json.loads(raw),
+    )
+
+
 @router.post("/workflows/{workflow_id}/steps/{step_id}/retry")
 async def retry_workflow_step(workflow_id: str, step_id: str) -> WorkflowResponse:
     """Retry a failed workflow step."""
@@ -113,19 +169,18 @@ async def retry_workflow_step(workflow_id: str, step_id: str) -> WorkflowRespons
     if not orchestrator:
         raise HTTPException(status_code=404, detail="Workflow not found")
 
-    # Find the step
-    step = orchestrator._get_step(step_id)
+    step = next((s for s in orchestrator.state.steps if s.step_id == step_id), None)
     if not step:
         raise HTTPException(status_code=404, detail="Step not found")
+    if step.status != WorkflowStatus.FAILED:
+        raise HTTPException(status_code=409, detail="Only failed steps can be retried")
 
-    # Reset step and re-execute
-    from src.core import WorkflowStatus
-    step.status = WorkflowStatus.PENDING
-    step.error = None
-    orchestrator.state.status = WorkflowStatus.RUNNING
+    # Reset the step, then dispatch it like any ready step, within the company
+    # cap; if the cap is reached it is dispatched once a slot is released
+    if not await orchestrator.reset_step(step_id):
+        raise HTTPException(status_code=409, detail="Step changed concurrently; retry")
 
-    await orchestrator._save_state()
-    await orchestrator.execute_step(step_id)
+    dispatched = await orchestrator.dispatch_ready_steps()
 
     progress = orchestrator.get_progress()
 
@@ -133,6 +188,7 @@ async def retry_workflow_step(workflow_id: str, step_id: str) -> WorkflowRespons
         "workflow_step_retried",
         workflow_id=workflow_id,
         step_id=step_id,
+        deferred=step_id not in dispatched,
     )
 
     return WorkflowResponse(
@@ -1,20 +1,79 @@
 """HITL review API routes."""
 
-from fastapi import APIRouter, HTTPException
+import asyncio
+from typing import Any
 
-from src.api.schemas import HITLDecisionRequest, HITLDecisionResponse, HITLRequestResponse
-from src.core import Orchestrator, get_hitl_manager
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+
+from src.api.schemas import (
+    HITLBatchDecisionRequest,
+    HITLBatchDecisionResponse,
+    HITLBatchDecisionResult,
+    HITLDecisionRequest,
+    HITLDecisionResponse,
+    HITLRequestResponse,
+)
+from src.api.sse import event_stream_response
+from src.config import get_settings
+from src.core import HITLRequest, HITLStatus, Orchestrator, WorkflowStatus, get_hitl_manager
+from src.core.events import hitl_events_key
 from src.utils import get_logger
 
 logger = get_logger(__name__)
 router = APIRouter(prefix="/reviews", tags=["reviews"])
 
+# Workflow updates retried after a conflict with a concurrent writer
+MAX_APPLY_ATTEMPTS = 3
+
+
+async def _apply_decisions(workflow_id: str, decisions: list[tuple[str, bool, str | None]]) -> bool:
+    """
+    Apply (step_id, approved, feedback) decisions to a workflow.
+
+    Decisions for steps no longer waiting on review are dropped. Returns
+    False if the workflow kept changing concurrently.
+    """
+    for _ in range(MAX_APPLY_ATTEMPTS):
+        orchestrator = await Orchestrator.load(workflow_id)
+        if not orchestrator:
+            return True
+        waiting_ids = {
+            step.step_id
+            for step in orchestrator.state.steps
+            if step.status == WorkflowStatus.WAITING_HITL
+        }
+        waiting = [decision for decision in decisions if decision[0] in waiting_ids]
+        if not waiting or await orchestrator.on_hitl_decisions(waiting):
+            return True
+
+    logger.warning("hitl_decisions_conflict", workflow_id=workflow_id)
+    return False
+
 
 @router.get("/pending/{company_id}", response_model=list[HITLRequestResponse])
-async def get_pending_reviews(company_id: str) -> list[HITLRequestResponse]:
-    """Get all pending HITL requests for a company."""
+async def get_pending_reviews(
+    company_id: str,
+    response: Response,
+    limit: int = Query(50, ge=1, le=200),
+    cursor: str | None = None,
+) -> list[HITLRequestResponse]:
+    """
+    Get pending HITL requests for a company, newest first.
+
+    When more requests follow, the X-Next-Cursor header carries the cursor
+    for the next page.
+    """
     hitl_manager = get_hitl_manager()
-    requests = await hitl_manager.get_pending_requests(company_id)
+    try:
+        requests, next_cursor = await hitl_manager.get_pending_page(
+            company_id, limit=limit, cursor=cursor
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail="Invalid cursor") from e
+
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
 
     return [
         HITLRequestResponse(
@@ -31,6 +90,27 @@ async def get_pending_reviews(company_id: str) -> list[HITLRequestResponse]:
     ]
 
 
+@router.get("/stream/{company_id}")
+async def stream_reviews(company_id: str, request: Request) -> StreamingResponse:
+    """
+    Stream a company's HITL request changes as Server-Sent Events.
+
+    Sends a snapshot of the newest pending requests, then
+    hitl_request_created and hitl_request_closed events. Reconnect with
+    Last-Event-ID to resume.
+    """
+
+    async def snapshot() -> dict[str, Any]:
+        hitl_manager = get_hitl_manager()
+        requests, next_cursor = await hitl_manager.get_pending_page(company_id, limit=50)
+        return {
+            "pending": [req.model_dump(mode="json", exclude={"data"}) for req in requests],
+            "next_cursor": next_cursor,
+        }
+
+    return event_stream_response(request, hitl_events_key(company_id), snapshot)
+
+
 @router.get("/{request_id}", response_model=HITLRequestResponse)
 async def get_review(request_id: str) -> HITLRequestResponse:
     """Get a specific HITL request."""
@@ -76,15 +156,20 @@ async def submit_decision(
     if not result:
         raise HTTPException(status_code=400, detail="Could not process decision")
 
-    # Update workflow if exists
-    if request.workflow_id and request.step_id:
-        orchestrator = await Orchestrator.load(request.workflow_id)
-        if orchestrator:
-            await orchestrator.on_hitl_decision(
-                request.step_id,
-                decision.approved,
-                decision.feedback,
-            )
+    # Update workflow if exists; the event router applies hitl.responses itself
+    if (
+        request.workflow_id
+        and request.step_id
+        and not get_settings().event_router_enabled
+        and not await _apply_decisions(
+            request.workflow_id,
+            [(request.step_id, decision.approved, decision.feedback)],
+        )
+    ):
+        raise HTTPException(
+            status_code=409,
+            detail="Decision recorded, but the workflow changed concurrently",
+        )
 
     logger.info(
         "hitl_decision_submitted",
@@ -99,6 +184,65 @@ async def submit_decision(
     )
 
 
+@router.post("/decisions:batch", response_model=HITLBatchDecisionResponse)
+async def submit_decisions_batch(
+    batch: HITLBatchDecisionRequest,
+) -> HITLBatchDecisionResponse:
+    """
+    Submit decisions for many HITL requests at once.
+
+    Invalid entries are reported per item without failing the batch. Each
+    affected workflow is loaded and saved once for all of its decisions.
+    """
+    hitl_manager = get_hitl_manager()
+    outcomes = await hitl_manager.submit_decisions(
+        [(d.request_id, d.approved, d.feedback) for d in batch.decisions],
+        decided_by="user",  # In production, get from auth context
+    )
+
+    # Group workflow updates so each workflow state is saved once
+    by_workflow: dict[str, list[tuple[str, bool, str | None]]] = {}
+    for outcome in outcomes:
+        if isinstance(outcome, str) or not (outcome.workflow_id and outcome.step_id):
+            continue
+        by_workflow.setdefault(outcome.workflow_id, []).append(
+            (outcome.step_id, outcome.status == HITLStatus.APPROVED, outcome.feedback)
+        )
+
+    # Decisions whose workflow kept changing concurrently are reported per item
+    conflicted: set[str] = set()
+    if not get_settings().event_router_enabled:
+        applied = await asyncio.gather(
+            *(_apply_decisions(wid, decisions) for wid, decisions in by_workflow.items())
+        )
+        conflicted = {wid for wid, ok in zip(by_workflow, applied, strict=True) if not ok}
+
+    logger.info(
+        "hitl_decisions_batch_submitted",
+        count=len(batch.decisions),
+        workflows=len(by_workflow),
+    )
+
+    def error(outcome: HITLRequest | str) -> str | None:
+        if isinstance(outcome, str):
+            return outcome
+        if outcome.workflow_id in conflicted:
+            return "Decision recorded, but the workflow changed concurrently"
+        return None
+
+    return HITLBatchDecisionResponse(
+        results=[
+            HITLBatchDecisionResult(
+                request_id=decision.request_id,
+                approved=decision.approved,
+                decided_at=None if isinstance(outcome, str) else outcome.decided_at,
+                error=error(outcome),
+            )
+            for decision, outcome in zip(batch.decisions, outcomes, strict=True)
+        ]
+    )
+
+
 @router.post("/{request_id}/cancel")
 async def cancel_review(request_id: str) -> dict[str, str]:
     """Cancel a pending HITL request."""
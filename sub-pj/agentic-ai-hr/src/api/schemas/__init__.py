@@ -1,7 +1,7 @@
 """API request and response schemas."""
 
 from datetime import datetime
-from typing import Any
+from typing import Any, Literal
 
 from pydantic import BaseModel, Field
 
@@ -43,6 +43,10 @@ class WorkflowStartRequest(BaseModel):
     """Request to start a policy generation workflow."""
 
     company_id: str
+    lane: Literal["interactive", "batch"] = Field(
+        default="interactive",
+        description="Task lane; use batch for bulk runs so live sessions are not delayed",
+    )
 
 
 class WorkflowResponse(BaseModel):
@@ -56,6 +60,14 @@ class WorkflowResponse(BaseModel):
     steps: list[dict[str, str]]
 
 
+class StepPartialOutputResponse(BaseModel):
+    """Partial output of a step that is still generating."""
+
+    workflow_id: str
+    step_id: str
+    partial_output: dict[str, Any]
+
+
 # HITL schemas
 class HITLRequestResponse(BaseModel):
     """HITL request response."""
@@ -85,6 +97,35 @@ class HITLDecisionResponse(BaseModel):
     decided_at: datetime
 
 
+class HITLBatchDecisionItem(BaseModel):
+    """One decision in a batch."""
+
+    request_id: str
+    approved: bool
+    feedback: str | None = None
+
+
+class HITLBatchDecisionRequest(BaseModel):
+    """Request to submit many HITL decisions at once."""
+
+    decisions: list[HITLBatchDecisionItem] = Field(min_length=1, max_length=500)
+
+
+class HITLBatchDecisionResult(BaseModel):
+    """Outcome of one decision in a batch."""
+
+    request_id: str
+    approved: bool
+    decided_at: datetime | None = None
+    error: str | None = None
+
+
+class HITLBatchDecisionResponse(BaseModel):
+    """Batch HITL decision response."""
+
+    results: list[HITLBatchDecisionResult]
+
+
 # Policy output schemas
 class PolicyOutputResponse(BaseModel):
     """Complete policy output response."""
@@ -98,6 +139,22 @@ class PolicyOutputResponse(BaseModel):
     generated_at: datetime
 
 
+# Admin schemas
+class ParkedMessagesResponse(BaseModel):
+    """Parked task messages of an agent queue."""
+
+    queue: str
+    parked: int
+
+
+class ParkedReplayResponse(BaseModel):
+    """Result of replaying parked task messages."""
+
+    queue: str
+    replayed: int
+    remaining: int
+
+
 # Health check
 class HealthResponse(BaseModel):
     """Health check response."""
@@ -112,9 +169,16 @@ __all__ = [
     "CompanyResponse",
     "WorkflowStartRequest",
     "WorkflowResponse",
+    "StepPartialOutputResponse",
     "HITLRequestResponse",
     "HITLDecisionRequest",
     "HITLDecisionResponse",
+    "HITLBatchDecisionItem",
+    "HITLBatchDecisionRequest",
+    "HITLBatchDecisionResult",
+    "HITLBatchDecisionResponse",
     "PolicyOutputResponse",
+    "ParkedMessagesResponse",
+    "ParkedReplayResponse",
     "HealthResponse",
 ]
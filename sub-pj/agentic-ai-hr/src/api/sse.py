@@ -0,0 +1,110 @@
+"""
+Server-Sent Events responses backed by Redis event streams.
+
+Each connection sends a snapshot, then tails the stream with a blocking read.
+Frames are produced only as fast as the client takes them, a comment line
+keeps idle connections open, and the number of open streams per process is
+capped because each one holds a Redis connection while blocked.
+"""
+
+import json
+import weakref
+from collections.abc import AsyncIterator, Awaitable, Callable
+from typing import Any
+
+from fastapi import HTTPException, Request
+from fastapi.responses import StreamingResponse
+from starlette.types import Receive, Scope, Send
+
+from src.config import get_settings
+from src.core.events import get_last_event_id, read_events
+from src.utils import get_logger
+
+logger = get_logger(__name__)
+
+# Open SSE connections in this process
+_open_streams = 0
+
+
+def format_event(event_id: str, event: str, data: str) -> str:
+    """Format one SSE frame."""
+    return f"id: {event_id}\nevent: {event}\ndata: {data}\n\n"
+
+
+def _release_stream_slot() -> None:
+    """Give back a slot reserved by EventStreamResponse."""
+    global _open_streams
+    _open_streams -= 1
+
+
+class EventStreamResponse(StreamingResponse):
+    """
+    Streaming response holding one of the process's open stream slots.
+
+    The slot is reserved on creation, so concurrent requests cannot overshoot
+    the cap, and released once the response has been sent, or when it is
+    garbage collected if it never is.
+    """
+
+    def __init__(self, content: AsyncIterator[str], **kwargs: Any) -> None:
+        global _open_streams
+        if _open_streams >= get_settings().sse_max_connections:
+            raise HTTPException(status_code=503, detail="Too many open event streams")
+        _open_streams += 1
+        self._release_slot = weakref.finalize(self, _release_stream_slot)
+        super().__init__(content, **kwargs)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            self._release_slot()
+
+
+def event_stream_response(
+    request: Request,
+    stream_key: str,
+    snapshot: Callable[[], Awaitable[dict[str, Any]]],
+    is_final: Callable[[str, dict[str, Any]], bool] | None = None,
+) -> StreamingResponse:
+    """
+    Stream a Redis event stream to the client as SSE.
+
+    Without a Last-Event-ID header the client first gets a snapshot event
+    stamped with the stream's current position; with one, it resumes right
+    after that event. The stream ends once is_final returns True for an
+    event's (name, data).
+    """
+    settings = get_settings()
+
+    async def generate() -> AsyncIterator[str]:
+        try:
+            last_event_id = request.headers.get("last-event-id")
+            if not last_event_id:
+                last_event_id = await get_last_event_id(stream_key)
+                state = await snapshot()
+                yield format_event(last_event_id, "snapshot", json.dumps(state))
+                if is_final and is_final("snapshot", state):
+                    return
+
+            while not await request.is_disconnected():
+                events = await read_events(
+                    stream_key, last_event_id, block_ms=settings.sse_heartbeat_seconds * 1000
+                )
+                if not events:
+                    yield ": keep-alive\n\n"
+                    continue
+
+                for event_id, event, data in events:
+                    last_event_id = event_id
+                    yield format_event(event_id, event, data)
+                    if is_final and is_final(event, json.loads(data)):
+                        return
+        finally:
+            logger.debug("event_stream_closed", stream=stream_key)
+
+    return EventStreamResponse(
+        generate(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
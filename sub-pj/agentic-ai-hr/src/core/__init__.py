@@ -1,6 +1,8 @@
 """Core modules for agent orchestration and HITL."""
 
-from .agent_base import AgentResult, AgentState, AgentStatus, BaseAgent
+from .agent_base import TRANSIENT_ERRORS, AgentResult, AgentState, AgentStatus, BaseAgent
+from .heartbeat import HeartbeatService, get_heartbeat_service
+from .hitl_expiry import HITLExpirySweeper, get_hitl_expiry_sweeper
 from .hitl_manager import (
     HITLDecision,
     HITLGateId,
@@ -9,18 +11,41 @@ from .hitl_manager import (
     HITLStatus,
     get_hitl_manager,
 )
-from .orchestrator import Orchestrator, WorkflowState, WorkflowStatus, WorkflowStep
+from .llm_cache import LLMResponseCache, get_llm_cache
+from .orchestrator import (
+    Orchestrator,
+    WorkflowState,
+    WorkflowStatus,
+    WorkflowStep,
+)
+from .rate_limiter import GeminiRateLimiter, LLMPriority, get_rate_limiter
+from .single_flight import SingleFlight, get_single_flight
+from .workflow_signals import WorkflowSignals, get_workflow_signals
 
 __all__ = [
     "BaseAgent",
     "AgentState",
     "AgentStatus",
     "AgentResult",
+    "TRANSIENT_ERRORS",
+    "HeartbeatService",
+    "get_heartbeat_service",
+    "LLMResponseCache",
+    "get_llm_cache",
+    "SingleFlight",
+    "get_single_flight",
+    "GeminiRateLimiter",
+    "LLMPriority",
+    "get_rate_limiter",
     "Orchestrator",
     "WorkflowState",
     "WorkflowStatus",
     "WorkflowStep",
+    "WorkflowSignals",
+    "get_workflow_signals",
     "HITLManager",
+    "HITLExpirySweeper",
+    "get_hitl_expiry_sweeper",
     "HITLRequest",
     "HITLDecision",
     "HITLStatus",
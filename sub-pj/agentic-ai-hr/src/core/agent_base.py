@@ -5,22 +5,51 @@ Provides common functionality for agent lifecycle, state management,
 LLM interaction, and HITL integration.
 """
 
-import asyncio
+import json
 from abc import ABC, abstractmethod
+from collections.abc import AsyncIterator
 from datetime import datetime
 from enum import Enum
 from typing import Any
 from uuid import uuid4
 
 import google.generativeai as genai
+from google.api_core import exceptions as google_exceptions
 from pydantic import BaseModel, Field
 
 from src.config import get_settings
-from src.services import get_rabbitmq_client, get_redis_client
+from src.core.events import add_event, workflow_events_key
+from src.core.heartbeat import get_heartbeat_service
+from src.core.hitl_manager import HITLRequest, get_hitl_manager
+from src.core.llm_cache import LLMResponseCache, get_llm_cache
+from src.core.orchestrator import (
+    PARTIAL_OUTPUT_TTL_SECONDS,
+    WORKFLOW_TTL_SECONDS,
+    step_partial_key,
+)
+from src.core.rate_limiter import LLMPriority, get_rate_limiter
+from src.core.single_flight import SharedCallError, get_single_flight
+from src.services import (
+    TaskLane,
+    get_async_vault_client,
+    get_redis_client,
+)
 from src.utils import get_logger
 
 logger = get_logger(__name__)
 
+# Errors that say nothing about the step itself: rate limits, server errors
+# and timeouts. They propagate from BaseAgent.run so the worker retries the
+# task with backoff instead of failing the step. A call shared with another
+# process loses its error type and is retried too, within the same budget.
+TRANSIENT_ERRORS: tuple[type[Exception], ...] = (
+    google_exceptions.TooManyRequests,
+    google_exceptions.ServerError,
+    TimeoutError,
+    ConnectionError,
+    SharedCallError,
+)
+
 
 class AgentStatus(str, Enum):
     """Agent execution status."""
@@ -40,6 +69,8 @@ class AgentState(BaseModel):
     status: AgentStatus = AgentStatus.IDLE
     company_id: str | None = None
     session_id: str | None = None
+    workflow_id: str | None = None
+    step_id: str | None = None
     current_step: str = ""
     context: dict[str, Any] = Field(default_factory=dict)
     created_at: datetime = Field(default_factory=datetime.utcnow)
@@ -62,25 +93,52 @@ class BaseAgent(ABC):
 
     agent_type: str = "base"
 
-    def __init__(self, company_id: str, session_id: str | None = None) -> None:
+    # Opt in to the shared LLM response cache for this agent's calls
+    llm_cache_enabled: bool = False
+
+    # Rate limiter priority for this agent's LLM calls in the interactive
+    # lane; calls of tasks in the batch lane always use LLMPriority.BATCH
+    llm_priority: LLMPriority = LLMPriority.NORMAL
+
+    def __init__(
+        self,
+        company_id: str,
+        session_id: str | None = None,
+        workflow_id: str | None = None,
+        step_id: str | None = None,
+        lane: TaskLane = TaskLane.INTERACTIVE,
+    ) -> None:
+        self.lane = lane
         self.state = AgentState(
             agent_type=self.agent_type,
             company_id=company_id,
             session_id=session_id,
+            workflow_id=workflow_id,
+            step_id=step_id,
         )
         self._gemini_model: genai.GenerativeModel | None = None
-        self._heartbeat_task: asyncio.Task[None] | None = None
 
     @property
     def agent_id(self) -> str:
         """Get the agent ID."""
         return self.state.agent_id
 
-    def _get_gemini_model(self) -> genai.GenerativeModel:
-        """Get or create Gemini model."""
+    async def _get_gemini_model(self) -> genai.GenerativeModel:
+        """
+        Get or create Gemini model.
+
+        The API key is read from Vault through the async client's cache,
+        falling back to the settings if Vault is unreachable.
+        """
         if self._gemini_model is None:
             settings = get_settings()
-            genai.configure(api_key=settings.gemini_api_key)
+            try:
+                vault = await get_async_vault_client()
+                api_key = await vault.get_gemini_api_key()
+            except Exception as e:
+                logger.warning("vault_unavailable", agent_id=self.agent_id, error=str(e))
+                api_key = settings.gemini_api_key
+            genai.configure(api_key=api_key)
             self._gemini_model = genai.GenerativeModel(settings.gemini_model)
         return self._gemini_model
 
@@ -94,26 +152,20 @@ class BaseAgent(ABC):
         )
 
     async def _start_heartbeat(self) -> None:
-        """Start heartbeat loop."""
-        settings = get_settings()
-
-        async def heartbeat_loop() -> None:
-            redis = await get_redis_client()
-            while True:
-                await redis.update_agent_heartbeat(self.agent_id)
-                await asyncio.sleep(settings.agent_heartbeat_interval_seconds)
-
-        self._heartbeat_task = asyncio.create_task(heartbeat_loop())
+        """Register with the process-wide heartbeat service."""
+        await get_heartbeat_service().register(self.agent_id)
 
     async def _stop_heartbeat(self) -> None:
-        """Stop heartbeat loop."""
-        if self._heartbeat_task:
-            self._heartbeat_task.cancel()
-            try:
-                await self._heartbeat_task
-            except asyncio.CancelledError:
-                pass
-            self._heartbeat_task = None
+        """Unregister from the heartbeat service."""
+        await get_heartbeat_service().unregister(self.agent_id)
+
+    def _llm_priority(self, priority: LLMPriority | None = None) -> LLMPriority:
+        """Rate limiter priority of a call: as given, else derived from the lane."""
+        if priority is not None:
+            return priority
+        if self.lane == TaskLane.BATCH:
+            return LLMPriority.BATCH
+        return self.llm_priority
 
     async def call_llm(
         self,
@@ -121,9 +173,152 @@ class BaseAgent(ABC):
         user_message: str,
         max_tokens: int = 4096,
         temperature: float = 0.7,
+        use_cache: bool = True,
+        priority: LLMPriority | None = None,
+    ) -> str:
+        """
+        Call Gemini API with the given prompts.
+
+        Agents with llm_cache_enabled serve byte-identical requests from the
+        LLM response cache; pass use_cache=False to force a fresh generation.
+        Identical concurrent requests share one in-flight generation, unless
+        use_cache is False. Generations wait for the shared Gemini rate
+        limiter at the priority given, else at the one of the agent's lane.
+        """
+        settings = get_settings()
+        request_key = LLMResponseCache.make_key(
+            settings.gemini_model, system_prompt, user_message, temperature, max_tokens
+        )
+        cache_enabled = self.llm_cache_enabled and use_cache
+        if cache_enabled:
+            cached = await get_llm_cache().get(request_key)
+            if cached is not None:
+                logger.debug("llm_cache_hit", agent_type=self.agent_type, key=request_key)
+                return cached
+
+        async def generate() -> str:
+            text = await self._generate(
+                system_prompt,
+                user_message,
+                max_tokens,
+                temperature,
+                self._llm_priority(priority),
+            )
+            if cache_enabled:
+                await get_llm_cache().set(request_key, text)
+            return text
+
+        if not use_cache:
+            return await generate()
+        return await get_single_flight().do(request_key, generate)
+
+    async def call_llm_stream(
+        self,
+        system_prompt: str,
+        user_message: str,
+        max_tokens: int = 4096,
+        temperature: float = 0.7,
+        use_cache: bool = True,
+        priority: LLMPriority | None = None,
+    ) -> AsyncIterator[str]:
+        """
+        Call Gemini API and yield the response text as it is generated.
+
+        Shares the response cache and rate limiter with call_llm. A cache hit
+        is yielded as a single chunk; streams are not coalesced.
+        """
+        settings = get_settings()
+        request_key = LLMResponseCache.make_key(
+            settings.gemini_model, system_prompt, user_message, temperature, max_tokens
+        )
+        cache_enabled = self.llm_cache_enabled and use_cache
+        if cache_enabled:
+            cached = await get_llm_cache().get(request_key)
+            if cached is not None:
+                yield cached
+                return
+
+        await self._acquire_rate_limit(
+            system_prompt, user_message, max_tokens, self._llm_priority(priority)
+        )
+        model = await self._get_gemini_model()
+        response = await model.generate_content_async(
+            f"{system_prompt}\n\n{user_message}",
+            generation_config=genai.GenerationConfig(
+                max_output_tokens=max_tokens,
+                temperature=temperature,
+            ),
+            stream=True,
+        )
+
+        chunks: list[str] = []
+        async for chunk in response:
+            text: str = chunk.text
+            chunks.append(text)
+            yield text
+
+        if cache_enabled:
+            await get_llm_cache().set(request_key, "".join(chunks))
+
+    async def publish_progress(self, partial_output: dict[str, Any]) -> None:
+        """
+        Publish partial step output while the agent is still running.
+
+        Stored under the step's partial output key until the step's result
+        is recorded, or PARTIAL_OUTPUT_TTL_SECONDS after the last update if
+        it never is, and appended as a step_progress event to the workflow's
+        event stream. No-op for agents not running as a workflow step.
+        """
+        workflow_id, step_id = self.state.workflow_id, self.state.step_id
+        if not workflow_id or not step_id:
+            return
+
+        payload = json.dumps(partial_output)
+        try:
+            redis = await get_redis_client()
+            async with redis.pipeline(transaction=False) as pipe:
+                pipe.set(
+                    step_partial_key(workflow_id, step_id),
+                    payload,
+                    ex=PARTIAL_OUTPUT_TTL_SECONDS,
+                )
+                add_event(
+                    pipe,
+                    workflow_events_key(workflow_id),
+                    "step_progress",
+                    {"step_id": step_id, "partial_output": partial_output},
+                    WORKFLOW_TTL_SECONDS,
+                )
+        except Exception as e:
+            logger.warning("progress_publish_failed", agent_id=self.agent_id, error=str(e))
+
+    async def _acquire_rate_limit(
+        self,
+        system_prompt: str,
+        user_message: str,
+        max_tokens: int,
+        priority: LLMPriority,
+    ) -> None:
+        """Wait until the shared Gemini rate limiter admits a generation."""
+        settings = get_settings()
+        if not settings.gemini_rate_limit_enabled:
+            return
+        # Rough upper bound: ~2 characters per token for Japanese prompts,
+        # plus the full output budget
+        estimated_tokens = (len(system_prompt) + len(user_message)) // 2 + max_tokens
+        await get_rate_limiter().acquire(settings.gemini_model, estimated_tokens, priority)
+
+    async def _generate(
+        self,
+        system_prompt: str,
+        user_message: str,
+        max_tokens: int,
+        temperature: float,
+        priority: LLMPriority,
     ) -> str:
-        """Call Gemini API with the given prompts."""
-        model = self._get_gemini_model()
+        """Run one Gemini generation once the rate limiter admits it."""
+        await self._acquire_rate_limit(system_prompt, user_message, max_tokens, priority)
+        model = await self._get_gemini_model()
 
         # Combine system prompt and user message for Gemini
         full_prompt = f"{system_prompt}\n\n{user_message}"
@@ -137,7 +332,8 @@ class BaseAgent(ABC):
             full_prompt,
             generation_config=generation_config,
         )
-        return response.text
+        text: str = response.text
+        return text
 
     async def request_hitl_approval(
         self,
@@ -146,37 +342,42 @@ class BaseAgent(ABC):
         description: str,
         data: dict[str, Any],
         timeout_hours: int | None = None,
-    ) -> None:
-        """Request HITL approval and wait."""
-        settings = get_settings()
-        timeout = timeout_hours or settings.hitl_default_timeout_hours
+    ) -> HITLRequest:
+        """
+        Open the HITL review of this agent's output.
+
+        The review is stored with the agent's workflow step, which waits on
+        it once the agent returns a result with requires_hitl.
+        """
+        company_id = self.state.company_id
+        if company_id is None:
+            raise RuntimeError("HITL reviews require the agent's company")
 
         self.state.status = AgentStatus.WAITING_HITL
         self.state.current_step = f"waiting_hitl:{gate_id}"
         await self._save_state()
 
-        rabbitmq = await get_rabbitmq_client()
-        await rabbitmq.publish_hitl_request(
-            {
-                "agent_id": self.agent_id,
-                "agent_type": self.agent_type,
-                "company_id": self.state.company_id,
-                "session_id": self.state.session_id,
-                "gate_id": gate_id,
-                "title": title,
-                "description": description,
-                "data": data,
-                "timeout_hours": timeout,
-                "requested_at": datetime.utcnow().isoformat(),
-            }
+        request = await get_hitl_manager().create_request(
+            gate_id=gate_id,
+            agent_id=self.agent_id,
+            agent_type=self.agent_type,
+            company_id=company_id,
+            title=title,
+            description=description,
+            data=data,
+            workflow_id=self.state.workflow_id,
+            step_id=self.state.step_id,
+            session_id=self.state.session_id,
+            timeout_hours=timeout_hours,
         )
 
         logger.info(
             "hitl_requested",
             agent_id=self.agent_id,
             gate_id=gate_id,
-            timeout_hours=timeout,
+            request_id=request.request_id,
         )
+        return request
 
     @abstractmethod
     async def execute(self, input_data: dict[str, Any]) -> AgentResult:
@@ -184,7 +385,12 @@ class BaseAgent(ABC):
         ...
 
     async def run(self, input_data: dict[str, Any]) -> AgentResult:
-        """Run the agent with lifecycle management."""
+        """
+        Run the agent with lifecycle management.
+
+        Errors are returned as a failed result, except TRANSIENT_ERRORS, which
+        propagate so the task can be retried.
+        """
         try:
             await self._start_heartbeat()
             self.state.status = AgentStatus.RUNNING
@@ -220,6 +426,15 @@ class BaseAgent(ABC):
 
             return result
 
+        except TRANSIENT_ERRORS as e:
+            logger.warning(
+                "agent_transient_error",
+                agent_id=self.agent_id,
+                error_type=type(e).__name__,
+                error=str(e),
+            )
+            raise
+
         except Exception as e:
             self.state.status = AgentStatus.FAILED
             self.state.error = str(e)
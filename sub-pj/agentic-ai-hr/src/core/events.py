@@ -0,0 +1,75 @@
+"""
+Change events for push clients.
+
+State changes are appended to capped Redis streams, one per workflow and one
+per company for HITL requests. Streams keep recent history, so a client that
+reconnects with the last event ID it saw resumes without missing changes.
+"""
+
+import json
+from typing import Any, cast
+
+from redis.asyncio.client import Pipeline
+
+from src.config import get_settings
+from src.services import get_redis_client
+
+# How long a company's HITL event stream outlives its last event
+HITL_EVENTS_TTL_SECONDS = 7 * 86400
+
+# Stream entries as read on the decoded client: (event_id, fields)
+StreamEntries = list[tuple[str, dict[str, str]]]
+
+
+def workflow_events_key(workflow_id: str) -> str:
+    """Stream of a workflow's progress events."""
+    return f"workflow:events:{workflow_id}"
+
+
+def hitl_events_key(company_id: str) -> str:
+    """Stream of a company's HITL request events."""
+    return f"hitl:events:{company_id}"
+
+
+def add_event(
+    pipe: Pipeline,
+    key: str,
+    event: str,
+    data: dict[str, Any],
+    ttl_seconds: int,
+) -> None:
+    """Queue an event append, trimming the stream to its configured length."""
+    settings = get_settings()
+    pipe.xadd(
+        key,
+        {"event": event, "data": json.dumps(data)},
+        maxlen=settings.event_stream_maxlen,
+        approximate=True,
+    )
+    pipe.expire(key, ttl_seconds)
+
+
+async def get_last_event_id(key: str) -> str:
+    """Get the ID of the newest event in a stream, or "0-0" when empty."""
+    redis = await get_redis_client()
+    entries = cast(StreamEntries, await redis.client.xrevrange(key, count=1))
+    return entries[0][0] if entries else "0-0"
+
+
+async def read_events(
+    key: str, last_event_id: str, block_ms: int, count: int = 100
+) -> list[tuple[str, str, str]]:
+    """
+    Read events after last_event_id as (event_id, event, data) tuples.
+
+    Blocks up to block_ms when none are available yet.
+    """
+    redis = await get_redis_client()
+    response = cast(
+        list[tuple[str, StreamEntries]],
+        await redis.client.xread({key: last_event_id}, count=count, block=block_ms),
+    )
+    if not response:
+        return []
+    _, entries = response[0]
+    return [(event_id, fields["event"], fields["data"]) for event_id, fields in entries]
@@ -0,0 +1,99 @@
+"""
+Process-wide agent heartbeats.
+
+Agents register with a single heartbeat service instead of running their own
+timers. Every interval the service refreshes all live agents in one pipelined
+write to the agent:heartbeats sorted set, so Redis traffic per process stays
+constant regardless of how many agents it runs.
+"""
+
+import asyncio
+import contextlib
+import time
+from typing import Any
+
+from src.config import get_settings
+from src.services import get_redis_client
+from src.utils import get_logger
+
+logger = get_logger(__name__)
+
+# Heartbeats older than this are dropped from the sorted set
+HEARTBEAT_RETENTION_SECONDS = 86400
+
+
+class HeartbeatService:
+    """Refreshes the heartbeats of all agents running in this process."""
+
+    def __init__(self, interval_seconds: float) -> None:
+        self._interval_seconds = interval_seconds
+        self._agent_ids: set[str] = set()
+        self._task: asyncio.Task[None] | None = None
+        self.ticks = 0
+        self.failures = 0
+
+    async def register(self, agent_id: str) -> None:
+        """Start beating for an agent, marking it alive immediately."""
+        self._agent_ids.add(agent_id)
+        redis = await get_redis_client()
+        await redis.update_agent_heartbeat(agent_id)
+
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def unregister(self, agent_id: str) -> None:
+        """Stop beating for an agent and drop its heartbeat."""
+        self._agent_ids.discard(agent_id)
+        try:
+            redis = await get_redis_client()
+            await redis.remove_agent_heartbeats([agent_id])
+        except Exception as e:
+            logger.warning("heartbeat_remove_failed", agent_id=agent_id, error=str(e))
+
+    async def _run(self) -> None:
+        """Refresh every registered agent once per interval while any remain."""
+        while self._agent_ids:
+            await asyncio.sleep(self._interval_seconds)
+            if not self._agent_ids:
+                break
+            try:
+                redis = await get_redis_client()
+                await redis.update_agent_heartbeats(
+                    list(self._agent_ids),
+                    prune_before=time.time() - HEARTBEAT_RETENTION_SECONDS,
+                )
+                self.ticks += 1
+            except Exception as e:
+                self.failures += 1
+                logger.warning("heartbeat_tick_failed", agents=len(self._agent_ids), error=str(e))
+
+    async def stop(self) -> None:
+        """Stop the refresh loop."""
+        if self._task:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+
+    def get_stats(self) -> dict[str, Any]:
+        """Get heartbeat counters."""
+        return {
+            "agents": len(self._agent_ids),
+            "ticks": self.ticks,
+            "failures": self.failures,
+        }
+
+
+# Singleton instance
+_heartbeat_service: HeartbeatService | None = None
+
+
+def get_heartbeat_service() -> HeartbeatService:
+    """Get heartbeat service singleton."""
+    global _heartbeat_service
+    if _heartbeat_service is None:
+        settings = get_settings()
+        _heartbeat_service = HeartbeatService(
+            interval_seconds=settings.agent_heartbeat_interval_seconds,
+        )
+    return _heartbeat_service
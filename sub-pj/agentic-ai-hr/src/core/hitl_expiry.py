@@ -0,0 +1,191 @@
+"""
+Background expiry of HITL requests.
+
+Pending requests are indexed in the hitl:expiry sorted set by expires_at. A
+sweeper on every API replica competes for a short Redis lease; the leader
+claims due entries in batches, marks them expired, publishes the rejection
+and fails the gated workflow step so it stops holding capacity.
+"""
+
+import asyncio
+import contextlib
+import time
+from typing import Any
+from uuid import uuid4
+
+from src.config import get_settings
+from src.core.hitl_manager import HITL_EXPIRY_KEY, HITLStatus, get_hitl_manager
+from src.core.orchestrator import Orchestrator, WorkflowStatus
+from src.services import get_redis_client
+from src.utils import get_logger
+
+logger = get_logger(__name__)
+
+HITL_EXPIRY_LEADER_KEY = "hitl:expiry:leader"
+
+# Claims up to ARGV[2] entries due at ARGV[1] by pushing their score to
+# ARGV[3], so a sweeper that dies mid-batch leaves them to be retried later.
+# Entries are removed from the set when their request is closed.
+# KEYS[1] = expiry sorted set
+_CLAIM_DUE_SCRIPT = """
+local due = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1], 'LIMIT', 0, tonumber(ARGV[2]))
+for _, member in ipairs(due) do
+    redis.call('ZADD', KEYS[1], ARGV[3], member)
+end
+return due
+"""
+
+# Extends the lease if still held by the given owner, or takes it if free
+# KEYS[1] = leader key, ARGV[1] = owner token, ARGV[2] = lease in milliseconds
+_ACQUIRE_LEASE_SCRIPT = """
+local owner = redis.call('GET', KEYS[1])
+if owner == ARGV[1] then
+    redis.call('PEXPIRE', KEYS[1], ARGV[2])
+    return 1
+end
+if not owner then
+    redis.call('SET', KEYS[1], ARGV[1], 'PX', ARGV[2])
+    return 1
+end
+return 0
+"""
+
+# Releases the lease only if it is still held by the given owner token
+_RELEASE_LEASE_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+class HITLExpirySweeper:
+    """Expires overdue HITL requests while holding the sweeper lease."""
+
+    def __init__(
+        self, interval_seconds: float, batch_size: int, event_router_enabled: bool = False
+    ) -> None:
+        self._interval_seconds = interval_seconds
+        self._batch_size = batch_size
+        self._event_router_enabled = event_router_enabled
+        self._token = str(uuid4())
+        self._task: asyncio.Task[None] | None = None
+        self.is_leader = False
+        self.expired = 0
+
+    def start(self) -> None:
+        """Start the sweep loop."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the sweep loop and give up the lease."""
+        if self._task:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+
+        if self.is_leader:
+            try:
+                redis = await get_redis_client()
+                await redis.client.eval(
+                    _RELEASE_LEASE_SCRIPT, 1, HITL_EXPIRY_LEADER_KEY, self._token
+                )
+            except Exception as e:
+                logger.warning("hitl_expiry_release_failed", error=str(e))
+            self.is_leader = False
+
+    async def _run(self) -> None:
+        """Renew the lease and sweep once per interval."""
+        lease_ms = int(self._interval_seconds * 3 * 1000)
+        while True:
+            try:
+                redis = await get_redis_client()
+                self.is_leader = bool(
+                    await redis.client.eval(
+                        _ACQUIRE_LEASE_SCRIPT,
+                        1,
+                        HITL_EXPIRY_LEADER_KEY,
+                        self._token,
+                        lease_ms,
+                    )
+                )
+                if self.is_leader:
+                    # Drain a backlog in consecutive batches before sleeping
+                    while await self.sweep() == self._batch_size:
+                        pass
+            except Exception as e:
+                logger.warning("hitl_expiry_sweep_failed", error=str(e))
+            await asyncio.sleep(self._interval_seconds)
+
+    async def sweep(self) -> int:
+        """Expire one batch of due requests and return how many were claimed."""
+        redis = await get_redis_client()
+        now = time.time()
+        request_ids = await redis.client.eval(
+            _CLAIM_DUE_SCRIPT,
+            1,
+            HITL_EXPIRY_KEY,
+            now,
+            self._batch_size,
+            now + self._interval_seconds * 10,
+        )
+        if not request_ids:
+            return 0
+
+        hitl_manager = get_hitl_manager()
+        requests = await hitl_manager.get_requests(request_ids)
+
+        # Requests that vanished or closed without unindexing need no expiry
+        pending_ids = {r.request_id for r in requests if r.status == HITLStatus.PENDING}
+        stale_ids = [request_id for request_id in request_ids if request_id not in pending_ids]
+        if stale_ids:
+            await redis.client.zrem(HITL_EXPIRY_KEY, *stale_ids)
+
+        expired = 0
+        for request in requests:
+            if request.status != HITLStatus.PENDING:
+                continue
+            # A decision that lands first wins; the request is then left alone
+            if not await hitl_manager.expire_request(request.request_id):
+                continue
+            expired += 1
+
+            # With the event router, the published rejection fails the step
+            if request.workflow_id and request.step_id and not self._event_router_enabled:
+                await self._fail_gated_step(request.workflow_id, request.step_id)
+
+        self.expired += expired
+        logger.info("hitl_expiry_swept", claimed=len(request_ids), expired=expired)
+        return len(request_ids)
+
+    async def _fail_gated_step(self, workflow_id: str, step_id: str) -> None:
+        """Reject the workflow step still waiting on an expired request."""
+        orchestrator = await Orchestrator.load(workflow_id)
+        if not orchestrator:
+            return
+        step = next((s for s in orchestrator.state.steps if s.step_id == step_id), None)
+        if step and step.status == WorkflowStatus.WAITING_HITL:
+            await orchestrator.on_hitl_decision(step_id, False, "Approval request expired")
+
+    def get_stats(self) -> dict[str, Any]:
+        """Get sweeper counters."""
+        return {"is_leader": self.is_leader, "expired": self.expired}
+
+
+# Singleton instance
+_hitl_expiry_sweeper: HITLExpirySweeper | None = None
+
+
+def get_hitl_expiry_sweeper() -> HITLExpirySweeper:
+    """Get HITL expiry sweeper singleton."""
+    global _hitl_expiry_sweeper
+    if _hitl_expiry_sweeper is None:
+        settings = get_settings()
+        _hitl_expiry_sweeper = HITLExpirySweeper(
+            interval_seconds=settings.hitl_expiry_sweep_interval_seconds,
+            batch_size=settings.hitl_expiry_batch_size,
+            event_router_enabled=settings.event_router_enabled,
+        )
+    return _hitl_expiry_sweeper
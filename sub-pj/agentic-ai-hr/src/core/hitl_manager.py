@@ -5,20 +5,39 @@ Manages approval gates, notifications, and decision tracking
 for critical HR policy decisions.
 """
 
-from datetime import datetime, timedelta
+from collections.abc import Callable
+from datetime import UTC, datetime, timedelta
 from enum import Enum
 from typing import Any
 from uuid import uuid4
 
 from pydantic import BaseModel, Field
+from redis.asyncio.client import Pipeline
+from redis.exceptions import WatchError
 
 from src.config import get_settings
-from src.services import get_rabbitmq_client, get_redis_client
+from src.core.events import HITL_EVENTS_TTL_SECONDS, add_event, hitl_events_key
+from src.services import codec, get_rabbitmq_client, get_redis_client
+from src.services.idempotency import hitl_response_key
 from src.utils import get_logger
 
 logger = get_logger(__name__)
 
 
+def _pending_key(company_id: str) -> str:
+    """Sorted set of a company's pending request IDs, scored by requested_at."""
+    return f"hitl:queue:{company_id}"
+
+
+# Sorted set of all pending request IDs, scored by expires_at
+HITL_EXPIRY_KEY = "hitl:expiry"
+
+
+def _timestamp(value: datetime) -> float:
+    """Unix time of a naive UTC datetime, used as a sorted-set score."""
+    return value.replace(tzinfo=UTC).timestamp()
+
+
 class HITLGateId(str, Enum):
     """Predefined HITL approval gates."""
 
@@ -87,6 +106,11 @@ class HITLDecision(BaseModel):
     decided_at: datetime = Field(default_factory=datetime.utcnow)
 
 
+def _event_data(request: HITLRequest) -> dict[str, Any]:
+    """Summary of a request pushed to HITL event stream clients."""
+    return request.model_dump(mode="json", exclude={"data"})
+
+
 class HITLManager:
     """Manages Human-in-the-Loop approval workflows."""
 
@@ -110,6 +134,7 @@ class HITLManager:
         """Create a new HITL approval request."""
         settings = get_settings()
         timeout = timeout_hours or settings.hitl_default_timeout_hours
+        expires_at = datetime.utcnow() + timedelta(hours=timeout)
 
         request = HITLRequest(
             gate_id=gate_id,
@@ -123,29 +148,36 @@ class HITLManager:
             description=description,
             data=data,
             timeout_hours=timeout,
-            expires_at=datetime.utcnow() + timedelta(hours=timeout),
+            expires_at=expires_at,
         )
 
-        # Store in Redis
+        # Store in Redis and index in the company's pending queue
         redis = await get_redis_client()
-        await redis.set_json(
-            f"hitl:request:{request.request_id}",
-            request.model_dump(mode="json"),
-            expire_seconds=timeout * 3600 + 86400,  # timeout + 1 day buffer
-        )
-
-        # Add to pending list for company
-        await redis.client.sadd(
-            f"hitl:pending:{company_id}",
-            request.request_id,
-        )
+        async with redis.pipeline(transaction=True) as pipe:
+            pipe.setex(
+                f"hitl:request:{request.request_id}",
+                timeout * 3600 + 86400,  # timeout + 1 day buffer
+                codec.encode(request.model_dump(mode="json")),
+            )
+            pipe.zadd(
+                _pending_key(company_id),
+                {request.request_id: _timestamp(request.requested_at)},
+            )
+            pipe.zadd(HITL_EXPIRY_KEY, {request.request_id: _timestamp(expires_at)})
+            add_event(
+                pipe,
+                hitl_events_key(company_id),
+                "hitl_request_created",
+                _event_data(request),
+                HITL_EVENTS_TTL_SECONDS,
+            )
 
         logger.info(
             "hitl_request_created",
             request_id=request.request_id,
             gate_id=gate_id,
             company_id=company_id,
-            expires_at=request.expires_at.isoformat() if request.expires_at else None,
+            expires_at=expires_at.isoformat(),
         )
 
         return request
@@ -159,21 +191,107 @@ class HITLManager:
         return None
 
     async def get_pending_requests(self, company_id: str) -> list[HITLRequest]:
-        """Get all pending requests for a company."""
+        """Get all pending requests for a company, newest first."""
+        requests, _ = await self.get_pending_page(company_id)
+        return requests
+
+    async def get_pending_page(
+        self,
+        company_id: str,
+        limit: int | None = None,
+        cursor: str | None = None,
+    ) -> tuple[list[HITLRequest], str | None]:
+        """
+        Get a page of pending requests, newest first, and the next page's cursor.
+
+        The page is read with one range query and one MGET. Requests past
+        their deadline are left out but not written; expiring them is up to
+        the caller that owns expiry.
+        """
+        redis = await get_redis_client()
+        key = _pending_key(company_id)
+        legacy_key = f"hitl:pending:{company_id}"
+
+        max_score = "+inf"
+        cursor_score: float | None = None
+        seen_id = ""
+        if cursor:
+            score_part, seen_id = cursor.split(":", 1)
+            cursor_score = float(score_part)
+            max_score = f"({cursor_score!r}"
+
+        # Fetch one extra row to know whether another page follows
+        async with redis.pipeline(transaction=False) as pipe:
+            pipe.exists(legacy_key)
+            if cursor_score is not None:
+                # Rows sharing the cursor's score, which come in reverse member order
+                pipe.zrevrangebyscore(key, cursor_score, cursor_score, withscores=True)
+            pipe.zrevrangebyscore(
+                key,
+                max_score,
+                "-inf",
+                start=0 if limit is not None else None,
+                num=limit + 1 if limit is not None else None,
+                withscores=True,
+            )
+            legacy_exists, *results = await pipe.execute()
+
+        if legacy_exists:
+            await self._migrate_pending_index(company_id)
+            return await self.get_pending_page(company_id, limit, cursor)
+
+        rows = results[-1]
+        if cursor_score is not None:
+            rows = [row for row in results[0] if row[0] < seen_id] + rows
+
+        next_cursor = None
+        if limit is not None and len(rows) > limit:
+            rows = rows[:limit]
+            last_id, last_score = rows[-1]
+            next_cursor = f"{last_score!r}:{last_id}"
+
+        now = datetime.utcnow()
+        requests = [
+            request
+            for request in await self.get_requests([request_id for request_id, _ in rows])
+            if request.status == HITLStatus.PENDING
+            and not (request.expires_at and now > request.expires_at)
+        ]
+        return requests, next_cursor
+
+    async def get_requests(self, request_ids: list[str]) -> list[HITLRequest]:
+        """Get many HITL requests with a single MGET, skipping missing ones."""
         redis = await get_redis_client()
-        request_ids = await redis.client.smembers(f"hitl:pending:{company_id}")
+        values = await redis.mget_json(
+            [f"hitl:request:{request_id}" for request_id in request_ids]
+        )
+        return [HITLRequest(**value) for value in values if value]
 
-        requests = []
-        for request_id in request_ids:
-            request = await self.get_request(request_id)
-            if request and request.status == HITLStatus.PENDING:
-                # Check expiration
-                if request.expires_at and datetime.utcnow() > request.expires_at:
-                    await self._expire_request(request)
-                else:
-                    requests.append(request)
+    async def _migrate_pending_index(self, company_id: str) -> None:
+        """Move a company's legacy pending set into the sorted-set index."""
+        redis = await get_redis_client()
+        legacy_key = f"hitl:pending:{company_id}"
+        request_ids = [str(request_id) for request_id in await redis.client.smembers(legacy_key)]
+        requests = await self.get_requests(request_ids)
+
+        async with redis.pipeline(transaction=True) as pipe:
+            pending = {
+                request.request_id: _timestamp(request.requested_at)
+                for request in requests
+                if request.status == HITLStatus.PENDING
+            }
+            expiring = {
+                request.request_id: _timestamp(request.expires_at)
+                for request in requests
+                if request.status == HITLStatus.PENDING and request.expires_at
+            }
+            if pending:
+                pipe.zadd(_pending_key(company_id), pending)
+            if expiring:
+                pipe.zadd(HITL_EXPIRY_KEY, expiring)
+            pipe.delete(legacy_key)
 
-        return sorted(requests, key=lambda r: r.requested_at, reverse=True)
+        logger.info("hitl_pending_index_migrated", company_id=company_id, count=len(pending))
 
     async def submit_decision(
         self,
@@ -183,34 +301,20 @@ class HITLManager:
         decided_by: str = "system",
     ) -> HITLDecision | None:
         """Submit a decision for a HITL request."""
-        request = await self.get_request(request_id)
-        if not request:
-            logger.warning("hitl_request_not_found", request_id=request_id)
+        now = datetime.utcnow()
+
+        def decide(request: HITLRequest) -> None:
+            request.status = HITLStatus.APPROVED if approved else HITLStatus.REJECTED
+            request.decided_at = now
+            request.decided_by = decided_by
+            request.feedback = feedback
+
+        # Close the request only if it is still pending, and remove it from pending
+        outcome = (await self._close_pending([request_id], decide))[request_id]
+        if isinstance(outcome, str):
+            logger.warning("hitl_request_not_pending", request_id=request_id, reason=outcome)
             return None
-
-        if request.status != HITLStatus.PENDING:
-            logger.warning(
-                "hitl_request_not_pending",
-                request_id=request_id,
-                status=request.status.value,
-            )
-            return None
-
-        # Update request
-        request.status = HITLStatus.APPROVED if approved else HITLStatus.REJECTED
-        request.decided_at = datetime.utcnow()
-        request.decided_by = decided_by
-        request.feedback = feedback
-
-        # Save updated request
-        redis = await get_redis_client()
-        await redis.set_json(
-            f"hitl:request:{request_id}",
-            request.model_dump(mode="json"),
-        )
-
-        # Remove from pending
-        await redis.client.srem(f"hitl:pending:{request.company_id}", request_id)
+        request = outcome
 
         # Create decision record
         decision = HITLDecision(
@@ -218,6 +322,7 @@ class HITLManager:
             approved=approved,
             feedback=feedback,
             decided_by=decided_by,
+            decided_at=now,
         )
 
         # Publish decision event
@@ -225,6 +330,7 @@ class HITLManager:
         await rabbitmq.publish_hitl_response(
             {
                 "request_id": request_id,
+                "idempotency_key": hitl_response_key(request_id),
                 "agent_id": request.agent_id,
                 "workflow_id": request.workflow_id,
                 "step_id": request.step_id,
@@ -244,19 +350,165 @@ class HITLManager:
 
         return decision
 
-    async def _expire_request(self, request: HITLRequest) -> None:
-        """Mark a request as expired."""
-        request.status = HITLStatus.EXPIRED
-        request.decided_at = datetime.utcnow()
+    async def submit_decisions(
+        self,
+        decisions: list[tuple[str, bool, str | None]],
+        decided_by: str = "system",
+    ) -> list[HITLRequest | str]:
+        """
+        Submit many (request_id, approved, feedback) decisions at once.
+
+        All requests are read with one MGET and every valid decision is written
+        in one MULTI/EXEC; the responses are published as one batch. Returns,
+        in input order, the decided request or an error message.
+        """
+        # The first decision for each request wins
+        by_id: dict[str, tuple[bool, str | None]] = {}
+        for request_id, approved, feedback in decisions:
+            by_id.setdefault(request_id, (approved, feedback))
+        now = datetime.utcnow()
+
+        def decide(request: HITLRequest) -> None:
+            approved, feedback = by_id[request.request_id]
+            request.status = HITLStatus.APPROVED if approved else HITLStatus.REJECTED
+            request.decided_at = now
+            request.decided_by = decided_by
+            request.feedback = feedback
+
+        closed = await self._close_pending(list(by_id), decide)
+
+        outcomes: list[HITLRequest | str] = []
+        seen: set[str] = set()
+        for request_id, _, _ in decisions:
+            outcomes.append("Duplicate decision" if request_id in seen else closed[request_id])
+            seen.add(request_id)
+
+        decided = [outcome for outcome in closed.values() if isinstance(outcome, HITLRequest)]
+        if not decided:
+            return outcomes
+
+        rabbitmq = await get_rabbitmq_client()
+        await rabbitmq.publish_hitl_responses(
+            [
+                {
+                    "request_id": request.request_id,
+                    "idempotency_key": hitl_response_key(request.request_id),
+                    "agent_id": request.agent_id,
+                    "workflow_id": request.workflow_id,
+                    "step_id": request.step_id,
+                    "approved": request.status == HITLStatus.APPROVED,
+                    "feedback": request.feedback,
+                    "decided_by": decided_by,
+                    "decided_at": now.isoformat(),
+                }
+                for request in decided
+            ]
+        )
+
+        logger.info(
+            "hitl_decisions_submitted",
+            count=len(decided),
+            not_applied=len(decisions) - len(decided),
+            decided_by=decided_by,
+        )
+
+        return outcomes
 
+    async def _close_pending(
+        self,
+        request_ids: list[str],
+        close: Callable[[HITLRequest], None],
+    ) -> dict[str, HITLRequest | str]:
+        """
+        Close the given requests that are still pending, and unindex them.
+
+        The request keys are WATCHed while their status is checked, so of a
+        decision and the expiry sweeper racing for the same request only one
+        commits; the other re-reads it and finds it closed. close updates a
+        pending request in place. Returns, by request ID, the closed request
+        or why it was left alone.
+        """
         redis = await get_redis_client()
-        await redis.set_json(
+        keys = [f"hitl:request:{request_id}" for request_id in request_ids]
+        async with redis.raw_client.pipeline(transaction=True) as pipe:
+            while True:
+                try:
+                    await pipe.watch(*keys)
+                    values = await pipe.mget(keys)
+
+                    outcomes: dict[str, HITLRequest | str] = {}
+                    closed: list[HITLRequest] = []
+                    for request_id, value in zip(request_ids, values, strict=True):
+                        if not value:
+                            outcomes[request_id] = "Review request not found"
+                            continue
+                        request = HITLRequest(**codec.decode(value))
+                        if request.status != HITLStatus.PENDING:
+                            outcomes[request_id] = f"Review request is {request.status.value}"
+                            continue
+                        close(request)
+                        outcomes[request_id] = request
+                        closed.append(request)
+
+                    if closed:
+                        pipe.multi()
+                        for request in closed:
+                            self._queue_closed_request(pipe, request)
+                        await pipe.execute()
+                    return outcomes
+                except WatchError:
+                    # A request changed since it was read; check it again
+                    continue
+
+    def _queue_closed_request(self, pipe: Pipeline, request: HITLRequest) -> None:
+        """Queue the writes that close a request on a pipeline."""
+        pipe.set(
             f"hitl:request:{request.request_id}",
-            request.model_dump(mode="json"),
+            codec.encode(request.model_dump(mode="json")),
         )
-        await redis.client.srem(
-            f"hitl:pending:{request.company_id}",
-            request.request_id,
+        pipe.zrem(_pending_key(request.company_id), request.request_id)
+        pipe.srem(f"hitl:pending:{request.company_id}", request.request_id)
+        pipe.zrem(HITL_EXPIRY_KEY, request.request_id)
+        add_event(
+            pipe,
+            hitl_events_key(request.company_id),
+            "hitl_request_closed",
+            _event_data(request),
+            HITL_EVENTS_TTL_SECONDS,
+        )
+
+    async def expire_request(self, request_id: str) -> HITLRequest | None:
+        """
+        Mark a pending request as expired and publish it as a rejection.
+
+        Returns the expired request, or None if it was closed in the meantime.
+        """
+        now = datetime.utcnow()
+
+        def expire(request: HITLRequest) -> None:
+            request.status = HITLStatus.EXPIRED
+            request.decided_at = now
+            request.decided_by = "system"
+
+        outcome = (await self._close_pending([request_id], expire))[request_id]
+        if isinstance(outcome, str):
+            return None
+        request = outcome
+
+        rabbitmq = await get_rabbitmq_client()
+        await rabbitmq.publish_hitl_response(
+            {
+                "request_id": request.request_id,
+                "idempotency_key": hitl_response_key(request.request_id),
+                "agent_id": request.agent_id,
+                "workflow_id": request.workflow_id,
+                "step_id": request.step_id,
+                "approved": False,
+                "expired": True,
+                "feedback": None,
+                "decided_by": request.decided_by,
+                "decided_at": now.isoformat(),
+            }
         )
 
         logger.info(
@@ -264,25 +516,18 @@ class HITLManager:
             request_id=request.request_id,
             gate_id=request.gate_id,
         )
+        return request
 
     async def cancel_request(self, request_id: str) -> bool:
         """Cancel a pending HITL request."""
-        request = await self.get_request(request_id)
-        if not request or request.status != HITLStatus.PENDING:
-            return False
 
-        request.status = HITLStatus.CANCELLED
-        request.decided_at = datetime.utcnow()
+        def cancel(request: HITLRequest) -> None:
+            request.status = HITLStatus.CANCELLED
+            request.decided_at = datetime.utcnow()
 
-        redis = await get_redis_client()
-        await redis.set_json(
-            f"hitl:request:{request_id}",
-            request.model_dump(mode="json"),
-        )
-        await redis.client.srem(
-            f"hitl:pending:{request.company_id}",
-            request_id,
-        )
+        outcome = (await self._close_pending([request_id], cancel))[request_id]
+        if isinstance(outcome, str):
+            return False
 
         logger.info("hitl_request_cancelled", request_id=request_id)
         return True
@@ -0,0 +1,127 @@
+"""
+Content-addressed cache for LLM responses.
+
+Two tiers: an in-process LRU in front of Redis with a TTL. Entries are keyed
+by a hash of everything that determines a response, so byte-identical
+requests from retries and replays are served without calling Gemini.
+"""
+
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from typing import Any
+
+from src.config import get_settings
+from src.services import get_redis_client
+from src.utils import get_logger
+
+logger = get_logger(__name__)
+
+
+class LLMResponseCache:
+    """Two-tier (in-process LRU + Redis) LLM response cache."""
+
+    def __init__(self, max_entries: int, ttl_seconds: int) -> None:
+        self._max_entries = max_entries
+        self._ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[str, tuple[str, float]] = OrderedDict()
+        self.local_hits = 0
+        self.redis_hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(
+        model: str,
+        system_prompt: str,
+        user_message: str,
+        temperature: float,
+        max_tokens: int,
+    ) -> str:
+        """Build the cache key for an LLM request."""
+        payload = json.dumps(
+            [model, system_prompt, user_message, temperature, max_tokens],
+            ensure_ascii=False,
+        )
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def _get_local(self, key: str) -> str | None:
+        """Get a live entry from the in-process tier."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if time.monotonic() >= expires_at:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def _set_local(self, key: str, value: str, ttl_seconds: float) -> None:
+        """Store an entry in the in-process tier, evicting the oldest."""
+        self._entries[key] = (value, time.monotonic() + ttl_seconds)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+
+    async def get(self, key: str) -> str | None:
+        """Get a cached response, checking the local tier before Redis."""
+        value = self._get_local(key)
+        if value is not None:
+            self.local_hits += 1
+            return value
+
+        try:
+            redis = await get_redis_client()
+            value = await redis.get(f"llm:cache:{key}")
+            if value is not None:
+                ttl = await redis.client.ttl(f"llm:cache:{key}")
+        except Exception as e:
+            logger.warning("llm_cache_read_failed", error=str(e))
+            value = None
+
+        if value is None:
+            self.misses += 1
+            return None
+
+        self.redis_hits += 1
+        self._set_local(key, value, ttl if ttl > 0 else self._ttl_seconds)
+        return value
+
+    async def set(self, key: str, value: str) -> None:
+        """Store a response in both tiers."""
+        self._set_local(key, value, self._ttl_seconds)
+        try:
+            redis = await get_redis_client()
+            await redis.set(f"llm:cache:{key}", value, self._ttl_seconds)
+        except Exception as e:
+            logger.warning("llm_cache_write_failed", error=str(e))
+
+    def get_stats(self) -> dict[str, Any]:
+        """Get hit/miss counters."""
+        lookups = self.local_hits + self.redis_hits + self.misses
+        return {
+            "local_hits": self.local_hits,
+            "redis_hits": self.redis_hits,
+            "misses": self.misses,
+            "hit_ratio": (
+                round((self.local_hits + self.redis_hits) / lookups, 4) if lookups else 0.0
+            ),
+            "local_entries": len(self._entries),
+        }
+
+
+# Singleton instance
+_llm_cache: LLMResponseCache | None = None
+
+
+def get_llm_cache() -> LLMResponseCache:
+    """Get LLM response cache singleton."""
+    global _llm_cache
+    if _llm_cache is None:
+        settings = get_settings()
+        _llm_cache = LLMResponseCache(
+            max_entries=settings.llm_cache_max_entries,
+            ttl_seconds=settings.llm_cache_ttl_seconds,
+        )
+    return _llm_cache
@@ -6,18 +6,154 @@ for HR policy generation processes.
 """
 
 import asyncio
+import contextlib
+import json
+import time
 from datetime import datetime
 from enum import Enum
 from typing import Any
 from uuid import uuid4
 
 from pydantic import BaseModel, Field
+from redis.exceptions import ResponseError
+from redis.typing import EncodableT, FieldT
 
-from src.services import get_rabbitmq_client, get_redis_client
+from src.config import get_settings
+from src.core.events import add_event, workflow_events_key
+from src.core.workflow_signals import get_workflow_signals, step_signals_channel
+from src.services import (
+    TaskLane,
+    claim_check,
+    codec,
+    get_rabbitmq_client,
+    get_read_cache,
+    get_redis_client,
+)
+from src.services.idempotency import idempotency_key, workflow_event_key
+from src.services.read_cache import INVALIDATION_CHANNEL, invalidation_message
 from src.utils import get_logger
 
 logger = get_logger(__name__)
 
+WORKFLOW_TTL_SECONDS = 86400 * 7  # 7 days
+
+# Partial outputs of a step that stopped without recording a result expire
+PARTIAL_OUTPUT_TTL_SECONDS = 3600
+
+# Step payload fields stored separately from step metadata in the workflow hash
+STEP_DATA_FIELDS = ("input", "output")
+
+
+def step_partial_key(workflow_id: str, step_id: str) -> str:
+    """Latest partial output published by a step while it generates."""
+    return f"workflow:partial:{workflow_id}:{step_id}"
+
+
+# Admits steps into a company's in-flight set while it is below the cap.
+# Members are scored by admit time, and members older than the stale cutoff
+# are evicted first, so slots leaked by a crashed dispatcher free themselves.
+# If any step is not admitted, the workflow is added to the company's deferred
+# set, to be dispatched again when a slot is released.
+# KEYS[1] = in-flight sorted set, KEYS[2] = deferred workflow set
+# ARGV[1] = cap, ARGV[2] = now (ms), ARGV[3] = stale cutoff (ms),
+# ARGV[4] = workflow_id, ARGV[5..] = members
+_ADMIT_STEPS_SCRIPT = """
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', ARGV[3])
+local admitted = {}
+for i = 5, #ARGV do
+    if redis.call('ZSCORE', KEYS[1], ARGV[i]) then
+        table.insert(admitted, ARGV[i])
+    elseif redis.call('ZCARD', KEYS[1]) < tonumber(ARGV[1]) then
+        redis.call('ZADD', KEYS[1], ARGV[2], ARGV[i])
+        table.insert(admitted, ARGV[i])
+    end
+end
+if #admitted < #ARGV - 4 then
+    redis.call('SADD', KEYS[2], ARGV[4])
+end
+return admitted
+"""
+
+# Releases slots from a company's in-flight set. If any were held, takes and
+# returns the company's deferred workflows, else returns nothing.
+# KEYS[1] = in-flight sorted set, KEYS[2] = deferred workflow set
+# ARGV[1..] = members
+_RELEASE_STEPS_SCRIPT = """
+if redis.call('ZREM', KEYS[1], unpack(ARGV)) == 0 then
+    return {}
+end
+local deferred = redis.call('SMEMBERS', KEYS[2])
+redis.call('DEL', KEYS[2])
+return deferred
+"""
+
+# Compare-and-set of step transitions on a workflow hash. Writes each step's
+# metadata (and output, unless '') only if every stored step is still in its
+# expected status, then updates the header and returns the resulting workflow
+# status followed by (step_id, status) pairs for all steps. On a conflict
+# nothing is written and {0, step_id, stored status} is returned.
+# KEYS[1] = workflow hash
+# ARGV[1] = updated_at, ARGV[2] = workflow status ('' keeps it),
+# ARGV[3] = current step ('' keeps it), ARGV[4] = TTL,
+# ARGV[5] = invalidation channel, ARGV[6] = invalidation message,
+# ARGV[7..] = step_id, expected status, step metadata, output per step
+_TRANSITION_STEPS_SCRIPT = """
+local raw_meta = redis.call('HGET', KEYS[1], 'meta')
+if not raw_meta then
+    return {0}
+end
+for i = 7, #ARGV, 4 do
+    local raw_step = redis.call('HGET', KEYS[1], 'step:' .. ARGV[i])
+    if not raw_step then
+        return {0, ARGV[i], ''}
+    end
+    local status = cjson.decode(raw_step).status
+    if status ~= ARGV[i + 1] then
+        return {0, ARGV[i], status}
+    end
+end
+for i = 7, #ARGV, 4 do
+    redis.call('HSET', KEYS[1], 'step:' .. ARGV[i], ARGV[i + 2])
+    if ARGV[i + 3] ~= '' then
+        redis.call('HSET', KEYS[1], 'output:' .. ARGV[i], ARGV[i + 3])
+    end
+end
+
+local meta = cjson.decode(raw_meta)
+local fields = {}
+for i, step_id in ipairs(meta.step_ids) do
+    fields[i] = 'step:' .. step_id
+end
+local statuses = {}
+local all_completed = true
+for i, raw_step in ipairs(redis.call('HMGET', KEYS[1], unpack(fields))) do
+    if raw_step then
+        local status = cjson.decode(raw_step).status
+        table.insert(statuses, meta.step_ids[i])
+        table.insert(statuses, status)
+        if status ~= 'completed' then
+            all_completed = false
+        end
+    end
+end
+
+if ARGV[2] ~= '' then
+    meta.status = ARGV[2]
+end
+if all_completed then
+    meta.status = 'completed'
+end
+if ARGV[3] ~= '' then
+    meta.current_step_id = ARGV[3]
+end
+meta.updated_at = ARGV[1]
+redis.call('HSET', KEYS[1], 'meta', cjson.encode(meta))
+redis.call('HINCRBY', KEYS[1], 'version', 1)
+redis.call('EXPIRE', KEYS[1], ARGV[4])
+redis.call('PUBLISH', ARGV[5], ARGV[6])
+return {1, meta.status, unpack(statuses)}
+"""
+
 
 class WorkflowStatus(str, Enum):
     """Workflow execution status."""
@@ -42,6 +178,8 @@ class WorkflowStep(BaseModel):
     started_at: datetime | None = None
     completed_at: datetime | None = None
     error: str | None = None
+    # Dispatches of this step so far; part of its tasks' idempotency key
+    attempt: int = 0
 
 
 class WorkflowState(BaseModel):
@@ -51,6 +189,7 @@ class WorkflowState(BaseModel):
     company_id: str
     session_id: str
     status: WorkflowStatus = WorkflowStatus.PENDING
+    lane: TaskLane = TaskLane.INTERACTIVE
     steps: list[WorkflowStep] = Field(default_factory=list)
     current_step_id: str | None = None
     context: dict[str, Any] = Field(default_factory=dict)
@@ -58,6 +197,116 @@ class WorkflowState(BaseModel):
     updated_at: datetime = Field(default_factory=datetime.utcnow)
 
 
+class WorkflowGraph:
+    """
+    Compiled dependency index over a workflow's steps.
+
+    Holds a step_id index, reverse-dependency adjacency and a count of
+    unfinished dependencies per step, so a completion makes its successors
+    ready in O(out-degree). Built in O(V + E) from the steps' current status,
+    which keeps rebuilding after a load from Redis cheap; transitions update
+    it incrementally through update_step.
+    """
+
+    def __init__(self, steps: list[WorkflowStep]) -> None:
+        self._steps = {step.step_id: step for step in steps}
+        self._order = {step.step_id: i for i, step in enumerate(steps)}
+        self._dependents: dict[str, list[str]] = {step_id: [] for step_id in self._steps}
+        self._completed = {
+            step.step_id for step in steps if step.status == WorkflowStatus.COMPLETED
+        }
+
+        self._remaining: dict[str, int] = {}
+        for step in steps:
+            for dep_id in step.depends_on:
+                if dep_id not in self._steps:
+                    raise ValueError(f"Step {step.step_id} depends on unknown step {dep_id}")
+                self._dependents[dep_id].append(step.step_id)
+            self._remaining[step.step_id] = sum(
+                1 for dep_id in step.depends_on if dep_id not in self._completed
+            )
+
+        # Steps with no unfinished dependencies that have not completed yet
+        self._unblocked = {
+            step_id
+            for step_id, count in self._remaining.items()
+            if count == 0 and step_id not in self._completed
+        }
+        self.levels = self._compute_levels()
+
+    def _compute_levels(self) -> dict[str, int]:
+        """Assign each step its topological level (Kahn's algorithm)."""
+        in_degree = {step_id: len(step.depends_on) for step_id, step in self._steps.items()}
+        levels: dict[str, int] = {}
+        frontier = [step_id for step_id, degree in in_degree.items() if degree == 0]
+        level = 0
+        while frontier:
+            next_frontier = []
+            for step_id in frontier:
+                levels[step_id] = level
+                for dependent_id in self._dependents[step_id]:
+                    in_degree[dependent_id] -= 1
+                    if in_degree[dependent_id] == 0:
+                        next_frontier.append(dependent_id)
+            frontier = next_frontier
+            level += 1
+
+        if len(levels) != len(self._steps):
+            raise ValueError("Workflow steps contain a dependency cycle")
+        return levels
+
+    def get(self, step_id: str) -> WorkflowStep | None:
+        """Get a step by ID."""
+        return self._steps.get(step_id)
+
+    def ready_steps(self) -> list[WorkflowStep]:
+        """Get pending steps whose dependencies are all completed, in level order."""
+        ready = [
+            self._steps[step_id]
+            for step_id in self._unblocked
+            if self._steps[step_id].status == WorkflowStatus.PENDING
+        ]
+        return sorted(ready, key=lambda s: (self.levels[s.step_id], self._order[s.step_id]))
+
+    def mark_completed(self, step_id: str) -> list[WorkflowStep]:
+        """Record a step completion and return the successors it made ready."""
+        if step_id in self._completed or step_id not in self._steps:
+            return []
+        self._completed.add(step_id)
+        self._unblocked.discard(step_id)
+
+        newly_ready = []
+        for dependent_id in self._dependents[step_id]:
+            self._remaining[dependent_id] -= 1
+            if self._remaining[dependent_id] == 0:
+                self._unblocked.add(dependent_id)
+                newly_ready.append(self._steps[dependent_id])
+        return newly_ready
+
+    def mark_incomplete(self, step_id: str) -> None:
+        """Undo a step completion, e.g. when the step is reset for a retry."""
+        if step_id not in self._completed:
+            return
+        self._completed.discard(step_id)
+        if self._remaining[step_id] == 0:
+            self._unblocked.add(step_id)
+
+        for dependent_id in self._dependents[step_id]:
+            if self._remaining[dependent_id] == 0:
+                self._unblocked.discard(dependent_id)
+            self._remaining[dependent_id] += 1
+
+    def update_step(self, step_id: str) -> None:
+        """Apply a change of a step's status to the dependency counts."""
+        step = self._steps.get(step_id)
+        if step is None:
+            return
+        if step.status == WorkflowStatus.COMPLETED:
+            self.mark_completed(step_id)
+        else:
+            self.mark_incomplete(step_id)
+
+
 class Orchestrator:
     """
     Workflow orchestrator for HR policy generation.
@@ -67,10 +316,14 @@ class Orchestrator:
     2. Ideal talent profile generation
     3. Grading system design
     4. Evaluation system design
-    5. Compensation system design
+    5. Compensation system design, in parallel with 4
+
+    Steps form a DAG through depends_on; independent steps are dispatched
+    together, bounded by the per-workflow and per-company parallelism caps.
     """
 
-    # Default workflow definition
+    # Default workflow definition. depends_on lists every step whose output
+    # the agent reads, since only direct dependency outputs are passed on.
     DEFAULT_WORKFLOW_STEPS = [
         WorkflowStep(
             step_id="collect_context",
@@ -85,81 +338,382 @@ class Orchestrator:
         WorkflowStep(
             step_id="design_grading",
             agent_type="grading_designer",
-            depends_on=["generate_talent_profile"],
+            depends_on=["collect_context", "generate_talent_profile"],
         ),
         WorkflowStep(
             step_id="design_evaluation",
             agent_type="evaluation_designer",
-            depends_on=["design_grading"],
+            depends_on=["collect_context", "generate_talent_profile", "design_grading"],
         ),
         WorkflowStep(
             step_id="design_compensation",
             agent_type="compensation_designer",
-            depends_on=["design_evaluation"],
+            depends_on=["collect_context", "design_grading"],
         ),
     ]
 
-    def __init__(self, company_id: str, session_id: str | None = None) -> None:
+    def __init__(
+        self,
+        company_id: str,
+        session_id: str | None = None,
+        lane: TaskLane = TaskLane.INTERACTIVE,
+    ) -> None:
         self.state = WorkflowState(
             company_id=company_id,
             session_id=session_id or str(uuid4()),
+            lane=lane,
             steps=[step.model_copy() for step in self.DEFAULT_WORKFLOW_STEPS],
         )
         self._agent_instances: dict[str, Any] = {}
+        self._graph = WorkflowGraph(self.state.steps)
+
+        # Persistence bookkeeping: which step payloads are in memory, and
+        # which hash fields changed since the last save.
+        self._data_loaded = {step.step_id for step in self.state.steps}
+        self._dirty_fields: set[str] = set()
+        self._legacy_blob = False
+        self._mark_all_dirty()
 
     @property
     def workflow_id(self) -> str:
         """Get the workflow ID."""
         return self.state.workflow_id
 
+    @property
+    def _state_key(self) -> str:
+        """Redis hash holding this workflow's state."""
+        return f"workflow:{self.workflow_id}"
+
+    def _mark_dirty(self, step_id: str | None = None, *data_fields: str) -> None:
+        """Mark a step's metadata (and optionally its payloads) for the next save."""
+        if step_id is not None:
+            self._dirty_fields.add(f"step:{step_id}")
+            self._dirty_fields.update(f"{field}:{step_id}" for field in data_fields)
+
+    def _mark_all_dirty(self) -> None:
+        """Mark every field for the next save."""
+        self._dirty_fields.add("context")
+        for step in self.state.steps:
+            self._mark_dirty(step.step_id, *STEP_DATA_FIELDS)
+
+    def _encode_field(self, field: str) -> str | bytes | None:
+        """
+        Serialize one hash field from the in-memory state.
+
+        Context and step payloads go through the codec and may be compressed;
+        step metadata stays plain JSON.
+        """
+        if field == "context":
+            return codec.encode(self.state.context)
+
+        kind, step_id = field.split(":", 1)
+        step = self._graph.get(step_id)
+        if step is None:
+            return None
+        if kind == "input":
+            return codec.encode(step.input_data)
+        if kind == "output":
+            return codec.encode(step.output_data)
+        return self._encode_step_metadata(step)
+
+    @staticmethod
+    def _encode_step_metadata(step: WorkflowStep) -> str:
+        """Serialize a step without its payloads, as plain JSON."""
+        return step.model_dump_json(exclude={"input_data", "output_data"})
+
     async def _save_state(self) -> None:
-        """Save workflow state to Redis."""
+        """
+        Save changed workflow state to Redis.
+
+        The workflow is stored as a hash with one field for the header, one
+        for the context, and per step one field for metadata plus one each for
+        input and output payloads. Only the header and the fields marked with
+        _mark_dirty are written.
+        """
         self.state.updated_at = datetime.utcnow()
+
+        # Snapshot and clear before awaiting so concurrent marks are kept
+        fields = self._dirty_fields
+        self._dirty_fields = set()
+        legacy_blob = self._legacy_blob
+        self._legacy_blob = False
+
+        header = self.state.model_dump(mode="json", exclude={"steps", "context"})
+        header["step_ids"] = [step.step_id for step in self.state.steps]
+        mapping: dict[FieldT, EncodableT] = {"meta": json.dumps(header)}
+        for field in fields:
+            value = self._encode_field(field)
+            if value is not None:
+                mapping[field] = value
+
+        redis = await get_redis_client()
+        async with redis.pipeline(transaction=True) as pipe:
+            if legacy_blob:
+                pipe.delete(self._state_key)
+            pipe.hset(self._state_key, mapping=mapping)
+            pipe.hincrby(self._state_key, "version", 1)
+            pipe.expire(self._state_key, WORKFLOW_TTL_SECONDS)
+            add_event(
+                pipe,
+                workflow_events_key(self.workflow_id),
+                "workflow_updated",
+                self.get_progress(),
+                WORKFLOW_TTL_SECONDS,
+            )
+            get_read_cache().queue_invalidation(pipe, self._state_key)
+
+    async def _apply_transitions(
+        self,
+        transitions: list[tuple[WorkflowStep, WorkflowStatus]],
+        workflow_status: WorkflowStatus | None = None,
+        current_step_id: str | None = None,
+    ) -> bool:
+        """
+        Atomically write step changes made in memory.
+
+        Takes (step, expected_status) pairs. Each step's metadata, and its
+        output if marked dirty, is written only if the stored step is still
+        in its expected status, so replicas working on sibling steps never
+        overwrite each other. The header is updated in the same script, which
+        also marks the workflow completed once every step is. On success the
+        in-memory step statuses are synced from Redis, so ready successors
+        can be dispatched without re-reading. On a conflict nothing is
+        written, the state is reloaded and False is returned.
+        """
+        if self._legacy_blob:
+            # Converted to the hash layout by a full save
+            await self._save_state()
+            return True
+
+        now = datetime.utcnow()
+        args: list[str | bytes] = []
+        for step, expected_status in transitions:
+            output_field = f"output:{step.step_id}"
+            output = codec.encode(step.output_data) if output_field in self._dirty_fields else b""
+            metadata = self._encode_step_metadata(step)
+            args += [step.step_id, expected_status.value, metadata, output]
+            self._dirty_fields.difference_update({f"step:{step.step_id}", output_field})
+
         redis = await get_redis_client()
-        await redis.set_json(
-            f"workflow:{self.workflow_id}",
-            self.state.model_dump(mode="json"),
-            expire_seconds=86400 * 7,  # 7 days
+        get_read_cache().invalidate_local(self._state_key)
+        result = await redis.client.eval(
+            _TRANSITION_STEPS_SCRIPT,
+            1,
+            self._state_key,
+            now.isoformat(),
+            workflow_status.value if workflow_status else "",
+            current_step_id or "",
+            WORKFLOW_TTL_SECONDS,
+            INVALIDATION_CHANNEL,
+            invalidation_message(self._state_key),
+            *args,
         )
 
-    @classmethod
-    async def load(cls, workflow_id: str) -> "Orchestrator | None":
-        """Load an existing workflow from Redis."""
+        if not result[0]:
+            logger.warning(
+                "step_transition_conflict",
+                workflow_id=self.workflow_id,
+                step_id=result[1] if len(result) > 1 else None,
+                stored_status=result[2] if len(result) > 2 else None,
+            )
+            await self._refresh_state()
+            return False
+
+        self.state.status = WorkflowStatus(result[1])
+        self.state.updated_at = now
+        if current_step_id:
+            self.state.current_step_id = current_step_id
+        stored = dict(zip(result[2::2], result[3::2], strict=True))
+        changed = {step.step_id for step, _ in transitions}
+        for step in self.state.steps:
+            status = WorkflowStatus(stored.get(step.step_id, step.status))
+            if status != step.status:
+                # Changed by another writer; its payloads here are stale
+                step.status = status
+                self._data_loaded.discard(step.step_id)
+                changed.add(step.step_id)
+        for step_id in changed:
+            self._graph.update_step(step_id)
+
+        async with redis.pipeline() as pipe:
+            add_event(
+                pipe,
+                workflow_events_key(self.workflow_id),
+                "workflow_updated",
+                self.get_progress(),
+                WORKFLOW_TTL_SECONDS,
+            )
+        return True
+
+    @staticmethod
+    async def _read_state(workflow_id: str) -> tuple[WorkflowState, bool] | None:
+        """
+        Read a workflow's header and step metadata, without step payloads.
+
+        Returns the state and whether it came from a legacy single-blob key,
+        in which case the payloads are included.
+        """
         redis = await get_redis_client()
-        data = await redis.get_json(f"workflow:{workflow_id}")
-        if not data:
+        key = f"workflow:{workflow_id}"
+        try:
+            raw_meta = await redis.client.hget(key, "meta")
+        except ResponseError:
+            # Written as one JSON string before per-step hashes were introduced
+            data = await redis.get_json(key)
+            return (WorkflowState(**data), True) if data else None
+        if not raw_meta:
+            return None
+
+        header = json.loads(raw_meta)
+        step_ids = header.pop("step_ids", None) or []
+        values = await redis.raw_client.hmget(
+            key, ["context", *(f"step:{step_id}" for step_id in step_ids)]
+        )
+        raw_context, raw_steps = values[0], values[1:]
+
+        state = WorkflowState(
+            **header,
+            context=codec.decode(raw_context) if raw_context else {},
+            steps=[WorkflowStep(**codec.decode(raw)) for raw in raw_steps if raw],
+        )
+        return state, False
+
+    def _set_state(self, state: WorkflowState, legacy_blob: bool) -> None:
+        """Replace the in-memory state with one read from Redis."""
+        self.state = state
+        self._graph = WorkflowGraph(state.steps)
+        self._dirty_fields = set()
+        self._legacy_blob = legacy_blob
+        if legacy_blob:
+            # Payloads came with the blob; rewrite everything as a hash next save
+            self._data_loaded = {step.step_id for step in state.steps}
+            self._mark_all_dirty()
+        else:
+            self._data_loaded = set()
+
+    @classmethod
+    async def load(
+        cls, workflow_id: str, with_data: bool = False, cached: bool = False
+    ) -> "Orchestrator | None":
+        """
+        Load an existing workflow from Redis.
+
+        Step input and output payloads are fetched lazily via load_step_data,
+        unless with_data is set. With cached, the header and step metadata may
+        come from the in-process read cache; use it only for read-only views,
+        never before changing and saving the state.
+        """
+        if cached:
+            result = await get_read_cache().get_or_load(
+                f"workflow:{workflow_id}", lambda: cls._read_state(workflow_id)
+            )
+            if result is not None:
+                state, legacy_blob = result
+                result = (state.model_copy(deep=True), legacy_blob)
+        else:
+            result = await cls._read_state(workflow_id)
+        if result is None:
             return None
 
-        state = WorkflowState(**data)
+        state, legacy_blob = result
         orchestrator = cls(state.company_id, state.session_id)
-        orchestrator.state = state
+        orchestrator._set_state(state, legacy_blob)
+        if with_data:
+            await orchestrator.load_step_data()
         return orchestrator
 
-    def _get_step(self, step_id: str) -> WorkflowStep | None:
-        """Get a step by ID."""
-        for step in self.state.steps:
-            if step.step_id == step_id:
-                return step
-        return None
+    async def load_step_data(self, *step_ids: str) -> None:
+        """Fetch input and output payloads for the given steps (default: all)."""
+        missing = [
+            step_id
+            for step_id in (step_ids or [step.step_id for step in self.state.steps])
+            if step_id not in self._data_loaded and self._graph.get(step_id)
+        ]
+        if not missing:
+            return
 
-    def _get_next_steps(self) -> list[WorkflowStep]:
-        """Get steps that are ready to execute."""
-        ready_steps = []
-        for step in self.state.steps:
-            if step.status != WorkflowStatus.PENDING:
+        redis = await get_redis_client()
+        fields = [f"{field}:{step_id}" for step_id in missing for field in STEP_DATA_FIELDS]
+        values = await redis.raw_client.hmget(self._state_key, fields)
+        for field, raw in zip(fields, values, strict=True):
+            kind, step_id = field.split(":", 1)
+            step = self._graph.get(step_id)
+            if step is None or not raw:
                 continue
+            if kind == "input":
+                step.input_data = codec.decode(raw)
+            else:
+                step.output_data = codec.decode(raw)
+        self._data_loaded.update(missing)
 
-            # Check if all dependencies are completed
-            deps_completed = all(
-                self._get_step(dep_id)
-                and self._get_step(dep_id).status == WorkflowStatus.COMPLETED
-                for dep_id in step.depends_on
-            )
+    async def _refresh_state(self) -> None:
+        """Reload workflow header and step metadata from Redis."""
+        result = await self._read_state(self.workflow_id)
+        if result:
+            self._set_state(*result)
 
-            if deps_completed:
-                ready_steps.append(step)
+    async def _notify_steps_changed(self, steps: list[WorkflowStep]) -> None:
+        """Wake processes waiting on this workflow in run_to_completion."""
+        redis = await get_redis_client()
+        await redis.client.publish(
+            step_signals_channel(self.workflow_id),
+            json.dumps({step.step_id: step.status.value for step in steps}),
+        )
 
-        return ready_steps
+    def _inflight_member(self, step_id: str) -> str:
+        """Member name of a step in the company in-flight set."""
+        return f"{self.workflow_id}:{step_id}"
+
+    @property
+    def _slot_keys(self) -> tuple[str, str]:
+        """The company's in-flight sorted set and deferred workflow set."""
+        company_id = self.state.company_id
+        return f"inflight:company:{company_id}", f"deferred:company:{company_id}"
+
+    async def _release_step_slots(self, *step_ids: str) -> None:
+        """
+        Release steps' slots in the company in-flight set.
+
+        Workflows deferred by the company cap are then dispatched again, so
+        a freed slot is taken up even if the deferred workflow has no step
+        in flight that would otherwise resume it.
+        """
+        if not step_ids:
+            return
+        redis = await get_redis_client()
+        deferred = await redis.client.eval(
+            _RELEASE_STEPS_SCRIPT,
+            2,
+            *self._slot_keys,
+            *(self._inflight_member(step_id) for step_id in step_ids),
+        )
+        for workflow_id in deferred:
+            try:
+                orchestrator = await Orchestrator.load(workflow_id)
+                if orchestrator and orchestrator.state.status == WorkflowStatus.RUNNING:
+                    await orchestrator.dispatch_ready_steps()
+            except Exception as e:
+                logger.warning("deferred_dispatch_failed", workflow_id=workflow_id, error=str(e))
+                # Kept for the next release
+                await redis.client.sadd(self._slot_keys[1], workflow_id)
+
+    def _get_step(self, step_id: str) -> WorkflowStep | None:
+        """Get a step by ID."""
+        return self._graph.get(step_id)
+
+    def has_result(self, step_id: str, attempt: int | None = None) -> bool:
+        """Whether the result of a step's current, or given, attempt was applied."""
+        step = self._get_step(step_id)
+        return (
+            step is not None
+            and step.status
+            in (WorkflowStatus.WAITING_HITL, WorkflowStatus.COMPLETED, WorkflowStatus.FAILED)
+            and (attempt or step.attempt) == step.attempt
+        )
+
+    def _get_next_steps(self) -> list[WorkflowStep]:
+        """Get steps that are ready to execute."""
+        return self._graph.ready_steps()
 
     def _collect_step_outputs(self, step: WorkflowStep) -> dict[str, Any]:
         """Collect outputs from dependency steps."""
@@ -174,10 +728,13 @@ class Orchestrator:
         """Start the workflow with initial data."""
         self.state.status = WorkflowStatus.RUNNING
         self.state.context["initial_data"] = initial_data
+        self._dirty_fields.add("context")
 
-        # Set initial data for first step
-        if self.state.steps:
-            self.state.steps[0].input_data = initial_data
+        # Set initial data for root steps
+        for step in self.state.steps:
+            if not step.depends_on:
+                step.input_data = initial_data
+                self._mark_dirty(step.step_id, "input")
 
         await self._save_state()
 
@@ -195,6 +752,7 @@ class Orchestrator:
                 "workflow_id": self.workflow_id,
                 "company_id": self.state.company_id,
                 "session_id": self.state.session_id,
+                "idempotency_key": workflow_event_key(self.workflow_id, "started"),
             }
         )
 
@@ -205,10 +763,15 @@ class Orchestrator:
             logger.error("step_not_found", step_id=step_id)
             return False
 
+        expected_status = step.status
         step.status = WorkflowStatus.RUNNING
         step.started_at = datetime.utcnow()
-        self.state.current_step_id = step_id
-        await self._save_state()
+        step.attempt += 1
+        if not await self._apply_transitions(
+            [(step, expected_status)], current_step_id=step_id
+        ):
+            # Already dispatched by another replica
+            return False
 
         logger.info(
             "step_started",
@@ -217,25 +780,98 @@ class Orchestrator:
             agent_type=step.agent_type,
         )
 
-        # Collect inputs from dependencies
+        # Collect inputs from dependencies. The merged input is only sent with
+        # the task; the stored input keeps just the step's own data, since the
+        # dependency outputs are already stored under their own steps.
+        await self.load_step_data(step_id, *step.depends_on)
         dep_outputs = self._collect_step_outputs(step)
         step.input_data.update(dep_outputs)
 
-        # Dispatch task to agent
-        rabbitmq = await get_rabbitmq_client()
-        await rabbitmq.publish_agent_task(
-            step.agent_type,
-            {
-                "workflow_id": self.workflow_id,
-                "step_id": step_id,
-                "company_id": self.state.company_id,
-                "session_id": self.state.session_id,
-                "input_data": step.input_data,
-            },
-        )
+        # Dispatch task to agent, with large inputs sent as claim references
+        try:
+            rabbitmq = await get_rabbitmq_client()
+            await rabbitmq.publish_agent_task(
+                step.agent_type,
+                {
+                    "workflow_id": self.workflow_id,
+                    "step_id": step_id,
+                    "company_id": self.state.company_id,
+                    "session_id": self.state.session_id,
+                    "attempt": step.attempt,
+                    "idempotency_key": idempotency_key(self.workflow_id, step_id, step.attempt),
+                    "input_data": await claim_check.offload(step.input_data),
+                },
+                lane=self.state.lane,
+            )
+        except Exception:
+            # Never dispatched, so the next dispatch may pick it up again
+            step.status = WorkflowStatus.PENDING
+            await self._apply_transitions([(step, WorkflowStatus.RUNNING)])
+            raise
 
         return True
 
+    async def dispatch_ready_steps(self) -> list[str]:
+        """
+        Dispatch all ready steps concurrently, within the parallelism caps.
+
+        Ready steps are admitted in topological order. Steps over the
+        per-workflow cap stay pending and are picked up when an in-flight
+        step of this workflow finishes; steps over the per-company cap are
+        picked up when any step of the company releases its slot. Slots of
+        steps that were not dispatched after all are released again.
+        """
+        settings = get_settings()
+        ready = self._get_next_steps()
+        running = sum(1 for s in self.state.steps if s.status == WorkflowStatus.RUNNING)
+        candidates = ready[: max(settings.workflow_max_parallel_steps - running, 0)]
+        if not candidates:
+            return []
+
+        now_ms = int(time.time() * 1000)
+        redis = await get_redis_client()
+        admitted = set(
+            await redis.client.eval(
+                _ADMIT_STEPS_SCRIPT,
+                2,
+                *self._slot_keys,
+                settings.company_max_parallel_steps,
+                now_ms,
+                now_ms - settings.company_inflight_stale_seconds * 1000,
+                self.workflow_id,
+                *(self._inflight_member(step.step_id) for step in candidates),
+            )
+        )
+        step_ids = [s.step_id for s in candidates if self._inflight_member(s.step_id) in admitted]
+
+        if len(step_ids) < len(ready):
+            logger.info(
+                "steps_deferred",
+                workflow_id=self.workflow_id,
+                deferred=[s.step_id for s in ready if s.step_id not in step_ids],
+            )
+
+        results = await asyncio.gather(
+            *(self.execute_step(step_id) for step_id in step_ids), return_exceptions=True
+        )
+        dispatched = [
+            step_id for step_id, result in zip(step_ids, results, strict=True) if result is True
+        ]
+        # A step that lost its dispatch to another replica keeps the slot that
+        # replica shares with it, unless that dispatch has already finished
+        unused = []
+        for step_id in step_ids:
+            step = self._get_step(step_id)
+            if step_id in dispatched or (step and step.status == WorkflowStatus.RUNNING):
+                continue
+            unused.append(step_id)
+        await self._release_step_slots(*unused)
+
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+        return dispatched
+
     async def on_step_completed(
         self,
         step_id: str,
@@ -243,92 +879,190 @@ class Orchestrator:
         requires_hitl: bool = False,
     ) -> None:
         """Handle step completion."""
-        step = self._get_step(step_id)
-        if not step:
-            return
+        await self.on_step_results(
+            [
+                {
+                    "step_id": step_id,
+                    "success": True,
+                    "output_data": output_data,
+                    "requires_hitl": requires_hitl,
+                }
+            ]
+        )
 
-        step.output_data = output_data
-        step.completed_at = datetime.utcnow()
+    async def on_step_failed(self, step_id: str, error: str) -> None:
+        """Handle step failure."""
+        await self.on_step_results([{"step_id": step_id, "success": False, "error": error}])
 
-        if requires_hitl:
-            step.status = WorkflowStatus.WAITING_HITL
-            self.state.status = WorkflowStatus.WAITING_HITL
-        else:
-            step.status = WorkflowStatus.COMPLETED
+    async def on_step_results(self, results: list[dict[str, Any]]) -> bool:
+        """
+        Apply several agent results as one transition.
 
-        await self._save_state()
+        Each result has step_id and success, plus output_data and
+        requires_hitl on success or error on failure. A failure fails the
+        workflow; otherwise ready successors of completed steps are
+        dispatched. Returns False if the transition conflicted with a
+        concurrent change.
+        """
+        transitions = []
+        failed = waiting = False
+        now = datetime.utcnow()
+        for result in results:
+            step = self._get_step(result["step_id"])
+            if not step:
+                continue
 
-        logger.info(
-            "step_completed",
-            workflow_id=self.workflow_id,
-            step_id=step_id,
-            requires_hitl=requires_hitl,
-        )
+            transitions.append((step, step.status))
+            step.completed_at = now
+            if not result["success"]:
+                step.status = WorkflowStatus.FAILED
+                step.error = result.get("error") or "Agent failed"
+                failed = True
+                continue
 
-        # Check if workflow is complete
-        if not requires_hitl:
-            await self._check_workflow_completion()
+            step.output_data = result.get("output_data") or {}
+            self._data_loaded.add(step.step_id)
+            self._mark_dirty(step.step_id, "output")
+            if result.get("requires_hitl"):
+                step.status = WorkflowStatus.WAITING_HITL
+                waiting = True
+            else:
+                step.status = WorkflowStatus.COMPLETED
 
-    async def on_step_failed(self, step_id: str, error: str) -> None:
-        """Handle step failure."""
-        step = self._get_step(step_id)
-        if not step:
-            return
+        if not transitions:
+            return True
 
-        step.status = WorkflowStatus.FAILED
-        step.error = error
-        step.completed_at = datetime.utcnow()
-        self.state.status = WorkflowStatus.FAILED
+        if failed:
+            workflow_status = WorkflowStatus.FAILED
+        elif waiting:
+            workflow_status = WorkflowStatus.WAITING_HITL
+        else:
+            workflow_status = None
+        if not await self._apply_transitions(transitions, workflow_status):
+            return False
 
-        await self._save_state()
+        for step, _ in transitions:
+            if step.status == WorkflowStatus.FAILED:
+                logger.error(
+                    "step_failed",
+                    workflow_id=self.workflow_id,
+                    step_id=step.step_id,
+                    error=step.error,
+                )
+            else:
+                logger.info(
+                    "step_completed",
+                    workflow_id=self.workflow_id,
+                    step_id=step.step_id,
+                    requires_hitl=step.status == WorkflowStatus.WAITING_HITL,
+                )
 
-        logger.error(
-            "step_failed",
-            workflow_id=self.workflow_id,
-            step_id=step_id,
-            error=error,
+        await self.finish_step_results([step.step_id for step, _ in transitions])
+        return True
+
+    async def finish_step_results(self, step_ids: list[str]) -> None:
+        """
+        Follow up on applied step results.
+
+        Clears the steps' partial outputs, releases their slots, dispatches
+        ready successors and signals waiters. Every part is idempotent, so a
+        redelivered result whose transition already committed calls this
+        again in case the first delivery failed before finishing it.
+        """
+        steps = [step for step_id in step_ids if (step := self._get_step(step_id))]
+        if not steps:
+            return
+        redis = await get_redis_client()
+        await redis.client.delete(
+            *(step_partial_key(self.workflow_id, step.step_id) for step in steps)
         )
+        await self._release_step_slots(*(step.step_id for step in steps))
+
+        # Check if workflow is complete
+        if self.state.status != WorkflowStatus.FAILED and any(
+            step.status == WorkflowStatus.COMPLETED for step in steps
+        ):
+            await self._check_workflow_completion()
+
+        # Signal after dispatching successors so waiters never see them pending
+        await self._notify_steps_changed(steps)
 
     async def on_hitl_decision(
         self, step_id: str, approved: bool, feedback: str | None = None
     ) -> None:
         """Handle HITL decision."""
-        step = self._get_step(step_id)
-        if not step:
-            return
+        await self.on_hitl_decisions([(step_id, approved, feedback)])
 
-        if approved:
-            step.status = WorkflowStatus.COMPLETED
-            self.state.status = WorkflowStatus.RUNNING
-            logger.info(
-                "hitl_approved",
-                workflow_id=self.workflow_id,
-                step_id=step_id,
-            )
+    async def on_hitl_decisions(
+        self, decisions: list[tuple[str, bool, str | None]]
+    ) -> bool:
+        """
+        Apply several (step_id, approved, feedback) HITL decisions.
+
+        The whole batch is applied as one transition, after which ready
+        successors are dispatched. Returns False if the transition
+        conflicted with a concurrent change.
+        """
+        transitions = []
+        rejected = False
+        for step_id, approved, feedback in decisions:
+            step = self._get_step(step_id)
+            if not step:
+                continue
+
+            transitions.append((step, step.status))
+            if approved:
+                step.status = WorkflowStatus.COMPLETED
+                logger.info(
+                    "hitl_approved",
+                    workflow_id=self.workflow_id,
+                    step_id=step_id,
+                )
+            else:
+                step.status = WorkflowStatus.FAILED
+                step.error = f"HITL rejected: {feedback or 'No feedback'}"
+                rejected = True
+                logger.info(
+                    "hitl_rejected",
+                    workflow_id=self.workflow_id,
+                    step_id=step_id,
+                    feedback=feedback,
+                )
+
+        if not transitions:
+            return True
+
+        # A rejection anywhere in the batch fails the workflow
+        workflow_status = WorkflowStatus.FAILED if rejected else WorkflowStatus.RUNNING
+        if not await self._apply_transitions(transitions, workflow_status):
+            return False
+        if not rejected:
             await self._check_workflow_completion()
-        else:
-            step.status = WorkflowStatus.FAILED
-            step.error = f"HITL rejected: {feedback or 'No feedback'}"
-            self.state.status = WorkflowStatus.FAILED
-            logger.info(
-                "hitl_rejected",
-                workflow_id=self.workflow_id,
-                step_id=step_id,
-                feedback=feedback,
-            )
 
-        await self._save_state()
+        await self._notify_steps_changed([step for step, _ in transitions])
+        return True
 
-    async def _check_workflow_completion(self) -> None:
-        """Check if workflow is complete and start next steps."""
-        # Check if all steps are completed
-        all_completed = all(
-            step.status == WorkflowStatus.COMPLETED for step in self.state.steps
+    async def reset_step(self, step_id: str) -> bool:
+        """
+        Reset a step to pending so it can be retried.
+
+        Returns False if the step does not exist or changed concurrently.
+        """
+        step = self._get_step(step_id)
+        if not step:
+            return False
+
+        expected_status = step.status
+        step.status = WorkflowStatus.PENDING
+        step.error = None
+        return await self._apply_transitions(
+            [(step, expected_status)], WorkflowStatus.RUNNING
         )
 
-        if all_completed:
-            self.state.status = WorkflowStatus.COMPLETED
-            await self._save_state()
+    async def _check_workflow_completion(self) -> None:
+        """Log workflow completion, or start next steps."""
+        # Set by the transition that completed the last step
+        if self.state.status == WorkflowStatus.COMPLETED:
             logger.info(
                 "workflow_completed",
                 workflow_id=self.workflow_id,
@@ -336,27 +1070,36 @@ class Orchestrator:
             return
 
         # Start next available steps
-        next_steps = self._get_next_steps()
-        for step in next_steps:
-            await self.execute_step(step.step_id)
+        await self.dispatch_ready_steps()
 
-    async def run_to_completion(self) -> WorkflowState:
+    async def run_to_completion(
+        self, recheck_interval: float = 30.0
+    ) -> WorkflowState:
         """
         Run the workflow to completion (or until HITL pause).
 
-        This is a simplified synchronous execution for testing.
-        In production, steps would be executed via message queue.
+        Dispatches ready steps as a DAG and then sleeps until a step of this
+        workflow changes state. Changes are signalled over Redis pub/sub by
+        whichever process applies them, so results handled by workers or the
+        event router wake the runner too; all runners of a process share one
+        subscription. The state is re-read from Redis after every signal, and
+        every recheck_interval seconds as a safety net against missed signals.
         """
-        while self.state.status == WorkflowStatus.RUNNING:
-            next_steps = self._get_next_steps()
-            if not next_steps:
-                break
-
-            for step in next_steps:
-                await self.execute_step(step.step_id)
+        # Watch before dispatch so a fast completion is not missed
+        async with get_workflow_signals().watch(self.workflow_id) as changed:
+            while self.state.status == WorkflowStatus.RUNNING:
+                await self.dispatch_ready_steps()
+                in_flight = any(s.status == WorkflowStatus.RUNNING for s in self.state.steps)
+                if not in_flight and not self._get_next_steps():
+                    break
 
-            # Wait for step completion (in real implementation, this would be event-driven)
-            await asyncio.sleep(0.1)
+                # Steps deferred by the company cap are dispatched by whoever
+                # frees a slot, and signal once they change state
+                with contextlib.suppress(TimeoutError):
+                    async with asyncio.timeout(recheck_interval):
+                        await changed.wait()
+                changed.clear()
+                await self._refresh_state()
 
         return self.state
 
@@ -0,0 +1,211 @@
+"""
+Distributed rate limiter for Gemini calls.
+
+A token bucket per model, kept in Redis and updated by a Lua script, enforces
+requests per minute and tokens per minute across all processes. Callers are
+queued by priority rather than failed; lower priorities leave a reserve of
+capacity so HITL-blocking work goes first.
+"""
+
+import asyncio
+import contextlib
+import heapq
+import itertools
+import time
+from enum import IntEnum
+from typing import Any
+
+from src.config import get_settings
+from src.services import get_redis_client
+from src.utils import get_logger
+
+logger = get_logger(__name__)
+
+# Token bucket over requests and tokens, refilled continuously from Redis TIME.
+# KEYS[1] = bucket hash
+# ARGV[1] = requests per minute, ARGV[2] = tokens per minute,
+# ARGV[3] = token cost, ARGV[4] = fraction of capacity to leave in reserve
+# Returns 0 when admitted, otherwise the milliseconds to wait before retrying.
+_TOKEN_BUCKET_SCRIPT = """
+local rpm = tonumber(ARGV[1])
+local tpm = tonumber(ARGV[2])
+local cost = math.min(tonumber(ARGV[3]), tpm)
+local reserve = tonumber(ARGV[4])
+
+local time = redis.call('TIME')
+local now = tonumber(time[1]) * 1000 + math.floor(tonumber(time[2]) / 1000)
+
+local state = redis.call('HMGET', KEYS[1], 'requests', 'tokens', 'ts')
+local requests = tonumber(state[1]) or rpm
+local tokens = tonumber(state[2]) or tpm
+local elapsed = math.max(now - (tonumber(state[3]) or now), 0)
+requests = math.min(rpm, requests + elapsed * rpm / 60000)
+tokens = math.min(tpm, tokens + elapsed * tpm / 60000)
+
+local wait = 0
+local requests_needed = 1 + rpm * reserve
+local tokens_needed = math.min(cost + tpm * reserve, tpm)
+if requests < requests_needed then
+    wait = math.max(wait, (requests_needed - requests) * 60000 / rpm)
+end
+if tokens < tokens_needed then
+    wait = math.max(wait, (tokens_needed - tokens) * 60000 / tpm)
+end
+if wait == 0 then
+    requests = requests - 1
+    tokens = tokens - cost
+end
+
+redis.call('HSET', KEYS[1], 'requests', requests, 'tokens', tokens, 'ts', now)
+redis.call('PEXPIRE', KEYS[1], 120000)
+return math.ceil(wait)
+"""
+
+
+class LLMPriority(IntEnum):
+    """Rate limiter priority; lower values are served first."""
+
+    HITL_BLOCKING = 0
+    NORMAL = 1
+    BATCH = 2
+
+
+# Share of each bucket a priority must leave untouched for higher priorities
+PRIORITY_RESERVE = {
+    LLMPriority.HITL_BLOCKING: 0.0,
+    LLMPriority.NORMAL: 0.1,
+    LLMPriority.BATCH: 0.25,
+}
+
+
+class GeminiRateLimiter:
+    """Queues LLM calls per model until the shared token bucket admits them."""
+
+    def __init__(
+        self,
+        default_rpm: int,
+        default_tpm: int,
+        model_limits: dict[str, dict[str, int]],
+    ) -> None:
+        self._default_rpm = default_rpm
+        self._default_tpm = default_tpm
+        self._model_limits = model_limits
+        self._queues: dict[str, list[tuple[int, int, int, asyncio.Future[None]]]] = {}
+        self._drainers: dict[str, asyncio.Task[None]] = {}
+        # Set when a caller arrives at the head of a model's queue
+        self._head_changed: dict[str, asyncio.Event] = {}
+        self._sequence = itertools.count()
+        self._current_wait: dict[str, float] = {}
+        self.admitted = 0
+        self.total_wait_seconds = 0.0
+
+    def _limits(self, model: str) -> tuple[int, int]:
+        """Get (requests per minute, tokens per minute) for a model."""
+        limits = self._model_limits.get(model, {})
+        return limits.get("rpm", self._default_rpm), limits.get("tpm", self._default_tpm)
+
+    async def acquire(self, model: str, tokens: int, priority: LLMPriority) -> None:
+        """Wait until the model's bucket admits a call costing the given tokens."""
+        started = time.monotonic()
+        future: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        queue = self._queues.setdefault(model, [])
+        heapq.heappush(queue, (int(priority), next(self._sequence), tokens, future))
+        head_changed = self._head_changed.setdefault(model, asyncio.Event())
+        if queue[0][3] is future:
+            # Outranks the caller the drainer may be waiting for
+            head_changed.set()
+
+        if model not in self._drainers:
+            self._drainers[model] = asyncio.create_task(self._drain(model))
+
+        try:
+            await future
+        except asyncio.CancelledError:
+            # Don't keep the drainer waiting for capacity on our behalf
+            head_changed.set()
+            raise
+        waited = time.monotonic() - started
+        self.admitted += 1
+        self.total_wait_seconds += waited
+        if waited >= 1:
+            logger.info(
+                "llm_rate_limited",
+                model=model,
+                priority=priority.name,
+                waited=round(waited, 3),
+            )
+
+    async def _drain(self, model: str) -> None:
+        """Admit queued callers for a model in priority order."""
+        queue = self._queues[model]
+        head_changed = self._head_changed.setdefault(model, asyncio.Event())
+        rpm, tpm = self._limits(model)
+        try:
+            while queue:
+                priority, _, tokens, future = queue[0]
+                if future.done():
+                    heapq.heappop(queue)
+                    continue
+                head_changed.clear()
+
+                try:
+                    redis = await get_redis_client()
+                    wait_ms = await redis.client.eval(
+                        _TOKEN_BUCKET_SCRIPT,
+                        1,
+                        f"ratelimit:gemini:{model}",
+                        rpm,
+                        tpm,
+                        tokens,
+                        PRIORITY_RESERVE[LLMPriority(priority)],
+                    )
+                except Exception as e:
+                    # Fail open: losing rate control beats failing every call
+                    logger.warning("llm_rate_limiter_unavailable", model=model, error=str(e))
+                    wait_ms = 0
+
+                if wait_ms == 0:
+                    heapq.heappop(queue)
+                    future.set_result(None)
+                    self._current_wait[model] = 0.0
+                    continue
+
+                # Wait for the bucket to refill, or for a higher priority
+                # caller, which may need less of it
+                self._current_wait[model] = wait_ms / 1000
+                with contextlib.suppress(TimeoutError):
+                    await asyncio.wait_for(head_changed.wait(), wait_ms / 1000)
+        finally:
+            self._current_wait[model] = 0.0
+            self._drainers.pop(model, None)
+
+    def get_stats(self) -> dict[str, Any]:
+        """Get queue depth and wait time metrics."""
+        return {
+            "admitted": self.admitted,
+            "total_wait_seconds": round(self.total_wait_seconds, 3),
+            "models": {
+                model: {
+                    "queued": sum(1 for *_, future in queue if not future.done()),
+                    "current_wait_seconds": self._current_wait.get(model, 0.0),
+                }
+                for model, queue in self._queues.items()
+            },
+        }
+
+
+# Singleton instance
+_rate_limiter: GeminiRateLimiter | None = None
+
+
+def get_rate_limiter() -> GeminiRateLimiter:
+    """Get Gemini rate limiter singleton."""
+    global _rate_limiter
+    if _rate_limiter is None:
+        settings = get_settings()
+        _rate_limiter = GeminiRateLimiter(
+            default_rpm=settings.gemini_rpm_limit,
+            default_tpm=settings.gemini_tpm_limit,
+            model_limits=settings.gemini_model_rate_limits,
+        )
+    return _rate_limiter
@@ -0,0 +1,213 @@
+"""
+Single-flight coalescing of identical concurrent LLM calls.
+
+Concurrent callers with the same request key share one in-flight generation.
+Within a process they await the same future; across processes (optional) the
+first caller takes a Redis lock and fans the result out over pub/sub.
+"""
+
+import asyncio
+import json
+import time
+from collections.abc import Awaitable, Callable
+from typing import Any
+from uuid import uuid4
+
+from src.config import get_settings
+from src.services import get_redis_client
+from src.utils import get_logger
+
+logger = get_logger(__name__)
+
+# Releases the lock only if it is still held by the given owner token
+_RELEASE_LOCK_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+class SharedCallError(RuntimeError):
+    """A call led by another process failed; its exception type is not known here."""
+
+
+class SingleFlight:
+    """Coalesces concurrent calls that share a key into one execution."""
+
+    def __init__(self, distributed: bool, lock_ttl_seconds: int) -> None:
+        self._distributed = distributed
+        self._lock_ttl_seconds = lock_ttl_seconds
+        self._in_flight: dict[str, asyncio.Future[str]] = {}
+        self.executions = 0
+        self.local_shared = 0
+        self.remote_shared = 0
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[str]]) -> str:
+        """
+        Run fn once for all concurrent callers with the same key.
+
+        Cancelling a follower leaves the shared call running. If the caller
+        running it is cancelled, its followers elect a new one among them.
+        """
+        while (future := self._in_flight.get(key)) is not None:
+            self.local_shared += 1
+            try:
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                task = asyncio.current_task()
+                if not future.cancelled() or (task is not None and task.cancelling()):
+                    raise
+
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
+        try:
+            if self._distributed:
+                result = await self._do_distributed(key, fn)
+            else:
+                self.executions += 1
+                result = await fn()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+        else:
+            future.set_result(result)
+        finally:
+            self._in_flight.pop(key, None)
+        return await future
+
+    async def _do_distributed(self, key: str, fn: Callable[[], Awaitable[str]]) -> str:
+        """
+        Run fn as the cluster-wide leader for key, or wait for the leader's result.
+
+        The lock holds the leader's token, which also names the key its
+        outcome is stored under, so followers only ever read the outcome of
+        the flight they joined. When a leader goes away without an outcome,
+        the followers elect a new leader.
+        """
+        redis = await get_redis_client()
+        lock_key = f"llm:inflight:{key}"
+        deadline = time.monotonic() + self._lock_ttl_seconds
+
+        while time.monotonic() < deadline:
+            token = str(uuid4())
+            if await redis.client.set(lock_key, token, nx=True, ex=self._lock_ttl_seconds):
+                return await self._lead(key, fn, lock_key, token)
+
+            leader_token = await redis.get(lock_key)
+            if leader_token is None:
+                # Released in between; try to take it
+                continue
+            shared = await self._follow(key, lock_key, leader_token, deadline)
+            if shared is not None:
+                self.remote_shared += 1
+                return shared
+
+        # No leader produced a result in time; generate locally
+        logger.warning("single_flight_wait_timeout", key=key)
+        self.executions += 1
+        return await fn()
+
+    @staticmethod
+    def _result_key(key: str, token: str) -> str:
+        """Key and channel of the outcome of the flight led under token."""
+        return f"llm:result:{key}:{token}"
+
+    async def _lead(
+        self,
+        key: str,
+        fn: Callable[[], Awaitable[str]],
+        lock_key: str,
+        token: str,
+    ) -> str:
+        """Execute fn and publish its outcome to followers in other processes."""
+        redis = await get_redis_client()
+        result_key = self._result_key(key, token)
+        self.executions += 1
+        # Left as is if fn is cancelled, which makes followers elect a new leader
+        message: dict[str, Any] = {"cancelled": True}
+        try:
+            result = await fn()
+            message = {"result": result}
+            return result
+        except Exception as e:
+            message = {"error": str(e)}
+            raise
+        finally:
+            try:
+                payload = json.dumps(message)
+                async with redis.pipeline(transaction=False) as pipe:
+                    # Short-lived copy for followers that subscribe after the publish
+                    pipe.set(result_key, payload, ex=self._lock_ttl_seconds)
+                    pipe.publish(result_key, payload)
+                    pipe.eval(_RELEASE_LOCK_SCRIPT, 1, lock_key, token)
+            except Exception as e:
+                logger.warning("single_flight_publish_failed", key=key, error=str(e))
+
+    async def _follow(
+        self, key: str, lock_key: str, token: str, deadline: float
+    ) -> str | None:
+        """
+        Wait for the outcome of the flight led under token.
+
+        Returns None if the leader goes away without a result, or the
+        deadline passes.
+        """
+        redis = await get_redis_client()
+        result_key = self._result_key(key, token)
+        pubsub = redis.client.pubsub()
+        try:
+            await pubsub.subscribe(result_key)
+
+            # The leader may have finished before we subscribed
+            payload = await redis.get(result_key)
+            while payload is None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return None
+                message = await pubsub.get_message(
+                    ignore_subscribe_messages=True, timeout=min(remaining, 1.0)
+                )
+                if message is not None:
+                    payload = message["data"]
+                elif await redis.get(lock_key) != token:
+                    payload = await redis.get(result_key)
+                    if payload is None:
+                        return None
+        finally:
+            await pubsub.unsubscribe(result_key)
+            await pubsub.aclose()
+
+        outcome = json.loads(payload)
+        if outcome.get("cancelled"):
+            return None
+        if "error" in outcome:
+            raise SharedCallError(f"Shared LLM call failed: {outcome['error']}")
+        return str(outcome["result"])
+
+    def get_stats(self) -> dict[str, Any]:
+        """Get coalescing counters."""
+        return {
+            "executions": self.executions,
+            "local_shared": self.local_shared,
+            "remote_shared": self.remote_shared,
+            "in_flight": len(self._in_flight),
+        }
+
+
+# Singleton instance
+_single_flight: SingleFlight | None = None
+
+
+def get_single_flight() -> SingleFlight:
+    """Get single-flight singleton."""
+    global _single_flight
+    if _single_flight is None:
+        settings = get_settings()
+        _single_flight = SingleFlight(
+            distributed=settings.llm_singleflight_distributed,
+            lock_ttl_seconds=settings.llm_singleflight_lock_ttl_seconds,
+        )
+    return _single_flight
@@ -0,0 +1,135 @@
+"""
+Process-wide listener for workflow step change signals.
+
+Whichever process changes a workflow's steps publishes on the workflow's
+signals channel. One pattern subscription per process receives the signals
+of every workflow and wakes the local runners waiting on them, so the number
+of Redis pub/sub connections does not grow with the number of runners.
+"""
+
+import asyncio
+import contextlib
+from collections.abc import AsyncIterator
+from typing import Any
+
+from src.services import get_redis_client
+from src.utils import get_logger
+
+logger = get_logger(__name__)
+
+SIGNALS_CHANNEL_PREFIX = "workflow:signals:"
+
+# How long a new watcher waits for the listener to be subscribed; signals
+# missed meanwhile are caught by the watcher's periodic recheck
+SUBSCRIBE_TIMEOUT_SECONDS = 5.0
+
+
+def step_signals_channel(workflow_id: str) -> str:
+    """Pub/sub channel announcing a workflow's step state changes."""
+    return f"{SIGNALS_CHANNEL_PREFIX}{workflow_id}"
+
+
+class WorkflowSignals:
+    """Wakes local waiters on the step change signals of their workflow."""
+
+    def __init__(self) -> None:
+        self._waiters: dict[str, set[asyncio.Event]] = {}
+        self._listener: asyncio.Task[None] | None = None
+        self._subscribed = asyncio.Event()
+        self.received = 0
+
+    @contextlib.asynccontextmanager
+    async def watch(self, workflow_id: str) -> AsyncIterator[asyncio.Event]:
+        """
+        Watch a workflow's signals.
+
+        Yields an event set on every signal of the workflow, and whenever the
+        listener had to resubscribe and may have missed some; clear it before
+        re-reading the state. Returns once the listener is subscribed, or
+        after SUBSCRIBE_TIMEOUT_SECONDS if Redis is unavailable.
+        """
+        changed = asyncio.Event()
+        self._waiters.setdefault(workflow_id, set()).add(changed)
+        try:
+            self._ensure_listener()
+            with contextlib.suppress(TimeoutError):
+                async with asyncio.timeout(SUBSCRIBE_TIMEOUT_SECONDS):
+                    await self._subscribed.wait()
+            yield changed
+        finally:
+            waiters = self._waiters.get(workflow_id)
+            if waiters is not None:
+                waiters.discard(changed)
+                if not waiters:
+                    del self._waiters[workflow_id]
+
+    def _ensure_listener(self) -> None:
+        """Start the listener on first use."""
+        if self._listener is None or self._listener.done():
+            self._listener = asyncio.create_task(self._listen())
+
+    async def _listen(self) -> None:
+        """Dispatch signals of every workflow, resubscribing on errors."""
+        while True:
+            try:
+                redis = await get_redis_client()
+                pubsub = redis.client.pubsub()
+                await pubsub.psubscribe(f"{SIGNALS_CHANNEL_PREFIX}*")
+                self._subscribed.set()
+                # Signals may have been missed while not subscribed
+                self._wake_all()
+                try:
+                    async for message in pubsub.listen():
+                        if message["type"] == "pmessage":
+                            self._wake(message["channel"])
+                finally:
+                    self._subscribed.clear()
+                    await pubsub.aclose()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("workflow_signals_listener_failed", error=str(e))
+            await asyncio.sleep(1.0)
+
+    def _wake(self, channel: str) -> None:
+        """Wake the waiters of the workflow a signal was published for."""
+        self.received += 1
+        workflow_id = channel.removeprefix(SIGNALS_CHANNEL_PREFIX)
+        for changed in self._waiters.get(workflow_id, ()):
+            changed.set()
+
+    def _wake_all(self) -> None:
+        """Wake every waiter."""
+        for waiters in self._waiters.values():
+            for changed in waiters:
+                changed.set()
+
+    async def stop(self) -> None:
+        """Stop the listener."""
+        if self._listener:
+            self._listener.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._listener
+            self._listener = None
+        self._subscribed.clear()
+
+    def get_stats(self) -> dict[str, Any]:
+        """Get listener state and waiter counts."""
+        return {
+            "subscribed": self._subscribed.is_set(),
+            "watched_workflows": len(self._waiters),
+            "waiters": sum(len(waiters) for waiters in self._waiters.values()),
+            "received": self.received,
+        }
+
+
+# Singleton instance
+_workflow_signals: WorkflowSignals | None = None
+
+
+def get_workflow_signals() -> WorkflowSignals:
+    """Get workflow signals listener singleton."""
+    global _workflow_signals
+    if _workflow_signals is None:
+        _workflow_signals = WorkflowSignals()
+    return _workflow_signals
@@ -0,0 +1,288 @@
+"""
+HR Policy Advisor - Event Router Entry Point.
+
+Consumes orchestrator.events, agent.results and hitl.responses and advances
+workflows from them, so API handlers and agent workers only record outcomes
+and publish events. Events are sharded by workflow_id onto in-process shard
+loops, which keeps each workflow's events ordered within a router and lets
+the events of one workflow that arrive together be applied as one transition.
+"""
+
+import argparse
+import asyncio
+import signal
+import zlib
+from typing import Any
+
+from src.config import get_settings
+from src.core import Orchestrator, WorkflowStatus
+from src.services import (
+    RetryLater,
+    claim_check,
+    close_rabbitmq_client,
+    close_redis_client,
+    get_rabbitmq_client,
+    get_redis_client,
+)
+from src.utils import get_logger, setup_logging
+
+logger = get_logger(__name__)
+
+EVENT_QUEUES = ("orchestrator.events", "agent.results", "hitl.responses")
+
+# Transitions retried after a conflict with a concurrent writer, e.g. another
+# router replica holding events for the same workflow
+MAX_APPLY_ATTEMPTS = 3
+
+_RoutedEvent = tuple[str, dict[str, Any], asyncio.Future[None]]
+
+
+def _step_status(orchestrator: Orchestrator, event: dict[str, Any]) -> WorkflowStatus | None:
+    """
+    Current status of the step an event refers to.
+
+    None if the step does not exist, or if the event is a result of an
+    earlier dispatch of a step that has since been retried.
+    """
+    step = next(
+        (s for s in orchestrator.state.steps if s.step_id == event.get("step_id")), None
+    )
+    if step is None or (event.get("attempt") or step.attempt) != step.attempt:
+        return None
+    return step.status
+
+
+class EventRouter:
+    """Applies workflow events from RabbitMQ, batched per workflow."""
+
+    def __init__(self, shards: int, prefetch_count: int, max_batch: int) -> None:
+        self._shards: list[asyncio.Queue[_RoutedEvent]] = [
+            asyncio.Queue() for _ in range(shards)
+        ]
+        self._prefetch_count = prefetch_count
+        self._max_batch = max_batch
+        self._consumer_tags: list[str] = []
+        self._tasks: list[asyncio.Task[None]] = []
+        self._stop_event = asyncio.Event()
+        self.events_applied = 0
+        self.batches_applied = 0
+        self.conflicts = 0
+
+    async def start(self) -> None:
+        """Start the shard loops and subscribe to the event queues."""
+        self._tasks = [asyncio.create_task(self._run_shard(shard)) for shard in self._shards]
+
+        rabbitmq = await get_rabbitmq_client()
+        for queue_name in EVENT_QUEUES:
+
+            async def handler(event: dict[str, Any], queue_name: str = queue_name) -> None:
+                await self._route(queue_name, event)
+
+            consumer_tag = await rabbitmq.consume(
+                queue_name,
+                handler,
+                prefetch_count=self._prefetch_count,
+                requeue=True,
+                retry=True,
+            )
+            self._consumer_tags.append(consumer_tag)
+
+        logger.info("event_router_started", shards=len(self._shards))
+
+    def stop(self) -> None:
+        """Request a graceful shutdown."""
+        self._stop_event.set()
+
+    async def wait_stopped(self) -> None:
+        """Block until stop() is called, then shut down."""
+        await self._stop_event.wait()
+        await self.shutdown()
+
+    async def shutdown(self) -> None:
+        """
+        Stop consuming, finish the batches being applied and stop the shards.
+
+        Events still queued in a shard are not acked, so their messages are
+        redelivered once the consumer channels close.
+        """
+        rabbitmq = await get_rabbitmq_client()
+        for consumer_tag in self._consumer_tags:
+            await rabbitmq.cancel_consumer(consumer_tag)
+
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks.clear()
+
+        for shard in self._shards:
+            while not shard.empty():
+                _, _, future = shard.get_nowait()
+                future.cancel()
+
+        for consumer_tag in self._consumer_tags:
+            await rabbitmq.close_consumer_channel(consumer_tag)
+        self._consumer_tags.clear()
+        logger.info(
+            "event_router_stopped",
+            events_applied=self.events_applied,
+            batches_applied=self.batches_applied,
+            conflicts=self.conflicts,
+        )
+
+    async def _route(self, queue_name: str, event: dict[str, Any]) -> None:
+        """
+        Hand an event to its workflow's shard and wait until it is applied.
+
+        Returning acks the message, so an event is acked only after its
+        transition is saved. Orchestrator events other than workflow_started
+        only report changes and are acked right away. Events that fail to
+        apply are retried with backoff, then parked.
+        """
+        workflow_id = event.get("workflow_id")
+        if not workflow_id:
+            return
+        if queue_name == "orchestrator.events" and event.get("event") != "workflow_started":
+            return
+        future: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        shard = self._shards[zlib.crc32(workflow_id.encode()) % len(self._shards)]
+        shard.put_nowait((queue_name, event, future))
+        await future
+
+    async def _run_shard(self, shard: asyncio.Queue[_RoutedEvent]) -> None:
+        """Apply a shard's events, taking everything already queued as one batch."""
+        while True:
+            batch = [await shard.get()]
+            while len(batch) < self._max_batch and not shard.empty():
+                batch.append(shard.get_nowait())
+
+            by_workflow: dict[str, list[_RoutedEvent]] = {}
+            for item in batch:
+                by_workflow.setdefault(item[1]["workflow_id"], []).append(item)
+
+            for workflow_id, items in by_workflow.items():
+                try:
+                    deferred = await self._apply(
+                        workflow_id, [(queue_name, event) for queue_name, event, _ in items]
+                    )
+                except Exception as e:
+                    logger.error("event_apply_failed", workflow_id=workflow_id, error=str(e))
+                    for _, _, future in items:
+                        if not future.done():
+                            future.set_exception(e)
+                    continue
+
+                for index, (_, _, future) in enumerate(items):
+                    if future.done():
+                        continue
+                    if index in deferred:
+                        # Delayed so it is seen again after the step's result
+                        future.set_exception(RetryLater("HITL decision precedes step result"))
+                    else:
+                        future.set_result(None)
+
+    async def _apply(
+        self, workflow_id: str, events: list[tuple[str, dict[str, Any]]]
+    ) -> set[int]:
+        """
+        Apply one workflow's events: agent results, then HITL decisions.
+
+        Events whose step is no longer in the status they respond to are
+        dropped, so redeliveries and retries after a conflict never apply an
+        outcome twice; redelivered results still rerun the follow-ups of
+        their step. Returns the positions of HITL decisions for steps
+        whose result has not been applied yet.
+        """
+        for _ in range(MAX_APPLY_ATTEMPTS):
+            orchestrator = await Orchestrator.load(workflow_id)
+            if orchestrator is None:
+                logger.warning("event_workflow_missing", workflow_id=workflow_id)
+                return set()
+
+            # Keyed by step, so a redelivered result in the same batch applies once
+            results = {
+                event["step_id"]: event
+                for queue_name, event in reversed(events)
+                if queue_name == "agent.results"
+                and _step_status(orchestrator, event) == WorkflowStatus.RUNNING
+            }
+            for result in results.values():
+                if result.get("output_data"):
+                    result["output_data"] = await claim_check.resolve(result["output_data"])
+            if results and not await orchestrator.on_step_results(list(results.values())):
+                self.conflicts += 1
+                continue
+            # Results applied by an earlier delivery that may have failed
+            # before finishing their follow-ups, e.g. dispatching successors
+            applied = {
+                event["step_id"]
+                for queue_name, event in events
+                if queue_name == "agent.results"
+                and event["step_id"] not in results
+                and orchestrator.has_result(event["step_id"], event.get("attempt"))
+            }
+            if applied:
+                await orchestrator.finish_step_results(sorted(applied))
+
+            # Decisions are matched against the state after the results
+            decisions: dict[str, tuple[str, bool, str | None]] = {}
+            deferred = set()
+            for index, (queue_name, event) in enumerate(events):
+                if queue_name != "hitl.responses":
+                    continue
+                status = _step_status(orchestrator, event)
+                if status == WorkflowStatus.WAITING_HITL:
+                    feedback = event.get("feedback")
+                    if event.get("expired"):
+                        feedback = "Approval request expired"
+                    decisions.setdefault(
+                        event["step_id"], (event["step_id"], event["approved"], feedback)
+                    )
+                elif status == WorkflowStatus.RUNNING:
+                    deferred.add(index)
+            if decisions and not await orchestrator.on_hitl_decisions(list(decisions.values())):
+                self.conflicts += 1
+                continue
+
+            started = any(event.get("event") == "workflow_started" for _, event in events)
+            if started and orchestrator.state.status == WorkflowStatus.RUNNING:
+                await orchestrator.dispatch_ready_steps()
+
+            self.events_applied += len(events) - len(deferred)
+            self.batches_applied += 1
+            return deferred
+
+        raise RuntimeError(f"Workflow {workflow_id} kept changing concurrently")
+
+
+async def run_event_router() -> None:
+    """Run the event router until SIGTERM or SIGINT."""
+    setup_logging()
+    settings = get_settings()
+
+    router = EventRouter(
+        shards=settings.event_router_shards,
+        prefetch_count=settings.event_router_prefetch_count,
+        max_batch=settings.event_router_max_batch,
+    )
+
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(sig, router.stop)
+
+    await get_redis_client()
+    try:
+        await router.start()
+        await router.wait_stopped()
+    finally:
+        await close_rabbitmq_client()
+        await close_redis_client()
+
+
+def main() -> None:
+    """Run the event router."""
+    argparse.ArgumentParser(description="Route workflow events to the orchestrator.").parse_args()
+    asyncio.run(run_event_router())
+
+
+if __name__ == "__main__":
+    main()
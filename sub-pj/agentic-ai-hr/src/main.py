@@ -6,7 +6,7 @@ Human-in-the-Loop approval workflows.
 """
 
 from contextlib import asynccontextmanager
-from typing import AsyncGenerator
+from typing import Any, AsyncGenerator
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
@@ -14,15 +14,26 @@ from fastapi.middleware.cors import CORSMiddleware
 from src.api import (
     HealthResponse,
     RequestLoggingMiddleware,
+    admin_router,
     companies_router,
     policies_router,
     reviews_router,
 )
 from src.config import get_settings
+from src.core import (
+    get_heartbeat_service,
+    get_hitl_expiry_sweeper,
+    get_llm_cache,
+    get_rate_limiter,
+    get_single_flight,
+    get_workflow_signals,
+)
 from src.services import (
+    close_async_vault_client,
     close_rabbitmq_client,
     close_redis_client,
     get_rabbitmq_client,
+    get_read_cache,
     get_redis_client,
 )
 from src.utils import get_logger, setup_logging
@@ -57,6 +68,9 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
     except Exception as e:
         logger.warning("rabbitmq_connection_failed", error=str(e))
 
+    if settings.hitl_expiry_sweeper_enabled:
+        get_hitl_expiry_sweeper().start()
+
     logger.info("app_started")
 
     yield
@@ -64,6 +78,12 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
     # Shutdown
     logger.info("app_stopping")
 
+    await get_hitl_expiry_sweeper().stop()
+    await get_heartbeat_service().stop()
+    await get_workflow_signals().stop()
+    await get_read_cache().stop()
+
+    await close_async_vault_client()
     await close_redis_client()
     await close_rabbitmq_client()
 
@@ -99,6 +119,7 @@ def create_app() -> FastAPI:
     app.include_router(companies_router, prefix="/api/v1")
     app.include_router(policies_router, prefix="/api/v1")
     app.include_router(reviews_router, prefix="/api/v1")
+    app.include_router(admin_router, prefix="/api/v1")
 
     # Health check endpoint
     @app.get("/health", response_model=HealthResponse, tags=["health"])
@@ -110,6 +131,26 @@ def create_app() -> FastAPI:
             environment=settings.env,
         )
 
+    # Runtime metrics endpoint
+    @app.get("/metrics", tags=["health"])
+    async def metrics() -> dict[str, Any]:
+        """In-process runtime counters."""
+        try:
+            rabbitmq_stats = (await get_rabbitmq_client()).get_stats()
+        except Exception as e:
+            rabbitmq_stats = {"connected": False, "error": str(e)}
+
+        return {
+            "llm_cache": get_llm_cache().get_stats(),
+            "llm_single_flight": get_single_flight().get_stats(),
+            "llm_rate_limiter": get_rate_limiter().get_stats(),
+            "agent_heartbeats": get_heartbeat_service().get_stats(),
+            "hitl_expiry": get_hitl_expiry_sweeper().get_stats(),
+            "read_cache": get_read_cache().get_stats(),
+            "workflow_signals": get_workflow_signals().get_stats(),
+            "rabbitmq": rabbitmq_stats,
+        }
+
     # Root endpoint
     @app.get("/", tags=["root"])
     async def root() -> dict[str, str]:
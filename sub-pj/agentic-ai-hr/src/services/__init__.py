@@ -1,21 +1,44 @@
 """Service clients for external dependencies."""
 
+from . import claim_check, codec, idempotency
 from .rabbitmq_client import (
     RabbitMQClient,
+    RetryLater,
+    TaskLane,
+    agent_task_queue,
     close_rabbitmq_client,
     get_rabbitmq_client,
 )
+from .read_cache import ReadThroughCache, get_read_cache
 from .redis_client import RedisClient, close_redis_client, get_redis_client
-from .vault_client import VaultClient, close_vault_client, get_vault_client
+from .vault_client import (
+    AsyncVaultClient,
+    VaultClient,
+    close_async_vault_client,
+    close_vault_client,
+    get_async_vault_client,
+    get_vault_client,
+)
 
 __all__ = [
+    "codec",
+    "claim_check",
+    "idempotency",
     "RedisClient",
     "get_redis_client",
     "close_redis_client",
+    "ReadThroughCache",
+    "get_read_cache",
     "RabbitMQClient",
+    "RetryLater",
+    "TaskLane",
+    "agent_task_queue",
     "get_rabbitmq_client",
     "close_rabbitmq_client",
     "VaultClient",
     "get_vault_client",
     "close_vault_client",
+    "AsyncVaultClient",
+    "get_async_vault_client",
+    "close_async_vault_client",
 ]
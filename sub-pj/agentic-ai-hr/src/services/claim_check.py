@@ -0,0 +1,106 @@
+"""
+Claim-check offloading of large task payloads.
+
+Agent tasks carry the outputs of every dependency step. Top-level values
+above a size threshold are stored once in Redis under a content-addressed
+key, and the message carries a small reference in their place, so the
+broker persists and holds only the references. Workers resolve references
+right before running the agent.
+"""
+
+import hashlib
+import re
+from typing import Any
+
+from src.config import get_settings
+from src.services import codec
+from src.services.redis_client import get_redis_client
+from src.utils import get_logger
+
+logger = get_logger(__name__)
+
+CLAIM_KEY_PREFIX = "claim:"
+
+# Marker key of a reference object: {"$claim": "<sha256>", "size": <bytes>}
+CLAIM_REF_FIELD = "$claim"
+
+_DIGEST_PATTERN = re.compile(r"[0-9a-f]{64}")
+
+
+def is_claim_ref(value: Any) -> bool:
+    """
+    Check whether a value is a claim reference.
+
+    Only dicts of exactly the reference's shape qualify, so user data that
+    merely contains a "$claim" key is passed through as is.
+    """
+    return (
+        isinstance(value, dict)
+        and value.keys() == {CLAIM_REF_FIELD, "size"}
+        and isinstance(value[CLAIM_REF_FIELD], str)
+        and _DIGEST_PATTERN.fullmatch(value[CLAIM_REF_FIELD]) is not None
+        and isinstance(value["size"], int)
+    )
+
+
+async def offload(payload: dict[str, Any]) -> dict[str, Any]:
+    """
+    Replace large top-level values of a payload with claim references.
+
+    Returns a new dict; the payload itself is left unchanged. Identical
+    values share one stored copy, whose TTL is refreshed on every offload.
+    """
+    settings = get_settings()
+    if not settings.claim_check_enabled:
+        return payload
+
+    result: dict[str, Any] = {}
+    claims: dict[str, bytes] = {}
+    for field, value in payload.items():
+        # Sized as it would travel in the message, before any compression
+        plain = codec.encode(value, compress=False)
+        # A small value shaped like a reference is stored too, so it is not
+        # mistaken for one when resolved
+        if len(plain) < settings.claim_check_threshold_bytes and not is_claim_ref(value):
+            result[field] = value
+            continue
+        digest = hashlib.sha256(plain).hexdigest()
+        claims[digest] = codec.encode(value)
+        result[field] = {CLAIM_REF_FIELD: digest, "size": len(plain)}
+
+    if not claims:
+        return payload
+
+    redis = await get_redis_client()
+    async with redis.pipeline() as pipe:
+        for digest, encoded in claims.items():
+            pipe.set(f"{CLAIM_KEY_PREFIX}{digest}", encoded, ex=settings.claim_check_ttl_seconds)
+
+    logger.debug("payload_offloaded", claims=len(claims))
+    return result
+
+
+async def resolve(payload: dict[str, Any]) -> dict[str, Any]:
+    """
+    Replace claim references in a payload with the stored values.
+
+    Raises LookupError if a referenced value has expired.
+    """
+    refs = {
+        field: value[CLAIM_REF_FIELD] for field, value in payload.items() if is_claim_ref(value)
+    }
+    if not refs:
+        return payload
+
+    redis = await get_redis_client()
+    digests = list(set(refs.values()))
+    values = await redis.raw_client.mget([f"{CLAIM_KEY_PREFIX}{digest}" for digest in digests])
+    stored = dict(zip(digests, values, strict=True))
+
+    result = dict(payload)
+    for field, digest in refs.items():
+        raw = stored[digest]
+        if raw is None:
+            raise LookupError(f"Claim-checked payload {field!r} ({digest}) is missing or expired")
+        result[field] = codec.decode(raw)
+    return result
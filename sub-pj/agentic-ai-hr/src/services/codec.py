@@ -0,0 +1,65 @@
+"""
+Serialization of JSON payloads stored in Redis.
+
+Values are encoded with orjson. Optionally, payloads above a size threshold
+are stored as zstd-compressed msgpack behind a short binary header. Plain
+JSON carries no header, so keys written before the codec existed, and Lua
+scripts reading small fields, keep working unchanged.
+"""
+
+from typing import Any
+
+import orjson
+
+from src.config import get_settings
+from src.utils import get_logger
+
+try:
+    import msgpack
+    import zstandard
+
+    COMPRESSION_AVAILABLE = True
+except ImportError:  # Optional: pip install hr-policy-advisor[compression]
+    COMPRESSION_AVAILABLE = False
+
+logger = get_logger(__name__)
+
+# A JSON document never starts with NUL; the rest names the format version
+COMPRESSED_HEADER = b"\x00HRz1"
+
+_ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS
+
+
+def encode(value: Any, compress: bool = True) -> bytes:
+    """
+    Serialize a JSON-compatible value for storage.
+
+    With compress, values at or above the configured threshold are stored
+    as compressed msgpack when compression is enabled and available.
+    """
+    data = orjson.dumps(value, option=_ORJSON_OPTIONS)
+    settings = get_settings()
+    if (
+        not compress
+        or not settings.redis_compression_enabled
+        or len(data) < settings.redis_compression_threshold_bytes
+    ):
+        return data
+
+    if not COMPRESSION_AVAILABLE:
+        logger.warning("redis_compression_unavailable", reason="msgpack/zstandard not installed")
+        return data
+
+    packed = msgpack.packb(value, use_bin_type=True)
+    compressor = zstandard.ZstdCompressor(level=settings.redis_compression_level)
+    return COMPRESSED_HEADER + compressor.compress(packed)
+
+
+def decode(raw: bytes | str) -> Any:
+    """Deserialize a stored value written by encode or as plain JSON."""
+    if isinstance(raw, bytes) and raw.startswith(COMPRESSED_HEADER):
+        if not COMPRESSION_AVAILABLE:
+            raise RuntimeError("Compressed Redis value found but msgpack/zstandard are not installed")
+        packed = zstandard.ZstdDecompressor().decompress(raw[len(COMPRESSED_HEADER) :])
+        return msgpack.unpackb(packed, raw=False)
+    return orjson.loads(raw)
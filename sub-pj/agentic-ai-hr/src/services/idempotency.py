@@ -0,0 +1,153 @@
+"""
+Idempotent processing of redelivered agent tasks.
+
+Agent tasks are delivered at least once, so a consumer restart or a lost ack
+redelivers a task that may already have run its agent. Each task carries an
+idempotency key naming its workflow step and dispatch attempt. A consumer
+claims the key with SET NX before running the agent and holds it with a
+lease it refreshes while running; when done, it stores the outcome under the
+key for a dedup window, and later deliveries get that outcome instead of
+running the agent again.
+"""
+
+import asyncio
+import contextlib
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from typing import Any
+from uuid import uuid4
+
+from src.config import get_settings
+from src.services import codec
+from src.services.rabbitmq_client import RetryLater
+from src.services.redis_client import get_redis_client
+from src.utils import get_logger
+
+logger = get_logger(__name__)
+
+IDEMPOTENCY_KEY_PREFIX = "idempotency:"
+
+# Value held while a consumer processes the key; outcomes are codec-encoded
+# and so never start with it
+_PENDING_PREFIX = b"pending:"
+
+# KEYS[1] = idempotency key
+# ARGV[1] = pending marker, ARGV[2] = lease in ms
+# Returns nil if claimed, else the stored value
+_CLAIM_SCRIPT = """
+if redis.call('SET', KEYS[1], ARGV[1], 'NX', 'PX', ARGV[2]) then
+    return false
+end
+return redis.call('GET', KEYS[1])
+"""
+
+# KEYS[1] = idempotency key
+# ARGV[1] = pending marker, ARGV[2] = lease in ms (0 deletes the key)
+_REFRESH_SCRIPT = """
+if redis.call('GET', KEYS[1]) ~= ARGV[1] then
+    return 0
+end
+if tonumber(ARGV[2]) == 0 then
+    return redis.call('DEL', KEYS[1])
+end
+return redis.call('PEXPIRE', KEYS[1], ARGV[2])
+"""
+
+
+def idempotency_key(workflow_id: str, step_id: str, attempt: int) -> str:
+    """Build the idempotency key of one dispatch of a workflow step."""
+    return f"{workflow_id}:{step_id}:{attempt}"
+
+
+def workflow_event_key(workflow_id: str, event: str) -> str:
+    """Build the idempotency key of a once-per-workflow event."""
+    return f"{workflow_id}:{event}"
+
+
+def hitl_response_key(request_id: str) -> str:
+    """Build the idempotency key of the response closing a HITL request."""
+    return f"hitl:{request_id}"
+
+
+def _pending_marker(token: str) -> bytes:
+    """Build the value held under a key claimed with token."""
+    return _PENDING_PREFIX + token.encode()
+
+
+async def claim(key: str) -> tuple[str | None, dict[str, Any] | None]:
+    """
+    Claim a key before processing its message.
+
+    Returns (token, None) if this consumer should process the message, or
+    (None, outcome) for a duplicate whose outcome is already stored. Raises
+    RetryLater while another consumer holds the key, so the message is
+    delayed, without using up its retries, until that consumer finishes or
+    its lease lapses.
+    """
+    settings = get_settings()
+    token = uuid4().hex
+    redis = await get_redis_client()
+    stored = await redis.raw_client.eval(
+        _CLAIM_SCRIPT,
+        1,
+        f"{IDEMPOTENCY_KEY_PREFIX}{key}",
+        _pending_marker(token),
+        settings.idempotency_lease_seconds * 1000,
+    )
+    if stored is None:
+        return token, None
+    if stored.startswith(_PENDING_PREFIX):
+        raise RetryLater(f"Message {key} is being processed by another consumer")
+    return None, codec.decode(stored)
+
+
+async def complete(key: str, outcome: dict[str, Any]) -> None:
+    """Store a processed message's outcome for the dedup window."""
+    redis = await get_redis_client()
+    await redis.raw_client.set(
+        f"{IDEMPOTENCY_KEY_PREFIX}{key}",
+        codec.encode(outcome),
+        ex=get_settings().idempotency_window_seconds,
+    )
+
+
+async def release(key: str, token: str) -> None:
+    """Give up a claim without an outcome, so a redelivery processes the message."""
+    redis = await get_redis_client()
+    await redis.raw_client.eval(
+        _REFRESH_SCRIPT, 1, f"{IDEMPOTENCY_KEY_PREFIX}{key}", _pending_marker(token), 0
+    )
+
+
+@asynccontextmanager
+async def keep_alive(key: str, token: str) -> AsyncIterator[None]:
+    """Refresh a claim's lease while the block runs."""
+    lease_ms = get_settings().idempotency_lease_seconds * 1000
+
+    async def refresh() -> None:
+        """Extend the lease every third of it, until the claim is lost."""
+        redis = await get_redis_client()
+        while True:
+            await asyncio.sleep(lease_ms / 3000)
+            try:
+                held = await redis.raw_client.eval(
+                    _REFRESH_SCRIPT,
+                    1,
+                    f"{IDEMPOTENCY_KEY_PREFIX}{key}",
+                    _pending_marker(token),
+                    lease_ms,
+                )
+            except Exception as e:
+                logger.warning("idempotency_refresh_failed", key=key, error=str(e))
+                continue
+            if not held:
+                logger.warning("idempotency_claim_lost", key=key)
+                return
+
+    refresher = asyncio.create_task(refresh())
+    try:
+        yield
+    finally:
+        refresher.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await refresher
@@ -3,9 +3,16 @@ RabbitMQ client for task queue and agent communication.
 
 Provides async message publishing and consuming for
 agent task distribution and inter-agent communication.
+Messages are published over a pool of confirm-mode channels, so a publish
+returns only once the broker has taken responsibility for the message.
 """
 
-from collections.abc import Awaitable, Callable
+import asyncio
+import json
+import time
+from collections.abc import AsyncIterator, Awaitable, Callable
+from contextlib import asynccontextmanager
+from enum import StrEnum
 from typing import Any
 
 import aio_pika
@@ -20,6 +27,98 @@ logger = get_logger(__name__)
 # Type alias for message handlers
 MessageHandler = Callable[[dict[str, Any]], Awaitable[None]]
 
+# Called with a parked message's body and the error that exhausted its retries
+ParkedHandler = Callable[[dict[str, Any], Exception], Awaitable[None]]
+
+# Called with a parked message's body to replay it in place of republishing
+ParkedReplay = Callable[[dict[str, Any]], Awaitable[None]]
+
+# Headers set on messages that failed and were sent for retry or parked
+RETRY_COUNT_HEADER = "x-retry-count"
+LAST_ERROR_HEADER = "x-last-error"
+
+
+class RetryLater(Exception):
+    """
+    Raised by a handler whose message cannot be processed yet.
+
+    With retry, the message comes back after the first backoff delay; unlike
+    a failure, this does not count against its retry budget.
+    """
+
+
+# Queues declared with x-max-priority, and their highest priority. Every
+# process declares them with the same arguments.
+PRIORITY_QUEUES = {
+    "hitl.responses": 10,
+}
+
+
+class TaskLane(StrEnum):
+    """Agent task lane; each lane has its own queue per agent type."""
+
+    INTERACTIVE = "interactive"
+    BATCH = "batch"
+
+
+def agent_task_queue(agent_type: str, lane: TaskLane = TaskLane.INTERACTIVE) -> str:
+    """Task queue of an agent type in the given lane."""
+    if lane == TaskLane.BATCH:
+        return f"agent.{agent_type}.tasks.batch"
+    return f"agent.{agent_type}.tasks"
+
+
+def retry_queue_name(queue_name: str, level: int) -> str:
+    """Delay queue for the given step of a queue's backoff ladder (1-based)."""
+    return f"{queue_name}.retry.{level}"
+
+
+def parking_queue_name(queue_name: str) -> str:
+    """Queue holding a queue's messages that ran out of retries."""
+    return f"{queue_name}.parking"
+
+
+class PublishChannel:
+    """A confirm-mode channel of the publish pool, with its counters."""
+
+    def __init__(self, index: int, channel: AbstractChannel) -> None:
+        self.index = index
+        self.channel = channel
+        self.published = 0
+        self.failed = 0
+        self.confirm_seconds_total = 0.0
+        self.max_confirm_seconds = 0.0
+        self.started_at = time.monotonic()
+
+    async def publish(self, message: Message, routing_key: str) -> None:
+        """Publish one message and wait for the broker's confirm."""
+        started = time.monotonic()
+        try:
+            await self.channel.default_exchange.publish(message, routing_key=routing_key)
+        except Exception:
+            self.failed += 1
+            raise
+        latency = time.monotonic() - started
+        self.published += 1
+        self.confirm_seconds_total += latency
+        self.max_confirm_seconds = max(self.max_confirm_seconds, latency)
+
+    def get_stats(self) -> dict[str, Any]:
+        """Get throughput and confirm latency of this channel."""
+        elapsed = time.monotonic() - self.started_at
+        return {
+            "channel": self.index,
+            "published": self.published,
+            "failed": self.failed,
+            "messages_per_second": round(self.published / elapsed, 2) if elapsed else 0.0,
+            "avg_confirm_ms": (
+                round(self.confirm_seconds_total / self.published * 1000, 2)
+                if self.published
+                else 0.0
+            ),
+            "max_confirm_ms": round(self.max_confirm_seconds * 1000, 2),
+        }
+
 
 class RabbitMQClient:
     """Async RabbitMQ client wrapper."""
@@ -28,6 +127,13 @@ class RabbitMQClient:
         self._connection: AbstractConnection | None = None
         self._channel: AbstractChannel | None = None
         self._queues: dict[str, AbstractQueue] = {}
+        self._queue_arguments: dict[str, dict[str, Any]] = {
+            queue_name: {"x-max-priority": max_priority}
+            for queue_name, max_priority in PRIORITY_QUEUES.items()
+        }
+        self._consumers: dict[str, tuple[AbstractQueue, AbstractChannel | None]] = {}
+        self._publish_channels: list[PublishChannel] = []
+        self._idle_publish_channels: asyncio.Queue[PublishChannel] = asyncio.Queue()
 
     async def connect(self) -> None:
         """Establish connection to RabbitMQ."""
@@ -35,7 +141,16 @@ class RabbitMQClient:
         self._connection = await connect_robust(settings.rabbitmq_url)
         self._channel = await self._connection.channel()
         await self._channel.set_qos(prefetch_count=10)
-        logger.info("rabbitmq_connected", url=settings.rabbitmq_url)
+        for index in range(settings.rabbitmq_publish_channels):
+            channel = await self._connection.channel(publisher_confirms=True)
+            publish_channel = PublishChannel(index, channel)
+            self._publish_channels.append(publish_channel)
+            self._idle_publish_channels.put_nowait(publish_channel)
+        logger.info(
+            "rabbitmq_connected",
+            url=settings.rabbitmq_url,
+            publish_channels=len(self._publish_channels),
+        )
 
     async def disconnect(self) -> None:
         """Close RabbitMQ connection."""
@@ -44,6 +159,9 @@ class RabbitMQClient:
             self._connection = None
             self._channel = None
             self._queues.clear()
+            self._consumers.clear()
+            self._publish_channels.clear()
+            self._idle_publish_channels = asyncio.Queue()
             logger.info("rabbitmq_disconnected")
 
     @property
@@ -54,47 +172,216 @@ class RabbitMQClient:
         return self._channel
 
     async def declare_queue(
-        self, queue_name: str, durable: bool = True
+        self,
+        queue_name: str,
+        durable: bool = True,
+        arguments: dict[str, Any] | None = None,
     ) -> AbstractQueue:
-        """Declare a queue and cache it."""
+        """
+        Declare a queue and cache it.
+
+        Arguments given on the first declaration are remembered and reused
+        wherever the queue is declared again, e.g. on consumer channels.
+        Queues in PRIORITY_QUEUES always get their x-max-priority.
+        """
         if queue_name not in self._queues:
-            queue = await self.channel.declare_queue(queue_name, durable=durable)
+            if arguments is not None:
+                self._queue_arguments[queue_name] = {
+                    **self._queue_arguments.get(queue_name, {}),
+                    **arguments,
+                }
+            queue = await self.channel.declare_queue(
+                queue_name, durable=durable, arguments=self._queue_arguments.get(queue_name)
+            )
             self._queues[queue_name] = queue
         return self._queues[queue_name]
 
+    async def declare_retry_topology(self, queue_name: str) -> None:
+        """
+        Declare a queue with its backoff retry queues and parking queue.
+
+        The queue dead-letters rejected messages into its parking queue. Each
+        retry queue holds messages for one step of agent_retry_delays_seconds
+        and then dead-letters them back into the queue. Queues that already
+        exist without these arguments must be deleted first, or the broker
+        refuses the declaration with PRECONDITION_FAILED.
+        """
+        if queue_name in self._queues:
+            return
+        settings = get_settings()
+        parking = parking_queue_name(queue_name)
+        await self.declare_queue(parking)
+        for level, delay in enumerate(settings.agent_retry_delays_seconds, start=1):
+            await self.declare_queue(
+                retry_queue_name(queue_name, level),
+                arguments={
+                    "x-message-ttl": int(delay * 1000),
+                    "x-dead-letter-exchange": "",
+                    "x-dead-letter-routing-key": queue_name,
+                },
+            )
+        await self.declare_queue(
+            queue_name,
+            arguments={
+                "x-dead-letter-exchange": "",
+                "x-dead-letter-routing-key": parking,
+            },
+        )
+
+    @asynccontextmanager
+    async def _publish_channel(self) -> AsyncIterator[PublishChannel]:
+        """Borrow an idle channel from the publish pool."""
+        if not self._publish_channels:
+            raise RuntimeError("RabbitMQ client not connected")
+        publish_channel = await self._idle_publish_channels.get()
+        try:
+            yield publish_channel
+        finally:
+            if publish_channel.channel.is_closed and self._connection:
+                # Closed by a channel-level error; replace it for the next borrower
+                try:
+                    publish_channel.channel = await self._connection.channel(
+                        publisher_confirms=True
+                    )
+                except Exception as e:
+                    logger.warning(
+                        "publish_channel_reopen_failed",
+                        channel=publish_channel.index,
+                        error=str(e),
+                    )
+            self._idle_publish_channels.put_nowait(publish_channel)
+
+    @staticmethod
+    def _build_message(message: dict[str, Any], priority: int) -> Message:
+        """Build a persistent JSON message, identified by its idempotency key if any."""
+        return Message(
+            body=json.dumps(message).encode(),
+            content_type="application/json",
+            message_id=message.get("idempotency_key"),
+            priority=priority,
+            delivery_mode=aio_pika.DeliveryMode.PERSISTENT,
+        )
+
     async def publish(
         self,
         queue_name: str,
         message: dict[str, Any],
         priority: int = 0,
     ) -> None:
-        """Publish a message to a queue."""
-        import json
+        """Publish a message to a queue and wait for its confirm."""
+        await self.declare_queue(queue_name)
+        async with self._publish_channel() as publish_channel:
+            await publish_channel.publish(self._build_message(message, priority), queue_name)
+        logger.debug("message_published", queue=queue_name)
+
+    async def _republish(
+        self,
+        queue_name: str,
+        message: aio_pika.abc.AbstractIncomingMessage,
+        headers: dict[str, Any],
+    ) -> None:
+        """Publish a copy of a received message with new headers and wait for its confirm."""
+        async with self._publish_channel() as publish_channel:
+            await publish_channel.publish(
+                Message(
+                    body=message.body,
+                    headers=headers,
+                    content_type=message.content_type,
+                    message_id=message.message_id,
+                    priority=message.priority,
+                    delivery_mode=aio_pika.DeliveryMode.PERSISTENT,
+                ),
+                queue_name,
+            )
+
+    async def publish_many(
+        self,
+        queue_name: str,
+        messages: list[dict[str, Any]],
+        priority: int = 0,
+    ) -> None:
+        """
+        Publish several messages to a queue, awaiting their confirms together.
 
+        Messages are split into batches of rabbitmq_publish_batch_size, each
+        sent on its own pool channel with all its confirms outstanding at
+        once, so a batch costs one confirm round trip instead of one per
+        message. Raises the first failure after every batch has settled.
+        """
+        if not messages:
+            return
         await self.declare_queue(queue_name)
-        await self.channel.default_exchange.publish(
-            Message(
-                body=json.dumps(message).encode(),
-                content_type="application/json",
-                priority=priority,
-                delivery_mode=aio_pika.DeliveryMode.PERSISTENT,
+
+        batch_size = get_settings().rabbitmq_publish_batch_size
+
+        async def publish_batch(batch: list[dict[str, Any]]) -> None:
+            async with self._publish_channel() as publish_channel:
+                results = await asyncio.gather(
+                    *(
+                        publish_channel.publish(self._build_message(m, priority), queue_name)
+                        for m in batch
+                    ),
+                    return_exceptions=True,
+                )
+            for result in results:
+                if isinstance(result, BaseException):
+                    raise result
+
+        results = await asyncio.gather(
+            *(
+                publish_batch(messages[i : i + batch_size])
+                for i in range(0, len(messages), batch_size)
             ),
-            routing_key=queue_name,
+            return_exceptions=True,
         )
-        logger.debug("message_published", queue=queue_name)
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+        logger.debug("messages_published", queue=queue_name, count=len(messages))
 
     async def consume(
-        self, queue_name: str, handler: MessageHandler, no_ack: bool = False
-    ) -> None:
-        """Start consuming messages from a queue."""
-        import json
+        self,
+        queue_name: str,
+        handler: MessageHandler,
+        no_ack: bool = False,
+        prefetch_count: int | None = None,
+        requeue: bool = False,
+        retry: bool = False,
+        on_parked: ParkedHandler | None = None,
+    ) -> str:
+        """
+        Start consuming messages from a queue and return the consumer tag.
+
+        With prefetch_count, the consumer gets a dedicated channel with that
+        QoS instead of sharing the publishing channel's. With requeue, messages
+        whose handler raises are returned to the queue rather than dropped.
+        With retry, they are instead sent through the queue's backoff retry
+        queues, and parked once agent_max_retry_count is exceeded; requeue
+        then only applies to deliveries interrupted by cancellation. A handler
+        raising RetryLater has its message delayed without counting a retry.
+        on_parked runs after a message is parked, e.g. to fail the work it
+        stood for.
+        """
+        if retry:
+            await self.declare_retry_topology(queue_name)
 
-        queue = await self.declare_queue(queue_name)
+        consumer_channel: AbstractChannel | None = None
+        if prefetch_count is None:
+            queue = await self.declare_queue(queue_name)
+        else:
+            if not self._connection:
+                raise RuntimeError("RabbitMQ client not connected")
+            consumer_channel = await self._connection.channel()
+            await consumer_channel.set_qos(prefetch_count=prefetch_count)
+            queue = await consumer_channel.declare_queue(
+                queue_name, durable=True, arguments=self._queue_arguments.get(queue_name)
+            )
 
         async def process_message(
             message: aio_pika.abc.AbstractIncomingMessage,
         ) -> None:
-            async with message.process(ignore_processed=no_ack):
+            async with message.process(requeue=requeue, ignore_processed=no_ack):
+                body: dict[str, Any] | None = None
                 try:
                     body = json.loads(message.body.decode())
                     await handler(body)
@@ -104,31 +391,177 @@ class RabbitMQClient:
                         queue=queue_name,
                         error=str(e),
                     )
-                    if not no_ack:
+                    if retry and not no_ack:
+                        parked = await self._retry_or_park(queue_name, message, e)
+                        if parked and on_parked and body is not None:
+                            await self._notify_parked(queue_name, on_parked, body, e)
+                    elif not no_ack:
                         raise
 
-        await queue.consume(process_message, no_ack=no_ack)
-        logger.info("consumer_started", queue=queue_name)
+        consumer_tag = await queue.consume(process_message, no_ack=no_ack)
+        self._consumers[consumer_tag] = (queue, consumer_channel)
+        logger.info("consumer_started", queue=queue_name, consumer_tag=consumer_tag)
+        return consumer_tag
+
+    async def _retry_or_park(
+        self,
+        queue_name: str,
+        message: aio_pika.abc.AbstractIncomingMessage,
+        error: Exception,
+    ) -> bool:
+        """
+        Send a failed message to its next retry queue, or park it.
+
+        The copy is confirmed before the original is acked, so a crash in
+        between delivers the message twice rather than losing it. Returns
+        True if the message was parked.
+        """
+        settings = get_settings()
+        headers = dict(message.headers or {})
+        headers[LAST_ERROR_HEADER] = str(error)[:1000]
+        delays = settings.agent_retry_delays_seconds
+
+        if isinstance(error, RetryLater) and delays:
+            await self._republish(retry_queue_name(queue_name, 1), message, headers)
+            logger.info("message_delayed", queue=queue_name, delay_seconds=delays[0])
+            return False
+
+        previous_count = headers.get(RETRY_COUNT_HEADER)
+        retry_count = (previous_count if isinstance(previous_count, int) else 0) + 1
+        headers[RETRY_COUNT_HEADER] = retry_count
+        if retry_count > settings.agent_max_retry_count or not delays:
+            await self._republish(parking_queue_name(queue_name), message, headers)
+            logger.warning("message_parked", queue=queue_name, retry_count=retry_count - 1)
+            return True
+
+        level = min(retry_count, len(delays))
+        await self._republish(retry_queue_name(queue_name, level), message, headers)
+        logger.info(
+            "message_retry_scheduled",
+            queue=queue_name,
+            retry_count=retry_count,
+            delay_seconds=delays[level - 1],
+        )
+        return False
+
+    @staticmethod
+    async def _notify_parked(
+        queue_name: str,
+        on_parked: ParkedHandler,
+        body: dict[str, Any],
+        error: Exception,
+    ) -> None:
+        """Run a consumer's on_parked callback; the message stays parked if it fails."""
+        try:
+            await on_parked(body, error)
+        except Exception as e:
+            logger.error("parked_handler_failed", queue=queue_name, error=str(e))
+
+    async def get_parked_count(self, queue_name: str) -> int:
+        """Get the number of messages in a queue's parking queue."""
+        await self.declare_retry_topology(queue_name)
+        result = await self.channel.declare_queue(parking_queue_name(queue_name), durable=True)
+        return result.declaration_result.message_count or 0
+
+    async def replay_parked(
+        self, queue_name: str, limit: int, replay: ParkedReplay | None = None
+    ) -> int:
+        """
+        Move up to limit parked messages back to their queue.
+
+        Replayed messages start over with a full retry budget. With replay,
+        each message's body is passed to it instead and the message is
+        dropped once it returns. Returns how many were replayed.
+        """
+        await self.declare_retry_topology(queue_name)
+        parking = await self.declare_queue(parking_queue_name(queue_name))
+
+        messages: list[aio_pika.abc.AbstractIncomingMessage] = []
+        while len(messages) < limit:
+            message = await parking.get(no_ack=False, fail=False)
+            if message is None:
+                break
+            messages.append(message)
+
+        async def replay_one(message: aio_pika.abc.AbstractIncomingMessage) -> None:
+            if replay is not None:
+                await replay(json.loads(message.body.decode()))
+            else:
+                headers = {
+                    key: value
+                    for key, value in (message.headers or {}).items()
+                    if key not in (RETRY_COUNT_HEADER, "x-death")
+                }
+                await self._republish(queue_name, message, headers)
+            await message.ack()
+
+        results = await asyncio.gather(*(replay_one(m) for m in messages), return_exceptions=True)
+        replayed = sum(1 for result in results if not isinstance(result, BaseException))
+        for message, result in zip(messages, results, strict=True):
+            if isinstance(result, BaseException):
+                await message.nack(requeue=True)
+        logger.info("parked_messages_replayed", queue=queue_name, replayed=replayed)
+        return replayed
+
+    async def cancel_consumer(self, consumer_tag: str) -> None:
+        """Stop a consumer from receiving new messages; delivered ones stay unacked."""
+        entry = self._consumers.get(consumer_tag)
+        if entry is None:
+            return
+        queue, _ = entry
+        await queue.cancel(consumer_tag)
+        logger.info("consumer_cancelled", queue=queue.name, consumer_tag=consumer_tag)
+
+    async def close_consumer_channel(self, consumer_tag: str) -> None:
+        """Close a consumer's dedicated channel, requeueing unacked messages."""
+        entry = self._consumers.pop(consumer_tag, None)
+        if entry is None:
+            return
+        _, consumer_channel = entry
+        if consumer_channel is not None and not consumer_channel.is_closed:
+            await consumer_channel.close()
 
     # Predefined queues for the application
     async def publish_agent_task(
-        self, agent_type: str, task: dict[str, Any]
+        self,
+        agent_type: str,
+        task: dict[str, Any],
+        lane: TaskLane = TaskLane.INTERACTIVE,
     ) -> None:
-        """Publish a task to an agent's queue."""
-        await self.publish(f"agent.{agent_type}.tasks", task)
+        """Publish a task to an agent's queue in the given lane."""
+        queue_name = agent_task_queue(agent_type, lane)
+        await self.declare_retry_topology(queue_name)
+        await self.publish(queue_name, task)
 
-    async def publish_hitl_request(self, request: dict[str, Any]) -> None:
-        """Publish a HITL approval request."""
-        await self.publish("hitl.requests", request, priority=5)
+    async def publish_agent_result(self, result: dict[str, Any]) -> None:
+        """Publish an agent's step result for the event router."""
+        await self.declare_retry_topology("agent.results")
+        await self.publish("agent.results", result)
 
     async def publish_hitl_response(self, response: dict[str, Any]) -> None:
         """Publish a HITL approval response."""
+        await self.declare_retry_topology("hitl.responses")
         await self.publish("hitl.responses", response, priority=5)
 
+    async def publish_hitl_responses(self, responses: list[dict[str, Any]]) -> None:
+        """Publish a batch of HITL approval responses."""
+        await self.declare_retry_topology("hitl.responses")
+        await self.publish_many("hitl.responses", responses, priority=5)
+
     async def publish_orchestrator_event(self, event: dict[str, Any]) -> None:
         """Publish an event to the orchestrator."""
+        await self.declare_retry_topology("orchestrator.events")
         await self.publish("orchestrator.events", event)
 
+    def get_stats(self) -> dict[str, Any]:
+        """Get per-channel publish throughput and confirm latency."""
+        return {
+            "connected": self._connection is not None,
+            "declared_queues": len(self._queues),
+            "idle_publish_channels": self._idle_publish_channels.qsize(),
+            "publish_channels": [pc.get_stats() for pc in self._publish_channels],
+        }
+
 
 # Singleton instance
 _rabbitmq_client: RabbitMQClient | None = None
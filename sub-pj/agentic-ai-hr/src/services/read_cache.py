@@ -0,0 +1,199 @@
+"""
+In-process read-through cache for hot Redis lookups.
+
+Company profiles and workflow state are served from a per-process LRU with a
+short TTL. Writers publish the changed key on a pub/sub channel, every
+process evicts it, and the TTL bounds staleness if a message is lost.
+"""
+
+import asyncio
+import contextlib
+import copy
+import json
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from redis.asyncio.client import Pipeline
+
+from src.config import get_settings
+from src.services.redis_client import get_redis_client
+from src.utils import get_logger
+
+logger = get_logger(__name__)
+
+INVALIDATION_CHANNEL = "cache:invalidate"
+
+
+def invalidation_message(key: str) -> str:
+    """Build the message published on INVALIDATION_CHANNEL when a key changes."""
+    return json.dumps({"key": key, "ts": time.time()})
+
+
+class ReadThroughCache:
+    """LRU/TTL cache kept coherent across processes by pub/sub invalidation."""
+
+    def __init__(self, enabled: bool, max_entries: int, ttl_seconds: float) -> None:
+        self._enabled = enabled
+        self._max_entries = max_entries
+        self._ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[str, tuple[Any, float]] = OrderedDict()
+        self._invalidation_count = 0
+        self._listener: asyncio.Task[None] | None = None
+        self._listening = False
+        self.hits = 0
+        self.misses = 0
+        self.bypassed = 0
+        self.evictions = 0
+        self.max_invalidation_lag = 0.0
+        self._total_invalidation_lag = 0.0
+        self._invalidations_received = 0
+
+    async def get_or_load(
+        self, key: str, loader: Callable[[], Awaitable[Any | None]]
+    ) -> Any | None:
+        """
+        Get a cached value, loading and caching it on a miss.
+
+        The returned object is shared; callers must copy before mutating.
+        Entries are only served while the invalidation listener is
+        subscribed, and a load that overlaps an invalidation is not cached.
+        """
+        if not self._enabled:
+            return await loader()
+
+        self._ensure_listener()
+        if not self._listening:
+            self.bypassed += 1
+            return await loader()
+
+        entry = self._entries.get(key)
+        if entry is not None:
+            value, expires_at = entry
+            if time.monotonic() < expires_at:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return value
+            del self._entries[key]
+
+        self.misses += 1
+        invalidations_before = self._invalidation_count
+        value = await loader()
+        if value is not None and self._invalidation_count == invalidations_before:
+            self._entries[key] = (value, time.monotonic() + self._ttl_seconds)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+        return value
+
+    async def get_json(self, key: str) -> dict[str, Any] | None:
+        """Get a JSON key through the cache, as a private copy."""
+
+        async def load() -> dict[str, Any] | None:
+            redis = await get_redis_client()
+            return await redis.get_json(key)
+
+        value = await self.get_or_load(key, load)
+        return copy.deepcopy(value)
+
+    def invalidate_local(self, key: str) -> None:
+        """Evict a key from this process only."""
+        self._invalidation_count += 1
+        if self._entries.pop(key, None) is not None:
+            self.evictions += 1
+
+    def queue_invalidation(self, pipe: Pipeline, key: str) -> None:
+        """Evict a key here and queue its cluster-wide invalidation on a pipeline."""
+        self.invalidate_local(key)
+        pipe.publish(INVALIDATION_CHANNEL, invalidation_message(key))
+
+    async def invalidate(self, key: str) -> None:
+        """Evict a key here and in every other process."""
+        redis = await get_redis_client()
+        async with redis.pipeline() as pipe:
+            self.queue_invalidation(pipe, key)
+
+    def _ensure_listener(self) -> None:
+        """Start the invalidation listener on first use."""
+        if self._listener is None or self._listener.done():
+            self._listener = asyncio.create_task(self._listen())
+
+    async def _listen(self) -> None:
+        """Apply invalidations published by any process, resubscribing on errors."""
+        while True:
+            try:
+                redis = await get_redis_client()
+                pubsub = redis.client.pubsub()
+                await pubsub.subscribe(INVALIDATION_CHANNEL)
+                self._listening = True
+                try:
+                    async for message in pubsub.listen():
+                        if message["type"] == "message":
+                            self._apply_invalidation(message["data"])
+                finally:
+                    self._listening = False
+                    await pubsub.aclose()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("read_cache_listener_failed", error=str(e))
+            # Anything cached may have missed invalidations while disconnected
+            self._entries.clear()
+            await asyncio.sleep(1.0)
+
+    def _apply_invalidation(self, payload: str) -> None:
+        """Evict the key named in an invalidation message."""
+        message = json.loads(payload)
+        self.invalidate_local(message["key"])
+        lag = max(time.time() - message.get("ts", time.time()), 0.0)
+        self._invalidations_received += 1
+        self._total_invalidation_lag += lag
+        self.max_invalidation_lag = max(self.max_invalidation_lag, lag)
+
+    async def stop(self) -> None:
+        """Stop the invalidation listener and drop all entries."""
+        if self._listener:
+            self._listener.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._listener
+            self._listener = None
+        self._listening = False
+        self._entries.clear()
+
+    def get_stats(self) -> dict[str, Any]:
+        """Get hit ratio and staleness metrics."""
+        lookups = self.hits + self.misses
+        received = self._invalidations_received
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "bypassed": self.bypassed,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "entries": len(self._entries),
+            "evictions": self.evictions,
+            "listening": self._listening,
+            "invalidations_received": received,
+            "avg_invalidation_lag_seconds": (
+                round(self._total_invalidation_lag / received, 4) if received else 0.0
+            ),
+            "max_invalidation_lag_seconds": round(self.max_invalidation_lag, 4),
+            "ttl_seconds": self._ttl_seconds,
+        }
+
+
+# Singleton instance
+_read_cache: ReadThroughCache | None = None
+
+
+def get_read_cache() -> ReadThroughCache:
+    """Get read-through cache singleton."""
+    global _read_cache
+    if _read_cache is None:
+        settings = get_settings()
+        _read_cache = ReadThroughCache(
+            enabled=settings.read_cache_enabled,
+            max_entries=settings.read_cache_max_entries,
+            ttl_seconds=settings.read_cache_ttl_seconds,
+        )
+    return _read_cache
@@ -5,13 +5,17 @@ Provides async Redis operations for caching, session storage,
 and agent state management.
 """
 
-import json
+import time
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
 from typing import Any
 
 import redis.asyncio as redis
 from redis.asyncio import Redis
+from redis.asyncio.client import Pipeline
 
 from src.config import get_settings
+from src.services import codec
 from src.utils import get_logger
 
 logger = get_logger(__name__)
@@ -22,6 +26,7 @@ class RedisClient:
 
     def __init__(self) -> None:
         self._client: Redis | None = None
+        self._raw_client: Redis | None = None
 
     async def connect(self) -> None:
         """Establish connection to Redis."""
@@ -31,6 +36,8 @@ class RedisClient:
             encoding="utf-8",
             decode_responses=True,
         )
+        # Codec payloads may be binary, so they are read without decoding
+        self._raw_client = redis.from_url(settings.redis_url, decode_responses=False)
         await self._client.ping()
         logger.info("redis_connected", url=settings.redis_url)
 
@@ -40,6 +47,9 @@ class RedisClient:
             await self._client.aclose()
             self._client = None
             logger.info("redis_disconnected")
+        if self._raw_client:
+            await self._raw_client.aclose()
+            self._raw_client = None
 
     @property
     def client(self) -> Redis:
@@ -48,6 +58,13 @@ class RedisClient:
             raise RuntimeError("Redis client not connected")
         return self._client
 
+    @property
+    def raw_client(self) -> Redis:
+        """Get the Redis client that returns bytes, for codec payloads."""
+        if not self._raw_client:
+            raise RuntimeError("Redis client not connected")
+        return self._raw_client
+
     async def get(self, key: str) -> str | None:
         """Get a value by key."""
         return await self.client.get(key)
@@ -71,16 +88,84 @@ class RedisClient:
 
     async def get_json(self, key: str) -> dict[str, Any] | None:
         """Get and parse JSON value."""
-        value = await self.get(key)
+        value = await self.raw_client.get(key)
         if value:
-            return json.loads(value)
+            return codec.decode(value)
         return None
 
     async def set_json(
         self, key: str, value: dict[str, Any], expire_seconds: int | None = None
     ) -> None:
         """Serialize and set JSON value."""
-        await self.set(key, json.dumps(value), expire_seconds)
+        await self.client.set(key, codec.encode(value), ex=expire_seconds or None)
+
+    # Bulk operations
+    @asynccontextmanager
+    async def pipeline(self, transaction: bool = False) -> AsyncIterator[Pipeline]:
+        """
+        Batch commands into one round trip, executed when the block exits.
+
+        Call `await pipe.execute()` inside the block to read results; the
+        exit then has nothing left to send. Nothing is sent if the block
+        raises.
+        """
+        async with self.client.pipeline(transaction=transaction) as pipe:
+            yield pipe
+            if pipe.command_stack:
+                await pipe.execute()
+
+    async def mget_json(self, keys: list[str]) -> list[dict[str, Any] | None]:
+        """Get and parse many JSON values with one MGET, None where missing."""
+        if not keys:
+            return []
+        values = await self.raw_client.mget(keys)
+        return [codec.decode(value) if value else None for value in values]
+
+    async def mset_json(
+        self,
+        values: dict[str, dict[str, Any]],
+        expire_seconds: int | dict[str, int] | None = None,
+    ) -> None:
+        """
+        Serialize and set many JSON values in one round trip.
+
+        expire_seconds is either one TTL for all keys or a TTL per key; keys
+        missing from the mapping are stored without expiry.
+        """
+        if not values:
+            return
+        async with self.pipeline() as pipe:
+            for key, value in values.items():
+                ttl = (
+                    expire_seconds.get(key)
+                    if isinstance(expire_seconds, dict)
+                    else expire_seconds
+                )
+                pipe.set(key, codec.encode(value), ex=ttl or None)
+
+    async def scan_json(
+        self, prefix: str, batch_size: int = 100
+    ) -> AsyncIterator[tuple[str, dict[str, Any]]]:
+        """
+        Iterate (key, value) over JSON string keys starting with prefix.
+
+        Keys are walked with SCAN and fetched with one MGET per batch, so
+        memory stays bounded however many keys match. Keys of other types
+        that share the prefix are skipped.
+        """
+        keys: list[str] = []
+        async for key in self.client.scan_iter(match=f"{prefix}*", count=batch_size):
+            keys.append(key)
+            if len(keys) < batch_size:
+                continue
+            for key, value in zip(keys, await self.mget_json(keys), strict=True):
+                if value is not None:
+                    yield key, value
+            keys = []
+
+        for key, value in zip(keys, await self.mget_json(keys), strict=True):
+            if value is not None:
+                yield key, value
 
     # Agent state management
     async def get_agent_state(self, agent_id: str) -> dict[str, Any] | None:
@@ -93,18 +178,74 @@ class RedisClient:
         """Set agent state with TTL."""
         await self.set_json(f"agent:state:{agent_id}", state, ttl)
 
+    async def get_agent_states(
+        self, agent_ids: list[str]
+    ) -> dict[str, dict[str, Any] | None]:
+        """Get many agent states in one round trip."""
+        values = await self.mget_json([f"agent:state:{agent_id}" for agent_id in agent_ids])
+        return dict(zip(agent_ids, values, strict=True))
+
+    async def set_agent_states(
+        self, states: dict[str, dict[str, Any]], ttl: int = 3600
+    ) -> None:
+        """Set many agent states with TTL in one round trip."""
+        await self.mset_json(
+            {f"agent:state:{agent_id}": state for agent_id, state in states.items()}, ttl
+        )
+
+    # Agent heartbeats: one sorted set scored by the last beat's unix time
+    AGENT_HEARTBEATS_KEY = "agent:heartbeats"
+
     async def update_agent_heartbeat(self, agent_id: str) -> None:
         """Update agent heartbeat timestamp."""
+        await self.update_agent_heartbeats([agent_id])
+
+    async def update_agent_heartbeats(
+        self, agent_ids: list[str], prune_before: float | None = None
+    ) -> None:
+        """Refresh many heartbeats in one round trip, optionally pruning stale ones."""
+        now = time.time()
+        async with self.pipeline() as pipe:
+            if agent_ids:
+                pipe.zadd(self.AGENT_HEARTBEATS_KEY, dict.fromkeys(agent_ids, now))
+            if prune_before is not None:
+                pipe.zremrangebyscore(self.AGENT_HEARTBEATS_KEY, "-inf", prune_before)
+
+    async def remove_agent_heartbeats(self, agent_ids: list[str]) -> None:
+        """Forget heartbeats of agents that stopped or were reaped."""
+        if agent_ids:
+            await self.client.zrem(self.AGENT_HEARTBEATS_KEY, *agent_ids)
+
+    def _heartbeat_cutoff(self) -> float:
+        """Oldest heartbeat time that still counts as alive."""
         settings = get_settings()
-        await self.set(
-            f"agent:heartbeat:{agent_id}",
-            "1",
-            settings.agent_heartbeat_interval_seconds * 3,
-        )
+        return time.time() - settings.agent_heartbeat_interval_seconds * 3
 
     async def is_agent_alive(self, agent_id: str) -> bool:
         """Check if agent is alive based on heartbeat."""
-        return await self.exists(f"agent:heartbeat:{agent_id}")
+        return (await self.are_agents_alive([agent_id]))[agent_id]
+
+    async def are_agents_alive(self, agent_ids: list[str]) -> dict[str, bool]:
+        """Check many agents' heartbeats with a single ZMSCORE."""
+        if not agent_ids:
+            return {}
+        scores = await self.client.zmscore(self.AGENT_HEARTBEATS_KEY, agent_ids)
+        cutoff = self._heartbeat_cutoff()
+        return {
+            agent_id: score is not None and score >= cutoff
+            for agent_id, score in zip(agent_ids, scores, strict=True)
+        }
+
+    async def get_dead_agents(self, limit: int = 100) -> list[str]:
+        """Get agents whose last heartbeat is older than the liveness window."""
+        agent_ids = await self.client.zrangebyscore(
+            self.AGENT_HEARTBEATS_KEY,
+            "-inf",
+            f"({self._heartbeat_cutoff()}",
+            start=0,
+            num=limit,
+        )
+        return [str(agent_id) for agent_id in agent_ids]
 
     # Session management
     async def get_session(self, session_id: str) -> dict[str, Any] | None:
@@ -117,6 +258,21 @@ class RedisClient:
         """Set session data with TTL (default 24 hours)."""
         await self.set_json(f"session:{session_id}", data, ttl)
 
+    async def get_sessions(
+        self, session_ids: list[str]
+    ) -> dict[str, dict[str, Any] | None]:
+        """Get many sessions in one round trip."""
+        values = await self.mget_json([f"session:{session_id}" for session_id in session_ids])
+        return dict(zip(session_ids, values, strict=True))
+
+    async def set_sessions(
+        self, sessions: dict[str, dict[str, Any]], ttl: int = 86400
+    ) -> None:
+        """Set many sessions with TTL in one round trip."""
+        await self.mset_json(
+            {f"session:{session_id}": data for session_id, data in sessions.items()}, ttl
+        )
+
     async def delete_session(self, session_id: str) -> None:
         """Delete session."""
         await self.delete(f"session:{session_id}")
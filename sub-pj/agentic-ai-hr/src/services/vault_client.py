@@ -2,8 +2,14 @@
 HashiCorp Vault client for secrets management.
 
 Provides secure access to sensitive configuration and credentials.
+VaultClient wraps the blocking hvac client; async code uses
+AsyncVaultClient, which runs it on a thread pool behind a secret cache.
 """
 
+import asyncio
+import copy
+import time
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any
 
 import hvac
@@ -14,6 +20,21 @@ from src.utils import get_logger
 logger = get_logger(__name__)
 
 
+def _parse_ttl(value: Any) -> float | None:
+    """Parse a TTL given as seconds or as a duration like "90s", "15m" or "1h"."""
+    if value is None:
+        return None
+    text = str(value).strip()
+    units = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+    try:
+        if text and text[-1] in units:
+            return float(text[:-1]) * units[text[-1]]
+        return float(text)
+    except ValueError:
+        logger.warning("vault_ttl_invalid", ttl=text)
+        return None
+
+
 class VaultClient:
     """HashiCorp Vault client wrapper."""
 
@@ -27,6 +48,7 @@ class VaultClient:
         self._client = hvac.Client(
             url=settings.vault_addr,
             token=settings.vault_token,
+            timeout=settings.vault_request_timeout_seconds,
         )
         if not self._client.is_authenticated():
             raise RuntimeError("Vault authentication failed")
@@ -47,19 +69,31 @@ class VaultClient:
 
     def read_secret(self, path: str) -> dict[str, Any] | None:
         """Read a secret from Vault KV v2."""
+        return self.read_secret_with_ttl(path)[0]
+
+    def read_secret_with_ttl(self, path: str) -> tuple[dict[str, Any] | None, float | None]:
+        """
+        Read a secret from Vault KV v2 along with its TTL in seconds.
+
+        The TTL is the response's lease duration or, since KV secrets are not
+        leased, the secret's own "ttl" field; None if neither is set.
+        """
         try:
             response = self.client.secrets.kv.v2.read_secret_version(
                 path=path,
                 mount_point=self._mount_point,
             )
-            return response["data"]["data"]
         except hvac.exceptions.InvalidPath:
             logger.warning("secret_not_found", path=path)
-            return None
+            return None, None
         except Exception as e:
             logger.error("vault_read_error", path=path, error=str(e))
             raise
 
+        data = response["data"]["data"]
+        ttl = response.get("lease_duration") or _parse_ttl(data.get("ttl"))
+        return data, float(ttl) if ttl else None
+
     def write_secret(self, path: str, data: dict[str, Any]) -> None:
         """Write a secret to Vault KV v2."""
         try:
@@ -90,7 +124,7 @@ class VaultClient:
         """Get Gemini API key from Vault or settings."""
         secret = self.read_secret("hr-policy-advisor/gemini")
         if secret and "api_key" in secret:
-            return secret["api_key"]
+            return str(secret["api_key"])
         # Fallback to environment variable
         settings = get_settings()
         return settings.gemini_api_key or None
@@ -129,3 +163,247 @@ def close_vault_client() -> None:
     if _vault_client:
         _vault_client.disconnect()
         _vault_client = None
+
+
+class _CachedSecret:
+    """A cached secret and when to refresh and stop serving it."""
+
+    def __init__(self, value: dict[str, Any], ttl_seconds: float, refresh_fraction: float):
+        now = time.monotonic()
+        self.value = value
+        self.refresh_at = now + ttl_seconds * refresh_fraction
+        self.expires_at = now + ttl_seconds
+        self.used = False
+
+
+class AsyncVaultClient:
+    """
+    Non-blocking Vault access with a lease-aware secret cache.
+
+    hvac calls run on a bounded thread pool, so a slow Vault round trip only
+    occupies a pool thread, never the event loop. Secrets are cached until a
+    fraction of their lease or TTL has elapsed and refreshed in the
+    background from then until expiry, so hot paths keep being served from
+    memory; concurrent reads of one path share a single Vault call.
+    """
+
+    def __init__(
+        self,
+        client: VaultClient,
+        max_workers: int,
+        cache_enabled: bool,
+        refresh_fraction: float,
+        default_ttl_seconds: float,
+    ) -> None:
+        self._client = client
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="vault")
+        self._cache_enabled = cache_enabled
+        self._refresh_fraction = refresh_fraction
+        self._default_ttl_seconds = default_ttl_seconds
+        self._cache: dict[str, _CachedSecret] = {}
+        self._in_flight: dict[str, asyncio.Future[dict[str, Any] | None]] = {}
+        self._refreshers: dict[str, asyncio.Task[None]] = {}
+        self.hits = 0
+        self.misses = 0
+        self.shared = 0
+        self.refreshes = 0
+        self.refresh_failures = 0
+
+    async def connect(self) -> None:
+        """Connect to Vault without blocking the event loop."""
+        await self._run(self._client.connect)
+
+    async def _run(self, fn: Any, *args: Any) -> Any:
+        """Run a blocking hvac call on the Vault thread pool."""
+        return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+
+    async def read_secret(self, path: str) -> dict[str, Any] | None:
+        """Read a secret, from the cache while it is fresh. Returns a private copy."""
+        entry = self._cache.get(path) if self._cache_enabled else None
+        if entry is not None:
+            if time.monotonic() < entry.expires_at:
+                self.hits += 1
+                entry.used = True
+                return copy.deepcopy(entry.value)
+            del self._cache[path]
+
+        self.misses += 1
+        return copy.deepcopy(await self._fetch(path))
+
+    async def read_secrets(self, paths: list[str]) -> dict[str, dict[str, Any] | None]:
+        """Read several secrets concurrently, each distinct path once."""
+        unique_paths = list(dict.fromkeys(paths))
+        values = await asyncio.gather(*(self.read_secret(path) for path in unique_paths))
+        return dict(zip(unique_paths, values, strict=True))
+
+    async def _fetch(self, path: str) -> dict[str, Any] | None:
+        """Read a secret from Vault, shared by all concurrent callers, and cache it."""
+        future = self._in_flight.get(path)
+        if future is not None:
+            self.shared += 1
+            return await asyncio.shield(future)
+
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[path] = future
+        try:
+            value, ttl = await self._run(self._client.read_secret_with_ttl, path)
+            if value is not None and self._cache_enabled:
+                self._store(path, value, ttl or self._default_ttl_seconds)
+            future.set_result(value)
+        except BaseException as e:
+            future.set_exception(e)
+        finally:
+            self._in_flight.pop(path, None)
+        return await future
+
+    def _store(self, path: str, value: dict[str, Any], ttl_seconds: float) -> None:
+        """Cache a secret and schedule its background refresh."""
+        self._cache[path] = _CachedSecret(value, ttl_seconds, self._refresh_fraction)
+        refresher = self._refreshers.get(path)
+        if refresher is None or refresher.done():
+            self._refreshers[path] = asyncio.create_task(self._refresh(path))
+
+    async def _refresh(self, path: str) -> None:
+        """
+        Re-read a cached secret once its refresh point is reached.
+
+        Secrets not read since they were cached are dropped instead, so
+        paths that are no longer used stop being polled. A failed refresh
+        keeps serving the cached value and retries until it expires.
+        """
+        try:
+            while True:
+                entry = self._cache.get(path)
+                if entry is None:
+                    return
+                await asyncio.sleep(max(entry.refresh_at - time.monotonic(), 0.0))
+                if self._cache.get(path) is not entry:
+                    continue
+                if not entry.used:
+                    del self._cache[path]
+                    return
+                try:
+                    value, ttl = await self._run(self._client.read_secret_with_ttl, path)
+                except Exception as e:
+                    self.refresh_failures += 1
+                    logger.warning("vault_refresh_failed", path=path, error=str(e))
+                    remaining = entry.expires_at - time.monotonic()
+                    if remaining <= 0:
+                        self._cache.pop(path, None)
+                        return
+                    entry.refresh_at = time.monotonic() + min(remaining / 2, 30.0)
+                    continue
+                self.refreshes += 1
+                if value is None:
+                    self._cache.pop(path, None)
+                    return
+                self._cache[path] = _CachedSecret(
+                    value, ttl or self._default_ttl_seconds, self._refresh_fraction
+                )
+        finally:
+            if self._refreshers.get(path) is asyncio.current_task():
+                del self._refreshers[path]
+
+    def invalidate(self, path: str) -> None:
+        """Drop a cached secret, so the next read goes to Vault."""
+        self._cache.pop(path, None)
+
+    async def write_secret(self, path: str, data: dict[str, Any]) -> None:
+        """Write a secret to Vault KV v2."""
+        await self._run(self._client.write_secret, path, data)
+        self.invalidate(path)
+
+    async def delete_secret(self, path: str) -> None:
+        """Delete a secret from Vault."""
+        await self._run(self._client.delete_secret, path)
+        self.invalidate(path)
+
+    # Application-specific secret access
+    async def get_gemini_api_key(self) -> str | None:
+        """Get Gemini API key from Vault or settings."""
+        secret = await self.read_secret("hr-policy-advisor/gemini")
+        if secret and "api_key" in secret:
+            return str(secret["api_key"])
+        # Fallback to environment variable
+        settings = get_settings()
+        return settings.gemini_api_key or None
+
+    async def get_database_credentials(self) -> dict[str, str] | None:
+        """Get database credentials from Vault."""
+        return await self.read_secret("hr-policy-advisor/database")
+
+    async def get_company_secrets(self, company_id: str) -> dict[str, Any] | None:
+        """Get company-specific secrets."""
+        return await self.read_secret(f"hr-policy-advisor/companies/{company_id}")
+
+    async def get_companies_secrets(
+        self, company_ids: list[str]
+    ) -> dict[str, dict[str, Any] | None]:
+        """Get the secrets of several companies concurrently."""
+        paths = {
+            company_id: f"hr-policy-advisor/companies/{company_id}" for company_id in company_ids
+        }
+        secrets = await self.read_secrets(list(paths.values()))
+        return {company_id: secrets[path] for company_id, path in paths.items()}
+
+    async def store_company_secrets(self, company_id: str, secrets: dict[str, Any]) -> None:
+        """Store company-specific secrets."""
+        await self.write_secret(f"hr-policy-advisor/companies/{company_id}", secrets)
+
+    async def close(self) -> None:
+        """Stop background refreshes, drop the cache and disconnect."""
+        refreshers = list(self._refreshers.values())
+        for task in refreshers:
+            task.cancel()
+        await asyncio.gather(*refreshers, return_exceptions=True)
+        self._refreshers.clear()
+        self._cache.clear()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self._client.disconnect()
+
+    def get_stats(self) -> dict[str, Any]:
+        """Get cache and refresh counters."""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "shared": self.shared,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "entries": len(self._cache),
+            "refreshes": self.refreshes,
+            "refresh_failures": self.refresh_failures,
+            "in_flight": len(self._in_flight),
+        }
+
+
+# Singleton instance
+_async_vault_client: AsyncVaultClient | None = None
+
+
+async def get_async_vault_client() -> AsyncVaultClient:
+    """Get or create async Vault client singleton."""
+    global _async_vault_client
+    if _async_vault_client is None:
+        settings = get_settings()
+        client = AsyncVaultClient(
+            client=VaultClient(),
+            max_workers=settings.vault_max_workers,
+            cache_enabled=settings.vault_cache_enabled,
+            refresh_fraction=settings.vault_cache_refresh_fraction,
+            default_ttl_seconds=settings.vault_cache_default_ttl_seconds,
+        )
+        try:
+            await client.connect()
+        except Exception:
+            await client.close()
+            raise
+        _async_vault_client = client
+    return _async_vault_client
+
+
+async def close_async_vault_client() -> None:
+    """Close async Vault client if exists."""
+    global _async_vault_client
+    if _async_vault_client:
+        await _async_vault_client.close()
+        _async_vault_client = None
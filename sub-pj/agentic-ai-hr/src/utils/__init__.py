@@ -1,5 +1,6 @@
 """Utility modules."""
 
+from .json_stream import JSONArrayItemStream
 from .logging import get_logger, setup_logging
 
-__all__ = ["get_logger", "setup_logging"]
+__all__ = ["get_logger", "setup_logging", "JSONArrayItemStream"]
@@ -0,0 +1,88 @@
+"""
+Incremental parsing of streamed LLM JSON output.
+
+Lets agents surface the items of a top-level array (for example `grades[]`)
+as soon as each one closes, while the rest of the response is still being
+generated.
+"""
+
+import contextlib
+import json
+from typing import Any
+
+
+class JSONArrayItemStream:
+    """
+    Extracts completed object items of top-level arrays from streamed JSON.
+
+    Text before the first "{" (prose, code fences) is skipped. Items that do
+    not parse on their own are dropped; the full response is still parsed
+    by the caller once generation ends.
+    """
+
+    def __init__(self, *array_keys: str) -> None:
+        self._array_keys = set(array_keys)
+        self._buffer = ""
+        self._pos = 0
+        self._started = False
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._string_start = 0
+        self._last_key: str | None = None
+        self._array_key: str | None = None
+        self._item_start: int | None = None
+
+    @property
+    def text(self) -> str:
+        """Everything fed so far."""
+        return self._buffer
+
+    def feed(self, chunk: str) -> list[tuple[str, Any]]:
+        """Consume a chunk and return (array_key, item) for items it completed."""
+        self._buffer += chunk
+        items: list[tuple[str, Any]] = []
+
+        while self._pos < len(self._buffer):
+            char = self._buffer[self._pos]
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                    if self._depth == 1:
+                        # A string directly in the root object is a key or a value;
+                        # only a key can be followed by "[" before the next ","
+                        self._last_key = self._buffer[self._string_start + 1 : self._pos]
+            elif not self._started:
+                if char == "{":
+                    self._started = True
+                    self._depth = 1
+            elif char == '"':
+                self._in_string = True
+                self._string_start = self._pos
+            elif char in "{[":
+                if char == "[" and self._depth == 1 and self._last_key in self._array_keys:
+                    self._array_key = self._last_key
+                elif char == "{" and self._array_key is not None and self._depth == 2:
+                    self._item_start = self._pos
+                self._depth += 1
+            elif char in "}]":
+                self._depth -= 1
+                if self._array_key is not None:
+                    if self._depth == 2 and char == "}" and self._item_start is not None:
+                        raw_item = self._buffer[self._item_start : self._pos + 1]
+                        self._item_start = None
+                        with contextlib.suppress(json.JSONDecodeError):
+                            items.append((self._array_key, json.loads(raw_item)))
+                    elif self._depth == 1:
+                        self._array_key = None
+            elif char == "," and self._depth == 1:
+                self._last_key = None
+
+            self._pos += 1
+
+        return items
@@ -0,0 +1,439 @@
+"""
+HR Policy Advisor - Agent Worker Entry Point.
+
+Consumes agent.{type}.tasks queues, runs the matching agent for each task and
+reports the result back to the workflow orchestrator. Runs separately from the
+API so agent execution can be scaled horizontally.
+
+Each agent type has an interactive and a batch lane. Both share the worker's
+concurrency, but batch tasks may only hold part of it and waiting interactive
+tasks get most freed slots, so live sessions stay fast while bulk runs drain.
+"""
+
+import argparse
+import asyncio
+import signal
+from collections import deque
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from typing import Any
+
+from src.agents import AGENT_REGISTRY, get_agent_class
+from src.config import get_settings
+from src.core import Orchestrator, WorkflowStatus, get_heartbeat_service
+from src.services import (
+    TaskLane,
+    agent_task_queue,
+    claim_check,
+    close_rabbitmq_client,
+    close_redis_client,
+    get_rabbitmq_client,
+    get_redis_client,
+    idempotency,
+)
+from src.utils import get_logger, setup_logging
+
+logger = get_logger(__name__)
+
+
+class LaneSlots:
+    """
+    Concurrency slots shared by the interactive and batch lanes.
+
+    Interactive tasks may use every slot; batch tasks at most batch_limit. When
+    both lanes wait, freed slots go to interactive tasks interactive_weight
+    times for every batch task, so batch work is slowed but never starved.
+    """
+
+    def __init__(self, concurrency: int, batch_limit: int, interactive_weight: int) -> None:
+        self._concurrency = concurrency
+        self._batch_limit = batch_limit
+        self._interactive_weight = interactive_weight
+        self._in_use = {TaskLane.INTERACTIVE: 0, TaskLane.BATCH: 0}
+        self._waiters: dict[TaskLane, deque[asyncio.Future[None]]] = {
+            TaskLane.INTERACTIVE: deque(),
+            TaskLane.BATCH: deque(),
+        }
+        self._interactive_grants = 0
+
+    def _has_room(self, lane: TaskLane) -> bool:
+        """Check whether a task of the lane may start now."""
+        if sum(self._in_use.values()) >= self._concurrency:
+            return False
+        return lane == TaskLane.INTERACTIVE or self._in_use[lane] < self._batch_limit
+
+    def _grant(self, lane: TaskLane) -> None:
+        """Take a slot for the lane."""
+        self._in_use[lane] += 1
+        if lane == TaskLane.INTERACTIVE:
+            self._interactive_grants += 1
+        else:
+            self._interactive_grants = 0
+
+    def _next_lane(self) -> TaskLane | None:
+        """Pick the lane whose next waiter gets a freed slot."""
+        ready = [
+            lane for lane, waiters in self._waiters.items() if waiters and self._has_room(lane)
+        ]
+        if len(ready) < 2:
+            return ready[0] if ready else None
+        if self._interactive_grants >= self._interactive_weight:
+            return TaskLane.BATCH
+        return TaskLane.INTERACTIVE
+
+    def _wake(self) -> None:
+        """Hand free slots to waiters."""
+        while (lane := self._next_lane()) is not None:
+            waiter = self._waiters[lane].popleft()
+            if waiter.done():
+                continue
+            self._grant(lane)
+            waiter.set_result(None)
+
+    @asynccontextmanager
+    async def slot(self, lane: TaskLane) -> AsyncIterator[None]:
+        """Hold a slot of the lane for the duration of the block."""
+        if not self._waiters[lane] and self._has_room(lane):
+            self._grant(lane)
+        else:
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters[lane].append(waiter)
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                if waiter.done() and not waiter.cancelled():
+                    # Granted just before the cancellation arrived
+                    self._in_use[lane] -= 1
+                    self._wake()
+                raise
+        try:
+            yield
+        finally:
+            self._in_use[lane] -= 1
+            self._wake()
+
+    def get_stats(self) -> dict[str, Any]:
+        """Get slots in use and waiting tasks per lane."""
+        return {
+            lane.value: {"running": self._in_use[lane], "waiting": len(self._waiters[lane])}
+            for lane in TaskLane
+        }
+
+
+class AgentWorker:
+    """Runs agent tasks from RabbitMQ with bounded concurrency."""
+
+    def __init__(
+        self,
+        agent_types: list[str],
+        concurrency: int,
+        prefetch_count: int,
+        shutdown_timeout_seconds: float,
+        batch_max_share: float = 0.75,
+        interactive_weight: int = 4,
+    ) -> None:
+        self.agent_types = agent_types
+        self._slots = LaneSlots(
+            concurrency,
+            batch_limit=max(1, int(concurrency * batch_max_share)),
+            interactive_weight=interactive_weight,
+        )
+        self._prefetch_count = prefetch_count
+        self._shutdown_timeout_seconds = shutdown_timeout_seconds
+        self._consumer_tags: list[str] = []
+        self._waiting: set[asyncio.Task[Any]] = set()
+        self._running: set[asyncio.Task[Any]] = set()
+        self._stop_event = asyncio.Event()
+
+    async def start(self) -> None:
+        """Subscribe to the task queue of each configured agent type."""
+        rabbitmq = await get_rabbitmq_client()
+        for agent_type in self.agent_types:
+            # Fail fast on unknown types instead of dead-lettering every task
+            get_agent_class(agent_type)
+
+            for lane in TaskLane:
+
+                async def handler(
+                    task: dict[str, Any], agent_type: str = agent_type, lane: TaskLane = lane
+                ) -> None:
+                    await self._handle_task(agent_type, lane, task)
+
+                consumer_tag = await rabbitmq.consume(
+                    agent_task_queue(agent_type, lane),
+                    handler,
+                    prefetch_count=self._prefetch_count,
+                    requeue=True,
+                    retry=True,
+                    on_parked=self._fail_parked_task,
+                )
+                self._consumer_tags.append(consumer_tag)
+
+        logger.info("worker_started", agent_types=self.agent_types)
+
+    def stop(self) -> None:
+        """Request a graceful shutdown."""
+        self._stop_event.set()
+
+    async def wait_stopped(self) -> None:
+        """Block until stop() is called, then drain in-flight tasks."""
+        await self._stop_event.wait()
+        await self.shutdown()
+
+    async def shutdown(self) -> None:
+        """
+        Stop consuming and let running tasks finish within the shutdown timeout.
+
+        Deliveries still waiting for a slot, and tasks that outlive the
+        timeout, are cancelled; their messages are rejected with requeue so
+        another worker picks them up.
+        """
+        logger.info("worker_stopping", running=len(self._running), waiting=len(self._waiting))
+        rabbitmq = await get_rabbitmq_client()
+        for consumer_tag in self._consumer_tags:
+            await rabbitmq.cancel_consumer(consumer_tag)
+
+        for task in list(self._waiting):
+            task.cancel()
+
+        if self._running:
+            _, pending = await asyncio.wait(
+                list(self._running), timeout=self._shutdown_timeout_seconds
+            )
+            for task in pending:
+                task.cancel()
+            if pending:
+                logger.warning("worker_tasks_abandoned", count=len(pending))
+                await asyncio.gather(*pending, return_exceptions=True)
+
+        for consumer_tag in self._consumer_tags:
+            await rabbitmq.close_consumer_channel(consumer_tag)
+        self._consumer_tags.clear()
+        logger.info("worker_stopped")
+
+    async def _handle_task(self, agent_type: str, lane: TaskLane, task: dict[str, Any]) -> None:
+        """Run one task once a slot of its lane is free."""
+        current = asyncio.current_task()
+        assert current is not None
+        self._waiting.add(current)
+        try:
+            async with self._slots.slot(lane):
+                self._waiting.discard(current)
+                self._running.add(current)
+                try:
+                    await self._process_task(agent_type, lane, task)
+                finally:
+                    self._running.discard(current)
+        finally:
+            self._waiting.discard(current)
+
+    async def _process_task(
+        self, agent_type: str, lane: TaskLane, task: dict[str, Any]
+    ) -> None:
+        """
+        Execute the agent and persist its result through the orchestrator.
+
+        Returning acks the message, so this only returns once the step state is
+        saved, or the result is published to the event router when enabled;
+        infrastructure errors propagate and the message is retried with
+        backoff, then parked. A redelivered task whose agent already ran
+        records the stored outcome instead of running the agent again.
+        """
+        workflow_id = task["workflow_id"]
+        step_id = task["step_id"]
+
+        orchestrator = await Orchestrator.load(workflow_id)
+        if orchestrator is None:
+            logger.warning("task_workflow_missing", workflow_id=workflow_id, step_id=step_id)
+            return
+
+        step = next((s for s in orchestrator.state.steps if s.step_id == step_id), None)
+        if (
+            step is None
+            or step.status != WorkflowStatus.RUNNING
+            or task.get("attempt", step.attempt) != step.attempt
+        ):
+            # Redelivery of a task whose result was already recorded, or of an
+            # earlier dispatch of a step that has since been retried
+            logger.info(
+                "task_skipped",
+                workflow_id=workflow_id,
+                step_id=step_id,
+                status=step.status.value if step else None,
+            )
+            if not get_settings().event_router_enabled and orchestrator.has_result(
+                step_id, task.get("attempt")
+            ):
+                # Recording may have failed after the transition committed
+                await orchestrator.finish_step_results([step_id])
+            return
+
+        key: str | None = task.get("idempotency_key")
+        token = None
+        if key and get_settings().idempotency_enabled:
+            token, outcome = await idempotency.claim(key)
+            if outcome is not None:
+                # The agent already ran for this dispatch; record its outcome again
+                # in case the first delivery died before recording it
+                logger.info("task_duplicate", workflow_id=workflow_id, step_id=step_id, key=key)
+                await self._record_result(workflow_id, outcome)
+                return
+
+        if key is None or token is None:
+            step_result = await self._run_agent(agent_type, lane, task)
+        else:
+            try:
+                async with idempotency.keep_alive(key, token):
+                    step_result = await self._run_agent(agent_type, lane, task)
+                await idempotency.complete(key, step_result)
+            except BaseException:
+                await asyncio.shield(idempotency.release(key, token))
+                raise
+        await self._record_result(workflow_id, step_result)
+
+    async def _run_agent(
+        self, agent_type: str, lane: TaskLane, task: dict[str, Any]
+    ) -> dict[str, Any]:
+        """
+        Run the agent of a task; agents open their own HITL reviews.
+
+        Returns the step result, with large outputs as claim references.
+        """
+        step_id = task["step_id"]
+        try:
+            input_data = await claim_check.resolve(task.get("input_data", {}))
+        except LookupError as e:
+            return {
+                "step_id": step_id,
+                "attempt": task.get("attempt"),
+                "idempotency_key": task.get("idempotency_key"),
+                "success": False,
+                "output_data": {},
+                "error": str(e),
+            }
+
+        agent = get_agent_class(agent_type)(
+            task["company_id"],
+            task.get("session_id"),
+            workflow_id=task["workflow_id"],
+            step_id=step_id,
+            lane=lane,
+        )
+        result = await agent.run(input_data)
+        return {
+            "step_id": step_id,
+            "attempt": task.get("attempt"),
+            "idempotency_key": task.get("idempotency_key"),
+            "success": result.success,
+            "output_data": await claim_check.offload(result.data),
+            "requires_hitl": result.requires_hitl,
+            "error": result.error,
+        }
+
+    async def _fail_parked_task(self, task: dict[str, Any], error: Exception) -> None:
+        """
+        Fail the step of a task that ran out of retries, releasing its slot.
+
+        Replaying the parked task through the admin API retries the step.
+        """
+        await self._record_result(
+            task["workflow_id"],
+            {
+                "step_id": task["step_id"],
+                "attempt": task.get("attempt"),
+                "idempotency_key": task.get("idempotency_key"),
+                "success": False,
+                "output_data": {},
+                "error": f"Gave up after retries: {error}",
+            },
+        )
+
+    async def _record_result(self, workflow_id: str, step_result: dict[str, Any]) -> None:
+        """Apply a step result to its workflow, or publish it to the event router."""
+        if get_settings().event_router_enabled:
+            rabbitmq = await get_rabbitmq_client()
+            await rabbitmq.publish_agent_result(
+                {**step_result, "event": "step_result", "workflow_id": workflow_id}
+            )
+            return
+
+        # Reload: other steps of the workflow may have moved on meanwhile
+        orchestrator = await Orchestrator.load(workflow_id)
+        if orchestrator is None:
+            logger.warning(
+                "task_workflow_missing", workflow_id=workflow_id, step_id=step_result["step_id"]
+            )
+            return
+        step_id = step_result["step_id"]
+        step = next((s for s in orchestrator.state.steps if s.step_id == step_id), None)
+        if (
+            step is None
+            or step.status != WorkflowStatus.RUNNING
+            or (step_result.get("attempt") or step.attempt) != step.attempt
+        ):
+            # Already recorded, or the result of a dispatch since superseded
+            logger.info("step_result_stale", workflow_id=workflow_id, step_id=step_id)
+            if orchestrator.has_result(step_id, step_result.get("attempt")):
+                # Recording may have failed after the transition committed
+                await orchestrator.finish_step_results([step_id])
+            return
+        output_data = await claim_check.resolve(step_result.get("output_data") or {})
+        await orchestrator.on_step_results([{**step_result, "output_data": output_data}])
+
+
+async def run_worker(
+    agent_types: list[str] | None = None,
+    concurrency: int | None = None,
+    prefetch_count: int | None = None,
+) -> None:
+    """Run an agent worker until SIGTERM or SIGINT."""
+    setup_logging()
+    settings = get_settings()
+
+    worker = AgentWorker(
+        agent_types=agent_types or settings.worker_agent_types or list(AGENT_REGISTRY),
+        concurrency=concurrency or settings.worker_concurrency,
+        prefetch_count=prefetch_count or settings.worker_prefetch_count,
+        shutdown_timeout_seconds=settings.worker_shutdown_timeout_seconds,
+        batch_max_share=settings.worker_batch_max_share,
+        interactive_weight=settings.worker_interactive_weight,
+    )
+
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(sig, worker.stop)
+
+    await get_redis_client()
+    try:
+        await worker.start()
+        await worker.wait_stopped()
+    finally:
+        await get_heartbeat_service().stop()
+        await close_rabbitmq_client()
+        await close_redis_client()
+
+
+def main() -> None:
+    """Parse arguments and run the agent worker."""
+    parser = argparse.ArgumentParser(description="Run HR policy agent workers.")
+    parser.add_argument(
+        "--agent-types",
+        nargs="+",
+        choices=sorted(AGENT_REGISTRY),
+        help="Agent types to consume (default: WORKER_AGENT_TYPES or all)",
+    )
+    parser.add_argument("--concurrency", type=int, help="Maximum tasks run at once")
+    parser.add_argument("--prefetch", type=int, help="Unacked deliveries per queue")
+    args = parser.parse_args()
+
+    asyncio.run(
+        run_worker(
+            agent_types=args.agent_types,
+            concurrency=args.concurrency,
+            prefetch_count=args.prefetch,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""Shared fixtures: an in-memory Redis, a recording RabbitMQ client and an API client."""
+
+from collections.abc import AsyncIterator
+from typing import Any
+
+import fakeredis
+import httpx
+import pytest
+
+from src.config import Settings, get_settings
+from src.core import (
+    heartbeat,
+    hitl_manager,
+    llm_cache,
+    rate_limiter,
+    single_flight,
+    workflow_signals,
+)
+from src.main import create_app
+from src.services import rabbitmq_client, read_cache, redis_client
+
+
+class FakeRabbitMQClient(rabbitmq_client.RabbitMQClient):
+    """RabbitMQ client that records published messages instead of sending them."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.published: list[tuple[str, dict[str, Any]]] = []
+
+    async def connect(self) -> None:
+        pass
+
+    async def declare_retry_topology(self, queue_name: str) -> None:
+        pass
+
+    async def publish(self, queue_name: str, message: dict[str, Any], priority: int = 0) -> None:
+        self.published.append((queue_name, message))
+
+    async def publish_many(
+        self, queue_name: str, messages: list[dict[str, Any]], priority: int = 0
+    ) -> None:
+        self.published.extend((queue_name, message) for message in messages)
+
+    def messages(self, queue_name: str) -> list[dict[str, Any]]:
+        """Messages published to one queue, oldest first."""
+        return [message for name, message in self.published if name == queue_name]
+
+
+@pytest.fixture
+def settings() -> Settings:
+    """Application settings; change fields with monkeypatch.setattr."""
+    return get_settings()
+
+
+@pytest.fixture
+def redis_server() -> fakeredis.FakeServer:
+    """In-memory Redis server, shared by every client a test creates."""
+    return fakeredis.FakeServer()
+
+
+@pytest.fixture
+async def redis(redis_server: fakeredis.FakeServer) -> AsyncIterator[redis_client.RedisClient]:
+    """Redis client singleton backed by an in-memory fake server."""
+    server = redis_server
+    client = redis_client.RedisClient()
+    client._client = fakeredis.aioredis.FakeRedis(server=server, decode_responses=True)
+    client._raw_client = fakeredis.aioredis.FakeRedis(server=server, decode_responses=False)
+    redis_client._redis_client = client
+    yield client
+    if workflow_signals._workflow_signals is not None:
+        await workflow_signals._workflow_signals.stop()
+        workflow_signals._workflow_signals = None
+    if read_cache._read_cache is not None:
+        await read_cache._read_cache.stop()
+        read_cache._read_cache = None
+    redis_client._redis_client = None
+    await client.disconnect()
+
+
+@pytest.fixture
+def rabbitmq() -> FakeRabbitMQClient:
+    """RabbitMQ client singleton that records publishes."""
+    client = FakeRabbitMQClient()
+    rabbitmq_client._rabbitmq_client = client
+    return client
+
+
+@pytest.fixture(autouse=True)
+async def reset_singletons() -> AsyncIterator[None]:
+    """Drop service singletons created by a test."""
+    yield
+    if heartbeat._heartbeat_service is not None:
+        await heartbeat._heartbeat_service.stop()
+    heartbeat._heartbeat_service = None
+    hitl_manager._hitl_manager = None
+    llm_cache._llm_cache = None
+    rate_limiter._rate_limiter = None
+    single_flight._single_flight = None
+    rabbitmq_client._rabbitmq_client = None
+
+
+@pytest.fixture
+async def api(
+    redis: redis_client.RedisClient,
+    rabbitmq: FakeRabbitMQClient,
+    settings: Settings,
+    monkeypatch: pytest.MonkeyPatch,
+) -> AsyncIterator[httpx.AsyncClient]:
+    """HTTP client for the app, applying workflow events in-process."""
+    monkeypatch.setattr(settings, "event_router_enabled", False)
+    transport = httpx.ASGITransport(app=create_app())
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        yield client
@@ -0,0 +1,148 @@
+"""Tests for agent LLM calls."""
+
+import asyncio
+import json
+from types import SimpleNamespace
+
+import pytest
+from google.api_core import exceptions as google_exceptions
+
+from src.agents.context_collector import ContextCollectorAgent
+from src.agents.grading_designer import GradingDesignerAgent
+from src.core import LLMPriority, Orchestrator, get_rate_limiter
+from src.core.orchestrator import PARTIAL_OUTPUT_TTL_SECONDS, step_partial_key
+from src.services import TaskLane
+
+
+async def test_calls_without_cache_are_not_coalesced(redis, monkeypatch):
+    agent = ContextCollectorAgent(company_id="company-1")
+    calls = []
+
+    async def generate(system_prompt, user_message, max_tokens, temperature, priority):
+        calls.append(user_message)
+        text = f"text {len(calls)}"
+        await asyncio.sleep(0.01)
+        return text
+
+    monkeypatch.setattr(agent, "_generate", generate)
+
+    fresh = await asyncio.gather(
+        *(agent.call_llm("system", "user", use_cache=False) for _ in range(2))
+    )
+    assert sorted(fresh) == ["text 1", "text 2"]
+
+    shared = await asyncio.gather(*(agent.call_llm("system", "user") for _ in range(2)))
+    assert shared == ["text 3", "text 3"]
+
+
+async def test_llm_priority_follows_the_task_lane(redis, settings, monkeypatch):
+    monkeypatch.setattr(settings, "gemini_rate_limit_enabled", True)
+    priorities = []
+
+    async def acquire(model, tokens, priority):
+        priorities.append(priority)
+        raise RuntimeError("stop before calling Gemini")
+
+    monkeypatch.setattr(get_rate_limiter(), "acquire", acquire)
+
+    for lane in TaskLane:
+        agent = ContextCollectorAgent(company_id="company-1", lane=lane)
+        with pytest.raises(RuntimeError):
+            await agent.call_llm("system", f"user {lane}", use_cache=False)
+
+    assert priorities == [LLMPriority.HITL_BLOCKING, LLMPriority.BATCH]
+
+
+async def test_partial_output_expires_and_is_cleared_on_completion(redis, rabbitmq):
+    orchestrator = Orchestrator("company-1")
+    await orchestrator.start({})
+    await orchestrator.dispatch_ready_steps()
+    agent = ContextCollectorAgent(
+        company_id="company-1", workflow_id=orchestrator.workflow_id, step_id="collect_context"
+    )
+    key = step_partial_key(orchestrator.workflow_id, "collect_context")
+
+    await agent.publish_progress({"grades": [{"level": "J1"}]})
+    assert json.loads(await redis.client.get(key)) == {"grades": [{"level": "J1"}]}
+    assert 0 < await redis.client.ttl(key) <= PARTIAL_OUTPUT_TTL_SECONDS
+
+    await orchestrator.on_step_completed("collect_context", {})
+    assert await redis.client.exists(key) == 0
+
+
+COMPANY = {"name": "Acme", "industry": "saas", "employee_count": 50}
+
+
+async def test_transient_llm_errors_propagate_from_run(redis, monkeypatch):
+    agent = ContextCollectorAgent(company_id="company-1")
+
+    async def generate(*args, **kwargs):
+        raise google_exceptions.ResourceExhausted("quota exceeded")
+
+    monkeypatch.setattr(agent, "_generate", generate)
+
+    with pytest.raises(google_exceptions.ResourceExhausted):
+        await agent.run(COMPANY)
+
+
+async def test_other_llm_errors_fall_back_inside_the_agent(redis, rabbitmq, monkeypatch):
+    agent = ContextCollectorAgent(company_id="company-1")
+
+    async def generate(*args, **kwargs):
+        raise ValueError("unparseable response")
+
+    monkeypatch.setattr(agent, "_generate", generate)
+
+    result = await agent.run(COMPANY)
+    assert result.success
+    assert result.data["enriched_context"]["recommended_grade_count"] == 6
+
+
+class StreamingModel:
+    """Gemini model stand-in streaming a fixed response in small chunks."""
+
+    def __init__(self, text: str, chunk_size: int = 5) -> None:
+        self.chunks = [text[i : i + chunk_size] for i in range(0, len(text), chunk_size)]
+        self.calls = 0
+
+    async def generate_content_async(self, prompt, generation_config, stream):
+        self.calls += 1
+
+        async def response():
+            for chunk in self.chunks:
+                yield SimpleNamespace(text=chunk)
+
+        return response()
+
+
+GRADES_RESPONSE = json.dumps(
+    {"recommended_grade_count": 3, "grades": [{"level": "J1"}, {"level": "J2"}]}
+)
+
+
+async def test_streamed_grades_are_published_as_each_one_closes(redis, monkeypatch):
+    agent = GradingDesignerAgent(company_id="company-1")
+    model = StreamingModel(GRADES_RESPONSE)
+    progress = []
+
+    async def get_model():
+        return model
+
+    async def publish_progress(partial_output):
+        progress.append([grade["level"] for grade in partial_output["grades"]])
+
+    monkeypatch.setattr(agent, "_get_gemini_model", get_model)
+    monkeypatch.setattr(agent, "publish_progress", publish_progress)
+
+    grading = await agent._design_grading_system(COMPANY, {"competencies": []})
+
+    assert progress == [["J1"], ["J1", "J2"]]
+    assert [grade.level for grade in grading.grades] == ["J1", "J2"]
+
+    # The full response was cached, and is served as one chunk next time
+    progress.clear()
+    cached = await agent._design_grading_system(COMPANY, {"competencies": []})
+
+    assert model.calls == 1
+    assert progress == [["J1", "J2"]]
+    assert [grade.level for grade in cached.grades] == ["J1", "J2"]
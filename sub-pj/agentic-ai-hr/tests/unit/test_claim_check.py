@@ -0,0 +1,86 @@
+"""Tests for claim-check offloading of large task payloads."""
+
+import hashlib
+
+import pytest
+
+from src.core import Orchestrator, WorkflowStatus
+from src.services import TaskLane, claim_check
+from src.worker import AgentWorker
+
+LARGE = {"rows": ["x" * 50] * 10}
+
+
+@pytest.fixture
+def threshold(settings, monkeypatch):
+    """Offload values of 256 bytes or more."""
+    monkeypatch.setattr(settings, "claim_check_threshold_bytes", 256)
+    monkeypatch.setattr(settings, "claim_check_ttl_seconds", 600)
+
+
+async def test_only_values_over_the_threshold_are_offloaded(redis, threshold):
+    payload = {"small": {"a": 1}, "large": LARGE}
+
+    offloaded = await claim_check.offload(payload)
+
+    assert offloaded["small"] == {"a": 1}
+    assert claim_check.is_claim_ref(offloaded["large"])
+    assert payload["large"] == LARGE
+    assert await claim_check.resolve(offloaded) == payload
+
+
+async def test_identical_values_share_one_stored_copy(redis, threshold):
+    offloaded = await claim_check.offload({"first": LARGE, "second": LARGE})
+
+    assert offloaded["first"] == offloaded["second"]
+    keys = await redis.client.keys("claim:*")
+    assert len(keys) == 1
+    assert 0 < await redis.client.ttl(keys[0]) <= 600
+
+
+async def test_user_data_with_a_claim_key_is_not_taken_for_a_reference(redis, threshold):
+    digest = hashlib.sha256(b"other").hexdigest()
+    payload = {
+        "note": {"$claim": "mine"},
+        "lookalike": {"$claim": digest, "size": 5},
+    }
+
+    offloaded = await claim_check.offload(payload)
+
+    assert offloaded["note"] == {"$claim": "mine"}
+    assert offloaded["lookalike"]["$claim"] != digest
+    assert await claim_check.resolve(offloaded) == payload
+    assert await claim_check.resolve({"note": {"$claim": "mine"}}) == {"note": {"$claim": "mine"}}
+
+
+async def test_missing_claim_raises_lookup_error(redis, threshold):
+    offloaded = await claim_check.offload({"large": LARGE})
+    await redis.client.delete(*await redis.client.keys("claim:*"))
+
+    with pytest.raises(LookupError, match="'large'"):
+        await claim_check.resolve(offloaded)
+
+
+async def test_worker_fails_the_step_of_a_task_whose_claim_expired(
+    redis, rabbitmq, threshold, settings, monkeypatch
+):
+    monkeypatch.setattr(settings, "event_router_enabled", False)
+    orchestrator = Orchestrator("company-1")
+    await orchestrator.start({"context": LARGE})
+    await orchestrator.dispatch_ready_steps()
+    [task] = rabbitmq.messages("agent.context_collector.tasks")
+    assert claim_check.is_claim_ref(task["input_data"]["context"])
+    await redis.client.delete(*await redis.client.keys("claim:*"))
+
+    worker = AgentWorker(
+        agent_types=["context_collector"],
+        concurrency=1,
+        prefetch_count=1,
+        shutdown_timeout_seconds=1,
+    )
+    await worker._process_task("context_collector", TaskLane.INTERACTIVE, task)
+
+    stored = await Orchestrator.load(orchestrator.workflow_id)
+    step = stored._get_step("collect_context")
+    assert step.status == WorkflowStatus.FAILED
+    assert "missing or expired" in step.error
@@ -0,0 +1,49 @@
+"""Tests for the Redis payload codec."""
+
+import pytest
+
+from src.services import codec
+
+LARGE = {"rows": [{"index": index, "text": "x" * 20} for index in range(100)]}
+
+
+@pytest.fixture
+def compression(settings, monkeypatch):
+    """Compress payloads of 256 bytes or more."""
+    monkeypatch.setattr(settings, "redis_compression_enabled", True)
+    monkeypatch.setattr(settings, "redis_compression_threshold_bytes", 256)
+
+
+def test_small_values_are_plain_json(compression):
+    raw = codec.encode({"a": 1})
+
+    assert raw == b'{"a":1}'
+    assert codec.decode(raw) == {"a": 1}
+
+
+def test_large_values_are_compressed_behind_the_header(compression):
+    raw = codec.encode(LARGE)
+
+    assert raw.startswith(codec.COMPRESSED_HEADER)
+    assert codec.decode(raw) == LARGE
+
+
+def test_compress_false_keeps_plain_json(compression):
+    raw = codec.encode(LARGE, compress=False)
+
+    assert raw.startswith(b"{")
+    assert codec.decode(raw) == LARGE
+
+
+def test_values_written_before_the_codec_decode(compression):
+    assert codec.decode('{"legacy": true}') == {"legacy": True}
+    assert codec.decode(b'{"legacy": true}') == {"legacy": True}
+
+
+def test_without_compression_libraries_values_stay_plain(compression, monkeypatch):
+    compressed = codec.encode(LARGE)
+    monkeypatch.setattr(codec, "COMPRESSION_AVAILABLE", False)
+
+    assert codec.encode(LARGE).startswith(b"{")
+    with pytest.raises(RuntimeError, match="not installed"):
+        codec.decode(compressed)
@@ -0,0 +1,119 @@
+"""Tests for the event router."""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from src.core import Orchestrator, WorkflowStatus
+from src.event_router import EventRouter
+from src.services import RetryLater, rabbitmq_client
+from src.services.rabbitmq_client import RETRY_COUNT_HEADER, retry_queue_name
+
+
+@pytest.fixture
+async def router(redis, rabbitmq):
+    """Event router with its shard loops running, fed directly."""
+    router = EventRouter(shards=2, prefetch_count=10, max_batch=10)
+    router._tasks = [asyncio.create_task(router._run_shard(shard)) for shard in router._shards]
+    yield router
+    for task in router._tasks:
+        task.cancel()
+    await asyncio.gather(*router._tasks, return_exceptions=True)
+
+
+async def test_decision_before_its_step_result_is_delayed(router):
+    orchestrator = Orchestrator("company-1")
+    await orchestrator.start({})
+    await orchestrator.dispatch_ready_steps()
+    step = orchestrator._get_step("collect_context")
+    decision = {
+        "workflow_id": orchestrator.workflow_id,
+        "step_id": "collect_context",
+        "approved": True,
+    }
+
+    with pytest.raises(RetryLater):
+        await router._route("hitl.responses", decision)
+
+    await router._route(
+        "agent.results",
+        {
+            "workflow_id": orchestrator.workflow_id,
+            "step_id": "collect_context",
+            "attempt": step.attempt,
+            "success": True,
+            "requires_hitl": True,
+        },
+    )
+    await router._route("hitl.responses", decision)
+
+    stored = await Orchestrator.load(orchestrator.workflow_id)
+    assert stored._get_step("collect_context").status == WorkflowStatus.COMPLETED
+
+
+async def test_redelivered_result_dispatches_successors_after_a_failed_apply(
+    router, rabbitmq, monkeypatch
+):
+    orchestrator = Orchestrator("company-1")
+    await orchestrator.start({})
+    await orchestrator.dispatch_ready_steps()
+    result = {
+        "workflow_id": orchestrator.workflow_id,
+        "step_id": "collect_context",
+        "attempt": orchestrator._get_step("collect_context").attempt,
+        "success": True,
+        "output_data": {"company": "Acme"},
+    }
+    dispatch = Orchestrator.dispatch_ready_steps
+
+    async def broker_down(self: Orchestrator) -> list[str]:
+        raise ConnectionError("broker down")
+
+    # The result transition commits, then dispatching its successors fails
+    monkeypatch.setattr(Orchestrator, "dispatch_ready_steps", broker_down)
+    with pytest.raises(ConnectionError):
+        await router._route("agent.results", dict(result))
+    assert not rabbitmq.messages("agent.talent_profile_generator.tasks")
+
+    monkeypatch.setattr(Orchestrator, "dispatch_ready_steps", dispatch)
+    await router._route("agent.results", dict(result))
+
+    assert rabbitmq.messages("agent.talent_profile_generator.tasks")
+    stored = await Orchestrator.load(orchestrator.workflow_id)
+    assert stored._get_step("collect_context").status == WorkflowStatus.COMPLETED
+    assert stored._get_step("generate_talent_profile").status == WorkflowStatus.RUNNING
+
+
+async def test_retry_later_does_not_use_up_the_retry_budget(settings, monkeypatch):
+    monkeypatch.setattr(settings, "agent_max_retry_count", 1)
+    monkeypatch.setattr(settings, "agent_retry_delays_seconds", [1.0])
+    client = rabbitmq_client.RabbitMQClient()
+    republished = []
+
+    async def republish(queue_name, message, headers):
+        republished.append(queue_name)
+        message.headers = headers
+
+    monkeypatch.setattr(client, "_republish", republish)
+    message = SimpleNamespace(headers={RETRY_COUNT_HEADER: 1})
+
+    for _ in range(3):
+        assert not await client._retry_or_park("hitl.responses", message, RetryLater("wait"))
+
+    assert republished == [retry_queue_name("hitl.responses", 1)] * 3
+    assert message.headers[RETRY_COUNT_HEADER] == 1
+
+
+async def test_retry_topology_keeps_the_priority_argument(monkeypatch):
+    client = rabbitmq_client.RabbitMQClient()
+    declared = {}
+
+    async def declare_queue(queue_name, durable, arguments):
+        declared[queue_name] = arguments
+
+    monkeypatch.setattr(client, "_channel", SimpleNamespace(declare_queue=declare_queue))
+    await client.declare_retry_topology("hitl.responses")
+
+    assert declared["hitl.responses"]["x-max-priority"] == 10
+    assert declared["hitl.responses"]["x-dead-letter-routing-key"] == "hitl.responses.parking"
@@ -0,0 +1,28 @@
+"""Tests for process-wide agent heartbeats."""
+
+from src.core import HeartbeatService, get_heartbeat_service
+from src.main import create_app, lifespan
+
+
+async def test_agents_are_alive_until_unregistered(redis):
+    service = HeartbeatService(interval_seconds=60)
+
+    await service.register("agent-1")
+    assert await redis.is_agent_alive("agent-1")
+
+    await service.unregister("agent-1")
+    assert not await redis.is_agent_alive("agent-1")
+    await service.stop()
+
+
+async def test_app_shutdown_stops_the_heartbeat_loop(redis, rabbitmq, settings, monkeypatch):
+    monkeypatch.setattr(settings, "hitl_expiry_sweeper_enabled", False)
+
+    async with lifespan(create_app()):
+        service = get_heartbeat_service()
+        await service.register("agent-1")
+        task = service._task
+        assert task is not None and not task.done()
+
+    assert task.cancelled()
+    assert service._task is None
@@ -0,0 +1,118 @@
+"""Tests for HITL approval requests."""
+
+import fakeredis
+import pytest
+
+from src.core import HITLManager, HITLStatus
+from src.services import codec
+
+
+async def create_requests(manager: HITLManager, count: int) -> list[str]:
+    """Create pending requests for company-1, returning their IDs oldest first."""
+    request_ids = []
+    for index in range(count):
+        request = await manager.create_request(
+            gate_id="HITL-001",
+            agent_id="agent-1",
+            agent_type="context_collector",
+            company_id="company-1",
+            title=f"Request {index}",
+            description="",
+            data={},
+        )
+        request_ids.append(request.request_id)
+    return request_ids
+
+
+async def read_all_pages(manager: HITLManager, limit: int) -> list[str]:
+    """Follow the cursor through every page of company-1's pending requests."""
+    seen: list[str] = []
+    cursor = None
+    while True:
+        requests, cursor = await manager.get_pending_page("company-1", limit, cursor)
+        seen.extend(request.request_id for request in requests)
+        if cursor is None:
+            return seen
+
+
+async def test_cursor_pages_cover_every_request_newest_first(redis, rabbitmq):
+    manager = HITLManager()
+    request_ids = await create_requests(manager, 5)
+    # Distinct, increasing scores regardless of clock resolution
+    await redis.client.zadd(
+        "hitl:queue:company-1",
+        {request_id: index for index, request_id in enumerate(request_ids)},
+    )
+
+    assert await read_all_pages(manager, limit=2) == request_ids[::-1]
+
+
+async def test_cursor_pages_split_requests_sharing_a_score(redis, rabbitmq):
+    manager = HITLManager()
+    request_ids = await create_requests(manager, 5)
+    await redis.client.zadd("hitl:queue:company-1", dict.fromkeys(request_ids, 100))
+
+    assert await read_all_pages(manager, limit=2) == sorted(request_ids, reverse=True)
+
+
+async def test_legacy_pending_set_is_migrated_on_read(redis, rabbitmq):
+    manager = HITLManager()
+    request_ids = await create_requests(manager, 3)
+    await redis.client.delete("hitl:queue:company-1")
+    await redis.client.sadd("hitl:pending:company-1", *request_ids)
+
+    assert sorted(await read_all_pages(manager, limit=2)) == sorted(request_ids)
+    assert not await redis.client.exists("hitl:pending:company-1")
+
+
+async def test_malformed_cursor_is_rejected(redis, rabbitmq):
+    manager = HITLManager()
+
+    with pytest.raises(ValueError):
+        await manager.get_pending_page("company-1", 2, "not-a-cursor")
+
+
+async def test_decision_after_expiry_is_refused(redis, rabbitmq):
+    manager = HITLManager()
+    [request_id] = await create_requests(manager, 1)
+
+    assert await manager.expire_request(request_id)
+    assert await manager.submit_decision(request_id, approved=True) is None
+
+    stored = await manager.get_request(request_id)
+    assert stored.status == HITLStatus.EXPIRED
+    assert [m["expired"] for m in rabbitmq.messages("hitl.responses")] == [True]
+
+
+async def test_expiry_after_decision_is_skipped(redis, rabbitmq):
+    manager = HITLManager()
+    [request_id] = await create_requests(manager, 1)
+
+    assert await manager.submit_decision(request_id, approved=True)
+    assert await manager.expire_request(request_id) is None
+    assert not await manager.cancel_request(request_id)
+
+    stored = await manager.get_request(request_id)
+    assert stored.status == HITLStatus.APPROVED
+    assert len(rabbitmq.messages("hitl.responses")) == 1
+
+
+async def test_close_rechecks_a_request_changed_while_watched(redis, redis_server, rabbitmq):
+    manager = HITLManager()
+    [request_id] = await create_requests(manager, 1)
+    other_client = fakeredis.FakeRedis(server=redis_server)
+
+    def expire_elsewhere_then_decide(request):
+        # Another process closes the request between the read and the write
+        if other_client.get("closed") is None:
+            other_client.set("closed", 1)
+            closed = request.model_copy(update={"status": HITLStatus.EXPIRED})
+            other_client.set(
+                f"hitl:request:{request_id}", codec.encode(closed.model_dump(mode="json"))
+            )
+        request.status = HITLStatus.APPROVED
+
+    outcomes = await manager._close_pending([request_id], expire_elsewhere_then_decide)
+
+    assert outcomes == {request_id: "Review request is expired"}
+    assert (await manager.get_request(request_id)).status == HITLStatus.EXPIRED
@@ -0,0 +1,92 @@
+"""Tests for idempotent processing of redelivered messages."""
+
+import pytest
+
+from src.core import HITLManager, Orchestrator, WorkflowStatus
+from src.services import RetryLater, TaskLane, idempotency
+from src.worker import AgentWorker
+
+
+async def test_claims_are_exclusive_until_completed_or_released(redis):
+    token, outcome = await idempotency.claim("wf:step:1")
+    assert token is not None and outcome is None
+
+    with pytest.raises(RetryLater):
+        await idempotency.claim("wf:step:1")
+
+    await idempotency.release("wf:step:1", token)
+    token, _ = await idempotency.claim("wf:step:1")
+    await idempotency.complete("wf:step:1", {"success": True})
+
+    assert await idempotency.claim("wf:step:1") == (None, {"success": True})
+
+
+async def test_redelivered_task_records_the_stored_outcome(redis, rabbitmq, settings, monkeypatch):
+    monkeypatch.setattr(settings, "event_router_enabled", False)
+    orchestrator = Orchestrator("company-1")
+    await orchestrator.start({})
+    await orchestrator.dispatch_ready_steps()
+    [task] = rabbitmq.messages("agent.context_collector.tasks")
+
+    worker = AgentWorker(
+        agent_types=["context_collector"],
+        concurrency=1,
+        prefetch_count=1,
+        shutdown_timeout_seconds=1,
+    )
+    runs = []
+
+    async def run_agent(agent_type, lane, task):
+        runs.append(task["step_id"])
+        return {
+            "step_id": task["step_id"],
+            "attempt": task["attempt"],
+            "idempotency_key": task["idempotency_key"],
+            "success": True,
+            "output_data": {"done": True},
+        }
+
+    monkeypatch.setattr(worker, "_run_agent", run_agent)
+
+    record_result = worker._record_result
+    recorded = []
+
+    async def die_before_first_record(workflow_id, step_result):
+        recorded.append(step_result)
+        if len(recorded) == 1:
+            raise ConnectionError("died before recording")
+        await record_result(workflow_id, step_result)
+
+    # The first delivery runs the agent, then dies before recording the result
+    monkeypatch.setattr(worker, "_record_result", die_before_first_record)
+    with pytest.raises(ConnectionError):
+        await worker._process_task("context_collector", TaskLane.INTERACTIVE, task)
+
+    await worker._process_task("context_collector", TaskLane.INTERACTIVE, task)
+
+    assert runs == ["collect_context"]
+    stored = await Orchestrator.load(orchestrator.workflow_id)
+    await stored.load_step_data("collect_context")
+    step = stored._get_step("collect_context")
+    assert step.status == WorkflowStatus.COMPLETED
+    assert step.output_data == {"done": True}
+
+
+async def test_workflow_events_and_hitl_responses_carry_idempotency_keys(redis, rabbitmq):
+    orchestrator = Orchestrator("company-1")
+    await orchestrator.start({})
+    request = await HITLManager().create_request(
+        gate_id="HITL-001",
+        agent_id="agent-1",
+        agent_type="context_collector",
+        company_id="company-1",
+        title="Context",
+        description="",
+        data={},
+    )
+    await HITLManager().submit_decision(request.request_id, approved=True)
+
+    [started] = rabbitmq.messages("orchestrator.events")
+    [response] = rabbitmq.messages("hitl.responses")
+    assert started["idempotency_key"] == f"{orchestrator.workflow_id}:started"
+    assert response["idempotency_key"] == f"hitl:{request.request_id}"
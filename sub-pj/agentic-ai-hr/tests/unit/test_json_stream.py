@@ -0,0 +1,68 @@
+"""Tests for incremental parsing of streamed LLM JSON output."""
+
+import json
+
+import pytest
+
+from src.utils import JSONArrayItemStream
+
+RESPONSE = """Here is the design:
+```json
+{
+    "summary": "grades: [\\"not\\", {\\"an\\": \\"item\\"}]",
+    "grades": [
+        {"level": "J1", "name": "Junior \\"I\\"", "tags": ["a", "}"], "meta": {"x": [1, 2]}},
+        {"level": "J2", "name": "Back\\\\slash {", "tags": []}
+    ],
+    "notes": [{"level": "ignored"}],
+    "nested": {"grades": [{"level": "also ignored"}]},
+    "allowances": [{"name": "Housing"}]
+}
+```"""
+
+
+def feed_in_chunks(parser: JSONArrayItemStream, text: str, size: int) -> list[tuple[str, dict]]:
+    items = []
+    for start in range(0, len(text), size):
+        items.extend(parser.feed(text[start : start + size]))
+    return items
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 7, 16, len(RESPONSE)])
+def test_items_are_extracted_however_the_text_is_split(size):
+    parser = JSONArrayItemStream("grades", "allowances")
+
+    items = feed_in_chunks(parser, RESPONSE, size)
+
+    assert items == [
+        (
+            "grades",
+            {"level": "J1", "name": 'Junior "I"', "tags": ["a", "}"], "meta": {"x": [1, 2]}},
+        ),
+        ("grades", {"level": "J2", "name": "Back\\slash {", "tags": []}),
+        ("allowances", {"name": "Housing"}),
+    ]
+    assert parser.text == RESPONSE
+
+
+def test_items_are_returned_by_the_chunk_that_closes_them():
+    parser = JSONArrayItemStream("grades")
+
+    assert parser.feed('{"gra') == []
+    assert parser.feed('des": [{"level": "J1"') == []
+    assert parser.feed('}, {"level"') == [("grades", {"level": "J1"})]
+    assert parser.feed(': "J2"}]}') == [("grades", {"level": "J2"})]
+
+
+def test_a_key_matching_only_as_a_value_does_not_open_an_array():
+    parser = JSONArrayItemStream("grades")
+
+    assert parser.feed('{"kind": "grades", "list": [{"level": "J1"}]}') == []
+
+
+def test_full_text_still_parses_after_streaming():
+    parser = JSONArrayItemStream("grades")
+    feed_in_chunks(parser, RESPONSE, 5)
+
+    start, end = parser.text.find("{"), parser.text.rfind("}") + 1
+    assert len(json.loads(parser.text[start:end])["grades"]) == 2
@@ -0,0 +1,67 @@
+"""Tests for interactive and batch lane slots."""
+
+import asyncio
+
+from src.services import TaskLane
+from src.worker import LaneSlots
+
+
+async def run_tasks(slots: LaneSlots, tasks: list[TaskLane], started: list[TaskLane]) -> None:
+    """Run one short task per entry, recording the order they start in."""
+
+    async def task(lane: TaskLane) -> None:
+        async with slots.slot(lane):
+            started.append(lane)
+            await asyncio.sleep(0)
+
+    await asyncio.gather(*(task(lane) for lane in tasks))
+
+
+async def test_batch_tasks_are_capped_below_the_concurrency():
+    slots = LaneSlots(concurrency=4, batch_limit=2, interactive_weight=4)
+    release = asyncio.Event()
+    running = 0
+    peak = 0
+
+    async def batch_task() -> None:
+        nonlocal running, peak
+        async with slots.slot(TaskLane.BATCH):
+            running += 1
+            peak = max(peak, running)
+            await release.wait()
+            running -= 1
+
+    tasks = [asyncio.create_task(batch_task()) for _ in range(4)]
+    await asyncio.sleep(0.01)
+    assert slots.get_stats()["batch"] == {"running": 2, "waiting": 2}
+
+    # Interactive work still gets the remaining slots
+    async with slots.slot(TaskLane.INTERACTIVE):
+        assert slots.get_stats()["interactive"]["running"] == 1
+
+    release.set()
+    await asyncio.gather(*tasks)
+    assert peak == 2
+
+
+async def test_freed_slots_favour_interactive_by_weight():
+    slots = LaneSlots(concurrency=1, batch_limit=1, interactive_weight=2)
+    started: list[TaskLane] = []
+
+    # One slot, both lanes queued behind the task holding it
+    async with slots.slot(TaskLane.INTERACTIVE):
+        waiting = asyncio.create_task(
+            run_tasks(slots, [TaskLane.BATCH] * 3 + [TaskLane.INTERACTIVE] * 4, started)
+        )
+        await asyncio.sleep(0.01)
+    await waiting
+
+    assert started == [
+        TaskLane.INTERACTIVE,
+        TaskLane.BATCH,
+        TaskLane.INTERACTIVE,
+        TaskLane.INTERACTIVE,
+        TaskLane.BATCH,
+        TaskLane.INTERACTIVE,
+        TaskLane.BATCH,
+    ]
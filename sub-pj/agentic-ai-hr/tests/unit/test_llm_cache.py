@@ -0,0 +1,105 @@
+"""Tests for the two-tier LLM response cache."""
+
+import pytest
+
+from src.core import LLMResponseCache
+from src.core import llm_cache as llm_cache_module
+
+REQUEST = {
+    "model": "gemini-2.0-flash",
+    "system_prompt": "You are an HR advisor.",
+    "user_message": "Design grades for Acme.",
+    "temperature": 0.2,
+    "max_tokens": 1024,
+}
+
+
+class Clock:
+    """Monotonic clock stand-in advanced by hand."""
+
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(llm_cache_module.time, "monotonic", clock)
+    return clock
+
+
+async def test_stored_response_is_a_local_hit_then_a_redis_hit(redis):
+    key = LLMResponseCache.make_key(**REQUEST)
+    cache = LLMResponseCache(max_entries=10, ttl_seconds=600)
+    await cache.set(key, "response")
+
+    assert await cache.get(key) == "response"
+    assert 0 < await redis.client.ttl(f"llm:cache:{key}") <= 600
+
+    # Another process only shares the Redis tier
+    other = LLMResponseCache(max_entries=10, ttl_seconds=600)
+    assert await other.get(key) == "response"
+    assert await other.get(key) == "response"
+    assert (cache.local_hits, other.redis_hits, other.local_hits) == (1, 1, 1)
+
+
+@pytest.mark.parametrize(
+    "change",
+    [
+        {"system_prompt": "You are a lawyer."},
+        {"user_message": "Design grades for Globex."},
+        {"model": "gemini-2.5-pro"},
+        {"temperature": 0.7},
+        {"max_tokens": 2048},
+    ],
+)
+async def test_any_change_to_the_request_misses(redis, change):
+    cache = LLMResponseCache(max_entries=10, ttl_seconds=600)
+    await cache.set(LLMResponseCache.make_key(**REQUEST), "response")
+
+    assert await cache.get(LLMResponseCache.make_key(**{**REQUEST, **change})) is None
+    assert cache.misses == 1
+
+
+async def test_entries_expire_after_the_ttl(redis, clock):
+    key = LLMResponseCache.make_key(**REQUEST)
+    cache = LLMResponseCache(max_entries=10, ttl_seconds=60)
+    await cache.set(key, "response")
+
+    clock.now += 59
+    assert await cache.get(key) == "response"
+
+    clock.now += 1
+    await redis.client.delete(f"llm:cache:{key}")
+    assert await cache.get(key) is None
+    assert cache.get_stats()["local_entries"] == 0
+
+
+async def test_local_tier_keeps_the_redis_ttl_of_an_entry(redis, clock):
+    key = LLMResponseCache.make_key(**REQUEST)
+    await redis.set(f"llm:cache:{key}", "response", 30)
+    cache = LLMResponseCache(max_entries=10, ttl_seconds=600)
+
+    assert await cache.get(key) == "response"
+
+    clock.now += 30
+    await redis.client.delete(f"llm:cache:{key}")
+    assert await cache.get(key) is None
+
+
+async def test_least_recently_used_entry_is_evicted_locally(redis):
+    cache = LLMResponseCache(max_entries=2, ttl_seconds=600)
+    await cache.set("a", "A")
+    await cache.set("b", "B")
+    assert await cache.get("a") == "A"
+
+    await cache.set("c", "C")
+
+    assert list(cache._entries) == ["a", "c"]
+    # Still served from Redis, and cached locally again
+    assert await cache.get("b") == "B"
+    assert cache.redis_hits == 1
+    assert list(cache._entries) == ["c", "b"]
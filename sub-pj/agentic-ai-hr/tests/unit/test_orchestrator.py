@@ -0,0 +1,212 @@
+"""Tests for workflow orchestration."""
+
+import asyncio
+
+import pytest
+
+from src.core import Orchestrator, WorkflowStatus, get_workflow_signals
+from src.core import orchestrator as orchestrator_module
+from src.core.orchestrator import WorkflowGraph
+
+
+def dispatched_steps(rabbitmq) -> list[str]:
+    """Step IDs of the agent tasks published so far, in dispatch order."""
+    return [
+        message["step_id"]
+        for queue_name, message in rabbitmq.published
+        if queue_name.startswith("agent.")
+    ]
+
+
+async def wait_for_dispatch(rabbitmq, count: int) -> None:
+    """Wait until count agent tasks have been published."""
+    async with asyncio.timeout(5):
+        while len(dispatched_steps(rabbitmq)) < count:
+            await asyncio.sleep(0.01)
+
+
+async def test_run_to_completion_wakes_on_results_applied_elsewhere(redis, rabbitmq):
+    orchestrator = Orchestrator("company-1")
+    await orchestrator.start({"company_name": "Acme"})
+
+    # A long recheck interval, so only the signals can finish this in time
+    runner = asyncio.create_task(orchestrator.run_to_completion(recheck_interval=60))
+    for count in range(1, len(orchestrator.state.steps) + 1):
+        await wait_for_dispatch(rabbitmq, count)
+        step_id = dispatched_steps(rabbitmq)[count - 1]
+        # Results are applied by another process, e.g. a worker
+        other = await Orchestrator.load(orchestrator.workflow_id)
+        await other.on_step_completed(step_id, {"done": step_id})
+
+    async with asyncio.timeout(5):
+        state = await runner
+
+    assert state.status == WorkflowStatus.COMPLETED
+    assert dispatched_steps(rabbitmq) == [step.step_id for step in state.steps]
+    assert get_workflow_signals().get_stats()["waiters"] == 0
+
+
+async def test_run_to_completion_stops_watching_when_cancelled(redis, rabbitmq):
+    orchestrator = Orchestrator("company-1")
+    await orchestrator.start({})
+    runner = asyncio.create_task(orchestrator.run_to_completion(recheck_interval=60))
+    await wait_for_dispatch(rabbitmq, 1)
+
+    runner.cancel()
+    await asyncio.gather(runner, return_exceptions=True)
+
+    assert get_workflow_signals().get_stats()["waiters"] == 0
+
+
+async def test_runners_share_one_subscription_and_wake_only_for_their_workflow(redis, rabbitmq):
+    first = Orchestrator("company-1")
+    second = Orchestrator("company-1")
+    runners = []
+    for count, orchestrator in enumerate((first, second), start=1):
+        await orchestrator.start({})
+        runners.append(asyncio.create_task(orchestrator.run_to_completion(recheck_interval=60)))
+        await wait_for_dispatch(rabbitmq, count)
+
+    assert await redis.client.pubsub_numpat() == 1
+    assert get_workflow_signals().get_stats()["waiters"] == 2
+
+    other = await Orchestrator.load(first.workflow_id)
+    await other.on_step_failed("collect_context", "boom")
+    async with asyncio.timeout(5):
+        state = await runners[0]
+
+    assert state.status == WorkflowStatus.FAILED
+    assert not runners[1].done()
+    runners[1].cancel()
+    await asyncio.gather(runners[1], return_exceptions=True)
+
+
+async def test_company_cap_defers_steps_until_a_slot_is_released(
+    redis, rabbitmq, settings, monkeypatch
+):
+    monkeypatch.setattr(settings, "company_max_parallel_steps", 1)
+    first = Orchestrator("company-1")
+    second = Orchestrator("company-1")
+    for orchestrator in (first, second):
+        await orchestrator.start({})
+
+    assert await first.dispatch_ready_steps() == ["collect_context"]
+    assert await second.dispatch_ready_steps() == []
+    assert await redis.client.smembers("deferred:company:company-1") == {second.workflow_id}
+
+    await first.on_step_completed("collect_context", {})
+
+    # The released slot went to the deferred workflow before first's successor
+    dispatched = [
+        (message["workflow_id"], message["step_id"])
+        for queue_name, message in rabbitmq.published
+        if queue_name.startswith("agent.")
+    ]
+    assert dispatched == [
+        (first.workflow_id, "collect_context"),
+        (second.workflow_id, "collect_context"),
+    ]
+    assert await redis.client.smembers("deferred:company:company-1") == {first.workflow_id}
+
+
+async def completed_through_grading() -> Orchestrator:
+    """A workflow whose steps up to design_grading have completed."""
+    orchestrator = Orchestrator("company-1")
+    await orchestrator.start({})
+    for step_id in ("collect_context", "generate_talent_profile", "design_grading"):
+        await orchestrator.dispatch_ready_steps()
+        await orchestrator.on_step_completed(step_id, {})
+    return orchestrator
+
+
+async def test_independent_ready_steps_are_dispatched_together(redis, rabbitmq):
+    orchestrator = await completed_through_grading()
+
+    assert dispatched_steps(rabbitmq)[-2:] == ["design_evaluation", "design_compensation"]
+    assert orchestrator._get_step("design_evaluation").status == WorkflowStatus.RUNNING
+    assert orchestrator._get_step("design_compensation").status == WorkflowStatus.RUNNING
+
+
+async def test_workflow_cap_defers_ready_steps_until_one_finishes(
+    redis, rabbitmq, settings, monkeypatch
+):
+    monkeypatch.setattr(settings, "workflow_max_parallel_steps", 1)
+    orchestrator = await completed_through_grading()
+
+    assert dispatched_steps(rabbitmq)[-1] == "design_evaluation"
+    assert orchestrator._get_step("design_compensation").status == WorkflowStatus.PENDING
+    assert await orchestrator.dispatch_ready_steps() == []
+
+    await orchestrator.on_step_completed("design_evaluation", {})
+
+    assert dispatched_steps(rabbitmq)[-1] == "design_compensation"
+
+
+async def test_dispatch_releases_slot_when_publish_fails(redis, rabbitmq, monkeypatch):
+    async def fail(*args, **kwargs):
+        raise ConnectionError("broker unavailable")
+
+    orchestrator = Orchestrator("company-1")
+    await orchestrator.start({})
+    monkeypatch.setattr(rabbitmq, "publish", fail)
+
+    with pytest.raises(ConnectionError):
+        await orchestrator.dispatch_ready_steps()
+
+    stored = await Orchestrator.load(orchestrator.workflow_id)
+    assert stored._get_step("collect_context").status == WorkflowStatus.PENDING
+    assert await redis.client.zcard("inflight:company:company-1") == 0
+
+
+async def test_dispatch_conflict_keeps_the_winning_replicas_slot(redis, rabbitmq):
+    orchestrator = Orchestrator("company-1")
+    await orchestrator.start({})
+    replica = await Orchestrator.load(orchestrator.workflow_id)
+
+    assert await orchestrator.dispatch_ready_steps() == ["collect_context"]
+    assert await replica.dispatch_ready_steps() == []
+
+    assert len(dispatched_steps(rabbitmq)) == 1
+    assert await redis.client.zcard("inflight:company:company-1") == 1
+
+
+async def test_stale_slots_are_evicted_on_admit(redis, rabbitmq, settings, monkeypatch):
+    monkeypatch.setattr(settings, "company_max_parallel_steps", 1)
+    await redis.client.zadd("inflight:company:company-1", {"crashed:step": 0})
+
+    orchestrator = Orchestrator("company-1")
+    await orchestrator.start({})
+
+    assert await orchestrator.dispatch_ready_steps() == ["collect_context"]
+    assert await redis.client.zrange("inflight:company:company-1", 0, -1) == [
+        f"{orchestrator.workflow_id}:collect_context"
+    ]
+
+
+def test_graph_mark_incomplete_reverts_mark_completed():
+    steps = [step.model_copy() for step in Orchestrator.DEFAULT_WORKFLOW_STEPS]
+    graph = WorkflowGraph(steps)
+    steps[0].status = WorkflowStatus.COMPLETED
+
+    assert graph.mark_completed("collect_context") == [steps[1]]
+    assert graph.ready_steps() == [steps[1]]
+
+    steps[0].status = WorkflowStatus.PENDING
+    graph.mark_incomplete("collect_context")
+    assert graph.ready_steps() == [steps[0]]
+
+
+async def test_transitions_update_the_graph_without_rebuilding(redis, rabbitmq, monkeypatch):
+    orchestrator = Orchestrator("company-1")
+    await orchestrator.start({})
+    await orchestrator.dispatch_ready_steps()
+
+    def rebuild(steps):
+        raise AssertionError("graph rebuilt on a transition")
+
+    monkeypatch.setattr(orchestrator_module, "WorkflowGraph", rebuild)
+    await orchestrator.on_step_completed("collect_context", {})
+
+    assert dispatched_steps(rabbitmq) == ["collect_context", "generate_talent_profile"]
+    assert await orchestrator.reset_step("collect_context")
+    assert [s.step_id for s in orchestrator._get_next_steps()] == ["collect_context"]
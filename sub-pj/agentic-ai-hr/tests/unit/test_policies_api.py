@@ -0,0 +1,63 @@
+"""Tests for the policy workflow routes."""
+
+from src.core import Orchestrator, WorkflowStatus
+
+
+async def failed_workflow() -> Orchestrator:
+    """A workflow whose first step failed."""
+    orchestrator = Orchestrator("company-1")
+    await orchestrator.start({})
+    await orchestrator.dispatch_ready_steps()
+    await orchestrator.on_step_failed("collect_context", "quota exceeded")
+    return orchestrator
+
+
+def retry_url(orchestrator: Orchestrator, step_id: str) -> str:
+    return f"/api/v1/policies/workflows/{orchestrator.workflow_id}/steps/{step_id}/retry"
+
+
+async def test_retry_dispatches_the_failed_step(api, rabbitmq):
+    orchestrator = await failed_workflow()
+
+    response = await api.post(retry_url(orchestrator, "collect_context"))
+
+    assert response.status_code == 200
+    assert [m["step_id"] for m in rabbitmq.messages("agent.context_collector.tasks")] == [
+        "collect_context",
+        "collect_context",
+    ]
+
+
+async def test_retry_waits_for_a_company_slot(api, rabbitmq, redis, settings, monkeypatch):
+    monkeypatch.setattr(settings, "company_max_parallel_steps", 1)
+    orchestrator = await failed_workflow()
+    other = Orchestrator("company-1")
+    await other.start({})
+    await other.dispatch_ready_steps()
+
+    response = await api.post(retry_url(orchestrator, "collect_context"))
+
+    assert response.status_code == 200
+    stored = await Orchestrator.load(orchestrator.workflow_id)
+    assert stored._get_step("collect_context").status == WorkflowStatus.PENDING
+    assert await redis.client.smembers("deferred:company:company-1") == {orchestrator.workflow_id}
+
+
+async def test_retry_conflict_returns_409(api, monkeypatch):
+    orchestrator = await failed_workflow()
+
+    async def conflict(self, step_id):
+        return False
+
+    monkeypatch.setattr(Orchestrator, "reset_step", conflict)
+    response = await api.post(retry_url(orchestrator, "collect_context"))
+
+    assert response.status_code == 409
+
+
+async def test_only_failed_steps_are_retried(api):
+    orchestrator = await failed_workflow()
+
+    response = await api.post(retry_url(orchestrator, "generate_talent_profile"))
+
+    assert response.status_code == 409
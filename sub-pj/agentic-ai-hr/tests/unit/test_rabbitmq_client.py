@@ -0,0 +1,136 @@
+"""Tests for publishing over the pool of confirm-mode channels."""
+
+import asyncio
+import json
+from collections.abc import AsyncIterator
+from types import SimpleNamespace
+from typing import Any
+
+import pytest
+from aio_pika import Message
+
+from src.services import rabbitmq_client
+
+
+class StubExchange:
+    """Default exchange stand-in; confirms each publish after a loop iteration."""
+
+    def __init__(self, channel: "StubChannel") -> None:
+        self.channel = channel
+        self.bodies: list[dict[str, Any]] = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def publish(self, message: Message, routing_key: str) -> None:
+        body = json.loads(message.body)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(0)
+            if body.get("fail"):
+                if body["fail"] == "close":
+                    self.channel.is_closed = True
+                raise RuntimeError(f"nacked {body['id']}")
+            self.bodies.append(body)
+        finally:
+            self.in_flight -= 1
+
+
+class StubChannel:
+    """aio_pika channel stand-in."""
+
+    def __init__(self, publisher_confirms: bool) -> None:
+        self.publisher_confirms = publisher_confirms
+        self.is_closed = False
+        self.default_exchange = StubExchange(self)
+
+    async def set_qos(self, prefetch_count: int) -> None:
+        pass
+
+    async def declare_queue(self, name: str, **kwargs: Any) -> SimpleNamespace:
+        return SimpleNamespace(name=name)
+
+
+class StubConnection:
+    """aio_pika connection stand-in recording the channels it opened."""
+
+    def __init__(self) -> None:
+        self.channels: list[StubChannel] = []
+
+    async def channel(self, publisher_confirms: bool = False) -> StubChannel:
+        channel = StubChannel(publisher_confirms)
+        self.channels.append(channel)
+        return channel
+
+    async def close(self) -> None:
+        pass
+
+
+@pytest.fixture
+async def client(settings, monkeypatch) -> AsyncIterator[rabbitmq_client.RabbitMQClient]:
+    """Client connected through a stub connection, with 2 publish channels."""
+    monkeypatch.setattr(settings, "rabbitmq_publish_channels", 2)
+    monkeypatch.setattr(settings, "rabbitmq_publish_batch_size", 2)
+
+    async def connect_robust(url: str) -> StubConnection:
+        return StubConnection()
+
+    monkeypatch.setattr(rabbitmq_client, "connect_robust", connect_robust)
+    client = rabbitmq_client.RabbitMQClient()
+    await client.connect()
+    yield client
+    await client.disconnect()
+
+
+def pool_exchanges(client: rabbitmq_client.RabbitMQClient) -> list[StubExchange]:
+    return [pc.channel.default_exchange for pc in client._publish_channels]
+
+
+async def test_pool_channels_are_opened_in_confirm_mode(client):
+    assert len(client._publish_channels) == 2
+    assert all(pc.channel.publisher_confirms for pc in client._publish_channels)
+    assert not client.channel.publisher_confirms
+
+
+async def test_batches_share_a_channel_with_their_confirms_outstanding(client):
+    await client.publish_many("q", [{"id": index} for index in range(4)])
+
+    exchanges = pool_exchanges(client)
+    assert [len(exchange.bodies) for exchange in exchanges] == [2, 2]
+    assert [exchange.max_in_flight for exchange in exchanges] == [2, 2]
+    published = sorted(body["id"] for exchange in exchanges for body in exchange.bodies)
+    assert published == [0, 1, 2, 3]
+    assert client.get_stats()["idle_publish_channels"] == 2
+
+
+async def test_first_failure_is_raised_after_every_batch_settles(client):
+    messages = [{"id": 0}, {"id": 1, "fail": "nack"}, {"id": 2}, {"id": 3}]
+
+    with pytest.raises(RuntimeError, match="nacked 1"):
+        await client.publish_many("q", messages)
+
+    exchanges = pool_exchanges(client)
+    published = sorted(body["id"] for exchange in exchanges for body in exchange.bodies)
+    assert published == [0, 2, 3]
+    stats = client.get_stats()["publish_channels"]
+    assert sum(channel["failed"] for channel in stats) == 1
+    assert sum(channel["published"] for channel in stats) == 3
+
+
+async def test_closed_channel_is_replaced_before_reuse(client):
+    # A single pool channel, so the second publish borrows the same one
+    client._publish_channels = client._publish_channels[:1]
+    client._idle_publish_channels = asyncio.Queue()
+    client._idle_publish_channels.put_nowait(client._publish_channels[0])
+    closed = client._publish_channels[0].channel
+
+    with pytest.raises(RuntimeError):
+        await client.publish("q", {"id": 0, "fail": "close"})
+    await client.publish("q", {"id": 1})
+
+    [publish_channel] = client._publish_channels
+    assert publish_channel.channel is not closed
+    assert publish_channel.channel.publisher_confirms
+    assert publish_channel.channel.default_exchange.bodies == [{"id": 1}]
+    assert publish_channel.failed == 1
+    assert publish_channel.published == 1
@@ -0,0 +1,35 @@
+"""Tests for the Gemini rate limiter."""
+
+import asyncio
+import time
+
+from src.core import GeminiRateLimiter, LLMPriority
+
+
+async def test_batch_caller_yields_to_hitl_caller(redis):
+    # 10 requests per second, with the request bucket just emptied
+    limiter = GeminiRateLimiter(default_rpm=600, default_tpm=1_000_000, model_limits={})
+    await redis.client.hset(
+        "ratelimit:gemini:model",
+        mapping={"requests": 0, "tokens": 1_000_000, "ts": int(time.time() * 1000)},
+    )
+
+    admitted = []
+
+    async def call(priority: LLMPriority) -> None:
+        await limiter.acquire("model", 100, priority)
+        admitted.append(priority)
+
+    batch = asyncio.create_task(call(LLMPriority.BATCH))
+    await asyncio.sleep(0)
+    hitl = asyncio.create_task(call(LLMPriority.HITL_BLOCKING))
+
+    async with asyncio.timeout(5):
+        await hitl
+    # The batch caller queued first but must also leave a reserve untouched
+    assert admitted == [LLMPriority.HITL_BLOCKING]
+    assert not batch.done()
+
+    batch.cancel()
+    async with asyncio.timeout(5):
+        await asyncio.gather(batch, *limiter._drainers.values(), return_exceptions=True)
@@ -0,0 +1,62 @@
+"""Tests for the read-through cache."""
+
+import asyncio
+
+import pytest
+
+from src.services.read_cache import ReadThroughCache
+
+
+@pytest.fixture
+async def caches(redis):
+    """Two caches standing in for two processes."""
+    caches = [ReadThroughCache(enabled=True, max_entries=10, ttl_seconds=60) for _ in range(2)]
+    yield caches
+    for cache in caches:
+        await cache.stop()
+
+
+async def wait_until_listening(cache: ReadThroughCache) -> None:
+    """Start the cache's invalidation listener and wait for its subscription."""
+    cache._ensure_listener()
+    async with asyncio.timeout(5):
+        while not cache._listening:
+            await asyncio.sleep(0.01)
+
+
+async def test_writes_elsewhere_evict_cached_entries(redis, caches):
+    writer, reader = caches
+    for cache in caches:
+        await wait_until_listening(cache)
+    await redis.set_json("company:1", {"name": "Acme"})
+    assert await reader.get_json("company:1") == {"name": "Acme"}
+
+    await redis.set_json("company:1", {"name": "Acme Corp"})
+    assert await reader.get_json("company:1") == {"name": "Acme"}
+    await writer.invalidate("company:1")
+
+    async with asyncio.timeout(5):
+        while await reader.get_json("company:1") != {"name": "Acme Corp"}:
+            await asyncio.sleep(0.01)
+    assert reader.get_stats()["invalidations_received"] == 1
+
+
+async def test_load_overlapping_an_invalidation_is_not_cached(redis, caches):
+    cache, _ = caches
+    await wait_until_listening(cache)
+
+    async def load():
+        cache.invalidate_local("company:1")
+        return {"name": "stale"}
+
+    assert await cache.get_or_load("company:1", load) == {"name": "stale"}
+    assert cache.get_stats()["entries"] == 0
+
+
+async def test_reads_bypass_the_cache_until_subscribed(redis, caches):
+    cache, _ = caches
+    await redis.set_json("company:1", {"name": "Acme"})
+
+    assert await cache.get_json("company:1") == {"name": "Acme"}
+    assert cache.get_stats()["bypassed"] == 1
+    assert cache.get_stats()["entries"] == 0
@@ -0,0 +1,83 @@
+"""Tests for the Redis client's bulk JSON helpers."""
+
+import pytest
+
+
+async def test_mget_json_returns_none_for_missing_keys(redis):
+    await redis.set_json("doc:a", {"n": 1})
+    await redis.set_json("doc:c", {"n": 3, "tags": ["x"]})
+
+    assert await redis.mget_json(["doc:a", "doc:b", "doc:c"]) == [
+        {"n": 1},
+        None,
+        {"n": 3, "tags": ["x"]},
+    ]
+    assert await redis.mget_json([]) == []
+
+
+async def test_mset_json_round_trips_with_one_ttl(redis):
+    await redis.mset_json({"doc:a": {"n": 1}, "doc:b": {"n": 2}}, expire_seconds=60)
+
+    assert await redis.mget_json(["doc:a", "doc:b"]) == [{"n": 1}, {"n": 2}]
+    for key in ("doc:a", "doc:b"):
+        assert 0 < await redis.client.ttl(key) <= 60
+
+
+async def test_mset_json_applies_per_key_ttls(redis):
+    await redis.mset_json(
+        {"doc:a": {"n": 1}, "doc:b": {"n": 2}, "doc:c": {"n": 3}},
+        expire_seconds={"doc:a": 60, "doc:b": 600},
+    )
+
+    assert 0 < await redis.client.ttl("doc:a") <= 60
+    assert 60 < await redis.client.ttl("doc:b") <= 600
+    # Not in the mapping: stored without expiry
+    assert await redis.client.ttl("doc:c") == -1
+    assert await redis.get_json("doc:c") == {"n": 3}
+
+
+async def test_mset_json_without_ttl_keeps_keys(redis):
+    await redis.mset_json({"doc:a": {"n": 1}})
+    await redis.mset_json({})
+
+    assert await redis.client.ttl("doc:a") == -1
+
+
+@pytest.mark.parametrize("batch_size", [1, 2, 100])
+async def test_scan_json_yields_every_string_key_with_the_prefix(redis, batch_size):
+    values = {f"doc:{i}": {"n": i} for i in range(5)}
+    await redis.mset_json(values)
+    await redis.set_json("other:1", {"n": -1})
+    await redis.client.hset("doc:hash", "field", "value")
+
+    scanned = dict([item async for item in redis.scan_json("doc:", batch_size=batch_size)])
+
+    assert scanned == values
+
+
+async def test_pipeline_sends_queued_commands_on_exit(redis):
+    async with redis.pipeline() as pipe:
+        pipe.set("counter", 1)
+        pipe.incrby("counter", 2)
+
+    assert await redis.client.get("counter") == "3"
+
+
+async def test_pipeline_results_can_be_read_inside_the_block(redis):
+    await redis.client.set("counter", 1)
+
+    async with redis.pipeline(transaction=True) as pipe:
+        pipe.incr("counter")
+        pipe.get("counter")
+        assert await pipe.execute() == [2, "2"]
+
+    assert await redis.client.get("counter") == "2"
+
+
+async def test_pipeline_sends_nothing_if_the_block_raises(redis):
+    with pytest.raises(RuntimeError):
+        async with redis.pipeline() as pipe:
+            pipe.set("counter", 1)
+            raise RuntimeError("abort")
+
+    assert await redis.client.get("counter") is None
@@ -0,0 +1,66 @@
+"""Tests for the HITL review routes."""
+
+from src.core import HITLManager, Orchestrator, WorkflowStatus
+
+
+async def waiting_review() -> tuple[Orchestrator, str]:
+    """A workflow whose first step waits on a pending review request."""
+    orchestrator = Orchestrator("company-1")
+    await orchestrator.start({})
+    await orchestrator.dispatch_ready_steps()
+    await orchestrator.on_step_completed("collect_context", {}, requires_hitl=True)
+    request = await HITLManager().create_request(
+        gate_id="HITL-001",
+        agent_id="agent-1",
+        agent_type="context_collector",
+        company_id="company-1",
+        title="Context",
+        description="",
+        data={},
+        workflow_id=orchestrator.workflow_id,
+        step_id="collect_context",
+    )
+    return orchestrator, request.request_id
+
+
+async def test_batch_decision_completes_the_waiting_step(api):
+    orchestrator, request_id = await waiting_review()
+
+    response = await api.post(
+        "/api/v1/reviews/decisions:batch",
+        json={"decisions": [{"request_id": request_id, "approved": True}]},
+    )
+
+    assert response.status_code == 200
+    assert response.json()["results"][0]["error"] is None
+    stored = await Orchestrator.load(orchestrator.workflow_id)
+    assert stored._get_step("collect_context").status == WorkflowStatus.COMPLETED
+
+
+async def test_batch_reports_decisions_whose_workflow_kept_conflicting(api, monkeypatch):
+    _, request_id = await waiting_review()
+
+    async def conflict(self, decisions):
+        return False
+
+    monkeypatch.setattr(Orchestrator, "on_hitl_decisions", conflict)
+    response = await api.post(
+        "/api/v1/reviews/decisions:batch",
+        json={"decisions": [{"request_id": request_id, "approved": True}]},
+    )
+
+    [result] = response.json()["results"]
+    assert result["decided_at"] is not None
+    assert "changed concurrently" in result["error"]
+
+
+async def test_single_decision_conflict_returns_409(api, monkeypatch):
+    _, request_id = await waiting_review()
+
+    async def conflict(self, decisions):
+        return False
+
+    monkeypatch.setattr(Orchestrator, "on_hitl_decisions", conflict)
+    response = await api.post(f"/api/v1/reviews/{request_id}/decision", json={"approved": True})
+
+    assert response.status_code == 409
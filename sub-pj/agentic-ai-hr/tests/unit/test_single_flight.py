@@ -0,0 +1,113 @@
+"""Tests for single-flight coalescing of LLM calls."""
+
+import asyncio
+import json
+
+import pytest
+
+from src.core import SingleFlight
+
+
+class Generation:
+    """An LLM call stand-in that completes when released."""
+
+    def __init__(self, result: str = "text") -> None:
+        self.result = result
+        self.calls = 0
+        self.release = asyncio.Event()
+
+    async def __call__(self) -> str:
+        self.calls += 1
+        await self.release.wait()
+        return self.result
+
+
+async def test_concurrent_callers_share_one_execution():
+    flight = SingleFlight(distributed=False, lock_ttl_seconds=5)
+    generation = Generation()
+
+    callers = [asyncio.create_task(flight.do("key", generation)) for _ in range(3)]
+    await asyncio.sleep(0)
+    generation.release.set()
+
+    assert await asyncio.gather(*callers) == ["text"] * 3
+    assert generation.calls == 1
+
+
+async def test_cancelled_follower_leaves_the_call_running():
+    flight = SingleFlight(distributed=False, lock_ttl_seconds=5)
+    generation = Generation()
+
+    leader = asyncio.create_task(flight.do("key", generation))
+    await asyncio.sleep(0)
+    follower = asyncio.create_task(flight.do("key", generation))
+    await asyncio.sleep(0)
+    follower.cancel()
+    await asyncio.sleep(0)
+    generation.release.set()
+
+    assert await leader == "text"
+    assert follower.cancelled()
+
+
+async def test_cancelled_leader_hands_the_call_to_a_follower():
+    flight = SingleFlight(distributed=False, lock_ttl_seconds=5)
+    generation = Generation()
+
+    leader = asyncio.create_task(flight.do("key", generation))
+    await asyncio.sleep(0)
+    follower = asyncio.create_task(flight.do("key", generation))
+    await asyncio.sleep(0)
+    leader.cancel()
+    await asyncio.sleep(0)
+    generation.release.set()
+
+    assert await follower == "text"
+    assert leader.cancelled()
+    assert generation.calls == 2
+
+
+async def test_distributed_follower_ignores_outcomes_of_other_flights(redis):
+    flight = SingleFlight(distributed=True, lock_ttl_seconds=5)
+    generation = Generation("local")
+    # A failed earlier flight, and the flight currently led by another process
+    await redis.client.set("llm:result:key:earlier", json.dumps({"error": "quota"}))
+    await redis.client.set("llm:inflight:key", "current")
+
+    follower = asyncio.create_task(flight.do("key", generation))
+    await asyncio.sleep(0.05)
+    payload = json.dumps({"result": "shared"})
+    await redis.client.set("llm:result:key:current", payload)
+    await redis.client.publish("llm:result:key:current", payload)
+
+    assert await follower == "shared"
+    assert generation.calls == 0
+
+
+async def test_distributed_follower_takes_over_from_a_vanished_leader(redis):
+    flight = SingleFlight(distributed=True, lock_ttl_seconds=5)
+    generation = Generation("local")
+    generation.release.set()
+    await redis.client.set("llm:inflight:key", "crashed")
+
+    follower = asyncio.create_task(flight.do("key", generation))
+    await asyncio.sleep(0.05)
+    await redis.client.delete("llm:inflight:key")
+
+    assert await follower == "local"
+    assert generation.calls == 1
+    assert await redis.client.get("llm:inflight:key") is None
+
+
+async def test_distributed_leader_failure_reaches_followers(redis):
+    flight = SingleFlight(distributed=True, lock_ttl_seconds=5)
+    await redis.client.set("llm:inflight:key", "current")
+
+    follower = asyncio.create_task(flight.do("key", Generation()))
+    await asyncio.sleep(0.05)
+    payload = json.dumps({"error": "quota"})
+    await redis.client.set("llm:result:key:current", payload)
+    await redis.client.publish("llm:result:key:current", payload)
+
+    with pytest.raises(RuntimeError, match="quota"):
+        await follower
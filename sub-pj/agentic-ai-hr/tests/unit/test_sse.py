@@ -0,0 +1,76 @@
+"""Tests for Server-Sent Events streams."""
+
+import gc
+import json
+
+import pytest
+from fastapi import HTTPException
+
+from src.api import sse
+from src.core import Orchestrator, WorkflowStatus
+from src.core.events import get_last_event_id, workflow_events_key
+
+
+def parse_events(body: str) -> list[tuple[str, str, dict]]:
+    """(id, event, data) of each frame of an SSE body."""
+    events = []
+    for frame in body.strip().split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in frame.splitlines())
+        events.append((fields["id"], fields["event"], json.loads(fields["data"])))
+    return events
+
+
+async def complete(orchestrator: Orchestrator) -> None:
+    orchestrator.state.status = WorkflowStatus.COMPLETED
+    await orchestrator._save_state()
+
+
+def test_slots_are_reserved_before_the_response_is_sent(settings, monkeypatch):
+    monkeypatch.setattr(settings, "sse_max_connections", 1)
+    monkeypatch.setattr(sse, "_open_streams", 0)
+
+    async def snapshot():
+        return {}
+
+    first = sse.event_stream_response(None, "stream", snapshot)
+    with pytest.raises(HTTPException) as error:
+        sse.event_stream_response(None, "stream", snapshot)
+    assert error.value.status_code == 503
+
+    # Never sent: the slot comes back once the response is dropped
+    del first
+    gc.collect()
+    assert sse._open_streams == 0
+
+
+async def test_stream_starts_with_a_snapshot_at_the_stream_position(api, redis, rabbitmq):
+    orchestrator = Orchestrator("company-1")
+    await orchestrator.start({})
+    await complete(orchestrator)
+    position = await get_last_event_id(workflow_events_key(orchestrator.workflow_id))
+
+    response = await api.get(f"/api/v1/policies/workflows/{orchestrator.workflow_id}/events")
+
+    [(event_id, event, data)] = parse_events(response.text)
+    assert (event_id, event) == (position, "snapshot")
+    assert data["status"] == WorkflowStatus.COMPLETED.value
+    assert sse._open_streams == 0
+
+
+async def test_last_event_id_resumes_after_that_event(api, redis, rabbitmq):
+    orchestrator = Orchestrator("company-1")
+    await orchestrator.start({})
+    resume_from = await get_last_event_id(workflow_events_key(orchestrator.workflow_id))
+    await orchestrator.dispatch_ready_steps()
+    await complete(orchestrator)
+
+    response = await api.get(
+        f"/api/v1/policies/workflows/{orchestrator.workflow_id}/events",
+        headers={"Last-Event-ID": resume_from},
+    )
+
+    events = parse_events(response.text)
+    assert all(event == "workflow_updated" for _, event, _ in events)
+    assert resume_from not in [event_id for event_id, _, _ in events]
+    assert events[0][2]["status"] == WorkflowStatus.RUNNING.value
+    assert events[-1][2]["status"] == WorkflowStatus.COMPLETED.value
@@ -0,0 +1,79 @@
+"""Tests for the async Vault client's secret cache."""
+
+import asyncio
+from collections.abc import AsyncIterator
+from typing import Any
+
+import pytest
+
+from src.services import AsyncVaultClient, VaultClient
+
+
+class FakeVaultClient(VaultClient):
+    """Vault client serving in-memory secrets, counting reads per path."""
+
+    def __init__(self, ttl_seconds: float) -> None:
+        super().__init__()
+        self.ttl_seconds = ttl_seconds
+        self.secrets: dict[str, dict[str, Any]] = {}
+        self.reads: dict[str, int] = {}
+
+    def connect(self) -> None:
+        pass
+
+    def read_secret_with_ttl(self, path: str) -> tuple[dict[str, Any] | None, float | None]:
+        self.reads[path] = self.reads.get(path, 0) + 1
+        return self.secrets.get(path), self.ttl_seconds
+
+
+@pytest.fixture
+def backend() -> FakeVaultClient:
+    return FakeVaultClient(ttl_seconds=0.2)
+
+
+@pytest.fixture
+async def vault(backend: FakeVaultClient) -> AsyncIterator[AsyncVaultClient]:
+    """Async client refreshing secrets halfway through their 0.2s lease."""
+    client = AsyncVaultClient(
+        client=backend,
+        max_workers=2,
+        cache_enabled=True,
+        refresh_fraction=0.5,
+        default_ttl_seconds=300,
+    )
+    await client.connect()
+    yield client
+    await client.close()
+
+
+async def test_used_secret_is_refreshed_before_its_lease_expires(vault, backend):
+    backend.secrets["app/key"] = {"value": "old"}
+    await vault.read_secret("app/key")
+    assert await vault.read_secret("app/key") == {"value": "old"}
+
+    backend.secrets["app/key"] = {"value": "new"}
+    await asyncio.sleep(0.15)
+
+    assert await vault.read_secret("app/key") == {"value": "new"}
+    assert backend.reads["app/key"] == 2
+    assert vault.get_stats()["misses"] == 1
+    assert vault.refreshes == 1
+
+
+async def test_unused_secret_is_dropped_at_its_refresh_point(vault, backend):
+    backend.secrets["app/key"] = {"value": "old"}
+    await vault.read_secret("app/key")
+
+    await asyncio.sleep(0.15)
+
+    assert vault.get_stats()["entries"] == 0
+    assert backend.reads["app/key"] == 1
+
+
+async def test_duplicate_company_ids_are_read_once(vault, backend):
+    backend.secrets["hr-policy-advisor/companies/a"] = {"token": "a"}
+
+    secrets = await vault.get_companies_secrets(["a", "b", "a"])
+
+    assert secrets == {"a": {"token": "a"}, "b": None}
+    assert backend.reads["hr-policy-advisor/companies/a"] == 1
@@ -0,0 +1,292 @@
+"""Tests for the agent worker: task processing, retries and parking."""
+
+import json
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+from typing import Any
+
+import pytest
+
+from src import worker
+from src.core import AgentResult, BaseAgent, Orchestrator, WorkflowStatus, get_hitl_manager
+from src.services import TaskLane, rabbitmq_client
+from src.services.rabbitmq_client import (
+    RETRY_COUNT_HEADER,
+    parking_queue_name,
+    retry_queue_name,
+)
+from src.worker import AgentWorker
+
+
+class StubAgent:
+    """Agent stand-in recording the steps it ran."""
+
+    runs: list[str] = []
+
+    def __init__(self, company_id: str, session_id: str | None = None, **context: Any) -> None:
+        self.agent_id = "agent-1"
+        self.step_id = context["step_id"]
+
+    async def run(self, input_data: dict[str, Any]) -> AgentResult:
+        StubAgent.runs.append(self.step_id)
+        return AgentResult(success=True, data={"ran": True})
+
+
+class ReviewedAgent(BaseAgent):
+    """Agent whose output goes to a HITL review."""
+
+    agent_type = "context_collector"
+
+    async def execute(self, input_data: dict[str, Any]) -> AgentResult:
+        await self.request_hitl_approval(
+            gate_id="HITL-001", title="Context", description="", data={"company": "Acme"}
+        )
+        return AgentResult(
+            success=True, data={"company": "Acme"}, requires_hitl=True, hitl_gate_id="HITL-001"
+        )
+
+
+class DeliveredMessage:
+    """Delivered message stand-in, settled like aio_pika's message.process()."""
+
+    def __init__(self, body: dict[str, Any]) -> None:
+        self.body = json.dumps(body).encode()
+        self.headers: dict[str, Any] = {}
+        self.outcome: str | None = None
+
+    @asynccontextmanager
+    async def process(
+        self, requeue: bool = False, ignore_processed: bool = False
+    ) -> AsyncIterator[None]:
+        try:
+            yield
+        except Exception:
+            self.outcome = "rejected"
+            raise
+        self.outcome = "acked"
+
+
+class ConsumerConnection:
+    """Connection stand-in whose channels record each queue's consumer callback."""
+
+    def __init__(self) -> None:
+        self.consumers: dict[str, Any] = {}
+
+    async def channel(self) -> "ConsumerConnection":
+        return self
+
+    async def set_qos(self, prefetch_count: int) -> None:
+        pass
+
+    async def declare_queue(self, name: str, **kwargs: Any) -> SimpleNamespace:
+        async def consume(callback: Any, no_ack: bool = False) -> str:
+            self.consumers[name] = callback
+            return f"consumer-{name}"
+
+        return SimpleNamespace(name=name, consume=consume)
+
+
+class ParkedMessage:
+    """Parked message stand-in recording how it was settled."""
+
+    def __init__(self, body: dict[str, Any]) -> None:
+        self.body = json.dumps(body).encode()
+        self.headers: dict[str, Any] = {}
+        self.acked = False
+
+    async def ack(self) -> None:
+        self.acked = True
+
+    async def nack(self, requeue: bool = True) -> None:
+        pass
+
+
+class ParkingQueue:
+    """Parking queue stand-in handing out its messages in order."""
+
+    def __init__(self, *messages: ParkedMessage) -> None:
+        self.messages = list(messages)
+
+    async def get(self, no_ack: bool = False, fail: bool = True) -> ParkedMessage | None:
+        return self.messages.pop(0) if self.messages else None
+
+
+def make_worker() -> AgentWorker:
+    return AgentWorker(
+        agent_types=["context_collector"],
+        concurrency=2,
+        prefetch_count=2,
+        shutdown_timeout_seconds=1,
+    )
+
+
+async def running_step() -> tuple[Orchestrator, dict]:
+    """A workflow with its first step dispatched, and that step's task."""
+    orchestrator = Orchestrator("company-1")
+    await orchestrator.start({})
+    await orchestrator.dispatch_ready_steps()
+    step = orchestrator._get_step("collect_context")
+    task = {
+        "workflow_id": orchestrator.workflow_id,
+        "step_id": "collect_context",
+        "attempt": step.attempt,
+    }
+    return orchestrator, task
+
+
+async def test_parked_task_fails_its_step_and_releases_the_slot(
+    redis, rabbitmq, settings, monkeypatch
+):
+    monkeypatch.setattr(settings, "event_router_enabled", False)
+    orchestrator, task = await running_step()
+    assert await redis.client.zcard("inflight:company:company-1") == 1
+
+    await make_worker()._fail_parked_task(task, TimeoutError("LLM timed out"))
+
+    stored = await Orchestrator.load(orchestrator.workflow_id)
+    step = stored._get_step("collect_context")
+    assert step.status == WorkflowStatus.FAILED
+    assert "LLM timed out" in step.error
+    assert await redis.client.zcard("inflight:company:company-1") == 0
+
+
+async def test_parked_task_of_a_superseded_dispatch_is_ignored(
+    redis, rabbitmq, settings, monkeypatch
+):
+    monkeypatch.setattr(settings, "event_router_enabled", False)
+    orchestrator, task = await running_step()
+    await orchestrator.on_step_completed("collect_context", {"done": True})
+
+    await make_worker()._fail_parked_task(task, TimeoutError("LLM timed out"))
+
+    stored = await Orchestrator.load(orchestrator.workflow_id)
+    assert stored._get_step("collect_context").status == WorkflowStatus.COMPLETED
+
+
+async def test_failures_back_off_then_park(settings, monkeypatch):
+    monkeypatch.setattr(settings, "agent_max_retry_count", 2)
+    monkeypatch.setattr(settings, "agent_retry_delays_seconds", [1.0, 5.0])
+    client = rabbitmq_client.RabbitMQClient()
+    republished = []
+
+    async def republish(queue_name, message, headers):
+        republished.append(queue_name)
+        message.headers = headers
+
+    monkeypatch.setattr(client, "_republish", republish)
+    message = SimpleNamespace(headers={})
+
+    parked = [
+        await client._retry_or_park("agent.x.tasks", message, RuntimeError("down"))
+        for _ in range(3)
+    ]
+
+    assert parked == [False, False, True]
+    assert republished == [
+        retry_queue_name("agent.x.tasks", 1),
+        retry_queue_name("agent.x.tasks", 2),
+        parking_queue_name("agent.x.tasks"),
+    ]
+    assert message.headers[RETRY_COUNT_HEADER] == 3
+
+
+async def test_replayed_parked_task_runs_its_agent_again(api, rabbitmq, monkeypatch):
+    monkeypatch.setattr(worker, "get_agent_class", lambda agent_type: StubAgent)
+    monkeypatch.setattr(StubAgent, "runs", [])
+    orchestrator, task = await running_step()
+    agent_worker = make_worker()
+    await agent_worker._fail_parked_task(task, TimeoutError("LLM timed out"))
+    message = ParkedMessage(task)
+    parking = ParkingQueue(message)
+
+    async def declare_queue(name, **kwargs):
+        return parking
+
+    async def get_parked_count(queue_name):
+        return len(parking.messages)
+
+    monkeypatch.setattr(rabbitmq, "declare_queue", declare_queue)
+    monkeypatch.setattr(rabbitmq, "get_parked_count", get_parked_count)
+
+    response = await api.post("/api/v1/admin/agents/context_collector/parked/replay")
+
+    assert response.json()["replayed"] == 1
+    assert message.acked
+    retried = rabbitmq.messages("agent.context_collector.tasks")[-1]
+    assert retried["attempt"] == task["attempt"] + 1
+
+    await agent_worker._process_task("context_collector", TaskLane.INTERACTIVE, retried)
+
+    assert StubAgent.runs == ["collect_context"]
+    stored = await Orchestrator.load(orchestrator.workflow_id)
+    assert stored._get_step("collect_context").status == WorkflowStatus.COMPLETED
+
+
+async def test_consumed_task_runs_its_agent_completes_the_step_and_is_acked(
+    redis, rabbitmq, settings, monkeypatch
+):
+    monkeypatch.setattr(settings, "event_router_enabled", False)
+    monkeypatch.setattr(worker, "get_agent_class", lambda agent_type: StubAgent)
+    monkeypatch.setattr(StubAgent, "runs", [])
+    connection = ConsumerConnection()
+    rabbitmq._connection = connection
+    orchestrator, _ = await running_step()
+    [task] = rabbitmq.messages("agent.context_collector.tasks")
+
+    await make_worker().start()
+    message = DeliveredMessage(task)
+    await connection.consumers["agent.context_collector.tasks"](message)
+
+    assert StubAgent.runs == ["collect_context"]
+    assert message.outcome == "acked"
+    stored = await Orchestrator.load(orchestrator.workflow_id, with_data=True)
+    step = stored._get_step("collect_context")
+    assert step.status == WorkflowStatus.COMPLETED
+    assert step.output_data == {"ran": True}
+    assert rabbitmq.messages("agent.talent_profile_generator.tasks")
+
+
+async def test_reviewed_step_opens_exactly_one_hitl_request(redis, rabbitmq, settings, monkeypatch):
+    monkeypatch.setattr(settings, "event_router_enabled", False)
+    monkeypatch.setattr(worker, "get_agent_class", lambda agent_type: ReviewedAgent)
+    orchestrator, _ = await running_step()
+    [task] = rabbitmq.messages("agent.context_collector.tasks")
+
+    await make_worker()._process_task("context_collector", TaskLane.INTERACTIVE, task)
+
+    [request] = await get_hitl_manager().get_pending_requests("company-1")
+    assert (request.workflow_id, request.step_id) == (orchestrator.workflow_id, "collect_context")
+    assert request.data == {"company": "Acme"}
+    stored = await Orchestrator.load(orchestrator.workflow_id)
+    assert stored._get_step("collect_context").status == WorkflowStatus.WAITING_HITL
+
+
+async def test_redelivered_task_dispatches_successors_after_a_failed_recording(
+    redis, rabbitmq, settings, monkeypatch
+):
+    monkeypatch.setattr(settings, "event_router_enabled", False)
+    monkeypatch.setattr(worker, "get_agent_class", lambda agent_type: StubAgent)
+    monkeypatch.setattr(StubAgent, "runs", [])
+    orchestrator, _ = await running_step()
+    [task] = rabbitmq.messages("agent.context_collector.tasks")
+    dispatch = Orchestrator.dispatch_ready_steps
+
+    async def broker_down(self: Orchestrator) -> list[str]:
+        raise ConnectionError("broker down")
+
+    # The result transition commits, then dispatching its successors fails
+    monkeypatch.setattr(Orchestrator, "dispatch_ready_steps", broker_down)
+    with pytest.raises(ConnectionError):
+        await make_worker()._process_task("context_collector", TaskLane.INTERACTIVE, task)
+    stored = await Orchestrator.load(orchestrator.workflow_id)
+    assert stored._get_step("collect_context").status == WorkflowStatus.COMPLETED
+    assert not rabbitmq.messages("agent.talent_profile_generator.tasks")
+
+    monkeypatch.setattr(Orchestrator, "dispatch_ready_steps", dispatch)
+    await make_worker()._process_task("context_collector", TaskLane.INTERACTIVE, task)
+
+    assert StubAgent.runs == ["collect_context"]
+    assert rabbitmq.messages("agent.talent_profile_generator.tasks")
+    stored = await Orchestrator.load(orchestrator.workflow_id)
+    assert stored._get_step("generate_talent_profile").status == WorkflowStatus.RUNNING
@@ -0,0 +1,76 @@
+"""Tests for storing workflow state as a per-step Redis hash."""
+
+from src.core import Orchestrator, WorkflowStatus
+from src.services import codec
+
+
+async def started_workflow() -> Orchestrator:
+    """A workflow whose first step completed with an output."""
+    orchestrator = Orchestrator("company-1")
+    await orchestrator.start({"company_name": "Acme"})
+    await orchestrator.dispatch_ready_steps()
+    await orchestrator.on_step_completed("collect_context", {"company": {"name": "Acme"}})
+    return orchestrator
+
+
+async def test_save_writes_only_the_fields_marked_dirty(redis, rabbitmq):
+    orchestrator = await started_workflow()
+    key = f"workflow:{orchestrator.workflow_id}"
+    # Written behind this orchestrator's back; a full rewrite would clobber it
+    await redis.raw_client.hset(key, "input:collect_context", codec.encode({"other": True}))
+
+    stored = await Orchestrator.load(orchestrator.workflow_id)
+    stored.state.context["note"] = "changed"
+    stored._dirty_fields.add("context")
+    await stored._save_state()
+
+    assert codec.decode(await redis.raw_client.hget(key, "context"))["note"] == "changed"
+    assert codec.decode(await redis.raw_client.hget(key, "input:collect_context")) == {
+        "other": True
+    }
+    assert codec.decode(await redis.raw_client.hget(key, "output:collect_context")) == {
+        "company": {"name": "Acme"}
+    }
+
+
+async def test_step_payloads_are_loaded_on_demand(redis, rabbitmq):
+    orchestrator = await started_workflow()
+
+    stored = await Orchestrator.load(orchestrator.workflow_id)
+    step = stored._get_step("collect_context")
+    assert step.status == WorkflowStatus.COMPLETED
+    assert step.input_data == {}
+    assert step.output_data == {}
+
+    await stored.load_step_data("collect_context")
+
+    assert step.input_data == {"company_name": "Acme"}
+    assert step.output_data == {"company": {"name": "Acme"}}
+    assert stored._data_loaded == {"collect_context"}
+
+    with_data = await Orchestrator.load(orchestrator.workflow_id, with_data=True)
+    assert with_data._get_step("collect_context").output_data == {"company": {"name": "Acme"}}
+    assert with_data._data_loaded == {step.step_id for step in with_data.state.steps}
+
+
+async def test_legacy_blob_is_migrated_to_the_hash_layout(redis, rabbitmq):
+    legacy = Orchestrator("company-1")
+    legacy.state.status = WorkflowStatus.RUNNING
+    legacy.state.context["initial_data"] = {"company_name": "Acme"}
+    legacy._get_step("collect_context").input_data = {"company_name": "Acme"}
+    key = f"workflow:{legacy.workflow_id}"
+    await redis.set_json(key, legacy.state.model_dump(mode="json"))
+
+    stored = await Orchestrator.load(legacy.workflow_id)
+    assert stored._legacy_blob
+    assert stored._get_step("collect_context").input_data == {"company_name": "Acme"}
+
+    assert await stored.dispatch_ready_steps() == ["collect_context"]
+
+    assert await redis.client.type(key) == "hash"
+    migrated = await Orchestrator.load(legacy.workflow_id, with_data=True)
+    assert not migrated._legacy_blob
+    step = migrated._get_step("collect_context")
+    assert step.status == WorkflowStatus.RUNNING
+    assert step.input_data == {"company_name": "Acme"}
+    assert migrated.state.context["initial_data"] == {"company_name": "Acme"}